@@ -0,0 +1,117 @@
+'''
+Load generator for the move API server, measuring throughput and tail latency.
+
+Usage:
+    python benchmarks/api_load_test.py --clients 50 --requests 100
+    python benchmarks/api_load_test.py --clients 50 --requests 100 --batch-size 16 --url http://127.0.0.1:8000
+
+Every client is a thread sending requests one after another over its own keep-alive connection, each request holding
+batch_size positions taken from random games. Without --url, a server with a new move service is started in this process.
+Reports requests and positions per second and p50/p99 request latency.
+'''
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+import sys, os.path
+from urllib.parse import urlsplit
+src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
+sys.path.append(src_path)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from api_server import create_server
+from bitboard import BitBoard
+from model import GameStatus,Move
+from move_service import MoveService
+from load_test import get_percentile
+
+
+def get_random_position(rng, dimension=3, win_length=None):
+    '''
+    Returns JSON position of a game in progress reached by random moves, X moving first.
+    '''
+    while True:
+        board = BitBoard(dimension=dimension, win_length=win_length)
+        marker = Move.X
+        for _ in range(rng.randrange(dimension*dimension - 1)):
+            (row, col) = rng.choice(board.get_available_moves())
+            board.set_cell(row, col, marker)
+            marker = Move.O if marker == Move.X else Move.X
+        if board.get_game_state()[0] == GameStatus.IN_PROGRESS:
+            cells = ''.join({Move.X: 'X', Move.O: 'O', Move.EMPTY: '.'}[board.get_move(index // dimension, index % dimension)]
+                            for index in range(dimension*dimension))
+            return {'board': cells, 'marker': marker.value, 'win_length': board.win_length}
+
+def run_client(host, port, requests, batch_size, difficulty, dimension, win_length, rng, latencies, errors):
+    connection = http.client.HTTPConnection(host, port)
+    try:
+        for _ in range(requests):
+            positions = [dict(get_random_position(rng, dimension, win_length), difficulty=difficulty) for _ in range(batch_size)]
+            body = json.dumps(positions[0] if batch_size == 1 else {'positions': positions})
+            start = time.perf_counter()
+            connection.request('POST', '/move', body, {'Content-Type': 'application/json'})
+            response = json.loads(connection.getresponse().read())
+            latencies.append(time.perf_counter() - start)
+            results = response['results'] if batch_size > 1 else [response]
+            errors.extend(result['error'] for result in results if 'error' in result)
+    finally:
+        connection.close()
+
+def run_api_load_test(clients, requests, batch_size=1, difficulty='pro', dimension=3, win_length=None, url=None, seed=0):
+    '''
+    Runs clients concurrently against server at url, or against a server started in this process.
+    Returns tuple of sorted request latencies in seconds, elapsed wall clock seconds, list of error messages
+    and server counters from /stats.
+    '''
+    server = None
+    if url is None:
+        server = create_server(port=0, service=MoveService())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        (host, port) = server.server_address[:2]
+    else:
+        parts = urlsplit(url)
+        (host, port) = (parts.hostname, parts.port or 80)
+    (latencies, errors) = ([], [])
+    threads = [threading.Thread(target=run_client, args=(host, port, requests, batch_size, difficulty, dimension, win_length,
+                                random.Random(seed + index), latencies, errors)) for index in range(clients)]
+    start = time.perf_counter()
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        connection = http.client.HTTPConnection(host, port)
+        connection.request('GET', '/stats')
+        stats = json.loads(connection.getresponse().read())
+        connection.close()
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            server.batcher.close()
+            server.batcher.service.shutdown()
+    return (sorted(latencies), elapsed, errors, stats)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Sends concurrent move requests to the move API server and reports throughput and latency.')
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=100, help='Requests sent by every client.')
+    parser.add_argument('--batch-size', type=int, default=1, help='Positions per request.')
+    parser.add_argument('--difficulty', default='pro')
+    parser.add_argument('--dimension', type=int, default=3)
+    parser.add_argument('--win-length', type=int, default=None)
+    parser.add_argument('--url', default=None, help='Server to load, by default one started in this process.')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    (latencies, elapsed_sec, errors, stats) = run_api_load_test(args.clients, args.requests, args.batch_size, args.difficulty,
+        args.dimension, args.win_length, args.url, args.seed)
+    print('%d clients, %d requests of %d positions in %.2f sec: %.0f requests/s, %.0f positions/s' % (args.clients, len(latencies),
+        args.batch_size, elapsed_sec, len(latencies) / elapsed_sec, len(latencies) * args.batch_size / elapsed_sec))
+    print('request latency p50 %.3f ms, p99 %.3f ms, max %.3f ms' % (1000 * get_percentile(latencies, 50), 1000 * get_percentile(latencies, 99),
+        1000 * (latencies[-1] if latencies else 0)))
+    print('server: %d batches (largest %d), %d positions, %d unique, %d cache hits, %d searches, %d errors' % (stats['batches'],
+        stats['largest_batch'], stats['positions'], stats['unique_positions'], stats['cache_hits'], stats['searches'], len(errors)))
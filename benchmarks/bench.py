@@ -0,0 +1,208 @@
+'''
+Benchmark suite for engine and UI hot paths.
+
+Usage:
+    python benchmarks/bench.py --output results.json
+    python benchmarks/bench.py --output results.json --compare baseline.json --threshold 0.25
+
+With --compare, exits with status 1 if any metric present in baseline got worse by more than threshold.
+All metrics are lower is better. Computer delay is disabled while benchmarking.
+'''
+import argparse
+import json
+import platform
+import random
+import sys, os.path
+import time
+src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
+sys.path.append(src_path)
+
+import consts
+import computer
+import game
+from bitboard import BitBoard
+from board import Board
+from computer import SearchStats, get_best_move, get_best_move_within_budget, get_computer_by_difficulty, minimax
+from mcts import MCTSComputer
+from model import Difficulty,Move
+from parallel_search import close_search_pool, get_best_move_parallel
+from transposition import TranspositionTable
+
+# Positions as (X cells, O cells). Player to move is X if both have same number of moves, else O.
+POSITIONS = {
+    'opening': ([(0,0)], []),
+    'midgame': ([(0,0),(2,2)], [(1,1)]),
+    'endgame': ([(0,0),(0,2),(2,1)], [(1,1),(0,1),(2,0)]),
+}
+LARGE_BOARD_POSITION = (5, 4, [(1,1)], [(2,2)])
+LARGE_BOARD_SEARCH_DEPTH = 4
+# Whole games are not benchmarked for Monte Carlo, its moves take a fixed playout budget which bench_mcts measures.
+GAME_DIFFICULTIES = (Difficulty.EASY, Difficulty.INTERMEDIATE, Difficulty.PRO)
+MCTS_BOARDS = ((3, 3), (5, 4))
+MCTS_PLAYOUTS = 20000
+PARALLEL_SEARCH_DEPTH = 6
+
+
+def disable_computer_delay():
+    consts.COMPUTER_DELAY_SEC = 0
+    computer.COMPUTER_DELAY_SEC = 0
+    game.COMPUTER_DELAY_SEC = 0
+
+def make_position(x_cells, o_cells, dimension=3, win_length=None):
+    bitboard = BitBoard(dimension=dimension, win_length=win_length)
+    for (row, col) in x_cells:
+        bitboard.set_cell(row, col, Move.X)
+    for (row, col) in o_cells:
+        bitboard.set_cell(row, col, Move.O)
+    marker = Move.X if len(x_cells) == len(o_cells) else Move.O
+    return (bitboard, marker)
+
+def measure(func, repeat=5, number=None, min_time=0.05):
+    '''
+    Returns best time of a single func call in seconds, out of repeat rounds of number calls each.
+    If number is not given, it is chosen so that one round takes at least min_time.
+    '''
+    if number is None:
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            if time.perf_counter() - start >= min_time:
+                break
+            number *= 2
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+def bench_search(metrics):
+    for (phase, (x_cells, o_cells)) in POSITIONS.items():
+        (bitboard, marker) = make_position(x_cells, o_cells)
+        stats = SearchStats()
+        get_best_move(bitboard.get_available_moves(), bitboard, marker, TranspositionTable(), stats)
+        metrics['search.%s.nodes' % phase] = stats.nodes
+        metrics['search.%s.sec' % phase] = measure(lambda: get_best_move(bitboard.get_available_moves(), bitboard, marker, TranspositionTable()))
+    stats = SearchStats()
+    minimax(True, BitBoard(), Move.X, TranspositionTable(), stats)
+    metrics['minimax.empty_board.nodes'] = stats.nodes
+    metrics['minimax.empty_board.sec'] = measure(lambda: minimax(True, BitBoard(), Move.X, TranspositionTable()), repeat=3)
+    (dimension, win_length, x_cells, o_cells) = LARGE_BOARD_POSITION
+    (bitboard, marker) = make_position(x_cells, o_cells, dimension, win_length)
+    search = lambda stats=None: get_best_move_within_budget(bitboard.get_available_moves(), bitboard, marker, time_budget=None, max_depth=LARGE_BOARD_SEARCH_DEPTH, stats=stats)
+    stats = SearchStats()
+    search(stats)
+    metrics['alphabeta.%dx%d_k%d.depth%d.nodes' % (dimension, dimension, win_length, LARGE_BOARD_SEARCH_DEPTH)] = stats.nodes
+    metrics['alphabeta.%dx%d_k%d.depth%d.sec' % (dimension, dimension, win_length, LARGE_BOARD_SEARCH_DEPTH)] = measure(search, repeat=3)
+
+def bench_computer_moves(metrics):
+    for difficulty in Difficulty:
+        for (phase, (x_cells, o_cells)) in POSITIONS.items():
+            (bitboard, marker) = make_position(x_cells, o_cells)
+            board = bitboard.to_board()
+            computer_player = get_computer_by_difficulty(difficulty)
+            metrics['move.%s.%s.sec' % (difficulty.name.lower(), phase)] = measure(lambda: computer_player.choose_move(board, marker))
+
+def bench_games(metrics, games=20):
+    for difficulty in GAME_DIFFICULTIES:
+        rng = random.Random(0)
+        def play_games():
+            for _ in range(games):
+                tic_tac_toe = game.TicTacToe(difficulty=difficulty)
+                tic_tac_toe.reset_game_state()
+                while not tic_tac_toe.game_ended:
+                    (row, col) = rng.choice(tic_tac_toe.board.get_available_moves())
+                    tic_tac_toe.make_move(row, col)
+        metrics['game.%s.sec' % difficulty.name.lower()] = measure(play_games, repeat=3, number=1) / games
+
+def bench_mcts(metrics):
+    for (dimension, win_length) in MCTS_BOARDS:
+        sec_per_playout = float('inf')
+        for _ in range(3):
+            computer_player = MCTSComputer(time_budget=None, playouts=MCTS_PLAYOUTS)
+            computer_player.choose_move(BitBoard(dimension=dimension, win_length=win_length), Move.X)
+            sec_per_playout = min(sec_per_playout, computer_player.last_search_sec / computer_player.last_playouts)
+        metrics['mcts.%dx%d_k%d.sec_per_playout' % (dimension, dimension, win_length)] = sec_per_playout
+
+def get_parallel_process_counts():
+    return sorted({1, 2, os.cpu_count() or 1})
+
+def bench_parallel_search(metrics):
+    '''
+    Measures parallel root split search of large board position for 1, 2 and all cores against sequential search.
+    sec_ratio is parallel over sequential time, so speedup is its inverse and, like other metrics, lower is better.
+    '''
+    (dimension, win_length, x_cells, o_cells) = LARGE_BOARD_POSITION
+    (bitboard, marker) = make_position(x_cells, o_cells, dimension, win_length)
+    prefix = 'parallel_search.%dx%d_k%d.depth%d' % (dimension, dimension, win_length, PARALLEL_SEARCH_DEPTH)
+    sequential_sec = measure(lambda: get_best_move_within_budget(bitboard.get_available_moves(), bitboard, marker, time_budget=None,
+                                                                 max_depth=PARALLEL_SEARCH_DEPTH), repeat=3, number=1)
+    metrics['%s.sequential.sec' % prefix] = sequential_sec
+    for processes in get_parallel_process_counts():
+        search = lambda stats=None: get_best_move_parallel(bitboard.get_available_moves(), bitboard, marker, PARALLEL_SEARCH_DEPTH, processes, stats)
+        stats = SearchStats()
+        # First search also starts the process pool, which is not measured.
+        search(stats)
+        metrics['%s.p%d.nodes' % (prefix, processes)] = stats.nodes
+        metrics['%s.p%d.sec' % (prefix, processes)] = parallel_sec = measure(search, repeat=3, number=1)
+        metrics['%s.p%d.sec_ratio' % (prefix, processes)] = parallel_sec / sequential_sec
+    close_search_pool()
+
+def bench_board(metrics):
+    (bitboard, _) = make_position(*POSITIONS['midgame'])
+    board = bitboard.to_board()
+    metrics['board.get_game_state.sec'] = measure(board.get_game_state)
+    metrics['board.copy.sec'] = measure(lambda: Board(board.get_board_grid()))
+    metrics['board.get_available_moves.sec'] = measure(board.get_available_moves)
+
+def bench_view(metrics):
+    from view import ViewRenderer
+    view = ViewRenderer()
+    view.make_move(1, 1)
+    metrics['view.board_view.sec'] = measure(view.board_view)
+
+def run_benchmarks():
+    disable_computer_delay()
+    metrics = {}
+    for bench in (bench_search, bench_computer_moves, bench_games, bench_mcts, bench_parallel_search, bench_board, bench_view):
+        bench(metrics)
+    return {'python': platform.python_version(), 'machine': platform.machine(), 'metrics': metrics}
+
+def compare_results(baseline, current, threshold):
+    '''
+    Returns list of (metric, baseline value, current value) for metrics which got worse than baseline by more than threshold ratio.
+    Metrics missing in either result are skipped.
+    '''
+    regressions = []
+    for (name, baseline_value) in baseline['metrics'].items():
+        current_value = current['metrics'].get(name)
+        if current_value is not None and current_value > baseline_value * (1 + threshold):
+            regressions.append((name, baseline_value, current_value))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Runs engine and UI benchmarks.')
+    parser.add_argument('--output', help='Path of JSON file to write results to.')
+    parser.add_argument('--compare', help='Path of baseline JSON results to compare with.')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed relative slowdown before a metric is a regression.')
+    args = parser.parse_args()
+    results = run_benchmarks()
+    for (name, value) in sorted(results['metrics'].items()):
+        print('%-40s %.6g' % (name, value))
+    for (name, value) in sorted(results['metrics'].items()):
+        if name.endswith('.sec_ratio'):
+            print('%s speedup %.2fx (%d cores)' % (name[:-len('.sec_ratio')], 1 / value, os.cpu_count() or 1))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare_results(json.load(file), results, args.threshold)
+        for (name, baseline_value, current_value) in regressions:
+            print('REGRESSION %s: %.6g -> %.6g' % (name, baseline_value, current_value))
+        if regressions:
+            sys.exit(1)
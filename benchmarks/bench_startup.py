@@ -0,0 +1,135 @@
+'''
+Startup time benchmark of CPython imports and of the Python payload of the Pyodide build in docs/app.js.
+
+Usage:
+    python benchmarks/bench_startup.py --output startup.json
+    python benchmarks/bench_startup.py --output startup.json --compare baseline.json --threshold 0.25
+
+Every import is timed in a new interpreter, so nothing is cached in sys.modules. Pyodide itself can not run here,
+so for the bundle its Python payload size, compile time and the packages it installs before first move are reported.
+All metrics are lower is better, results use same format as bench.py.
+'''
+import argparse
+import ast
+import json
+import platform
+import re
+import subprocess
+import sys, os.path
+import time
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+src_path = root_path + '/src/'
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench import compare_results
+
+# Layer name to module imported to start it.
+IMPORT_LAYERS = {
+    'engine': 'computer',
+    'game': 'game',
+    'ui': 'view',
+}
+DEFAULT_BUNDLE_PATH = os.path.join(root_path, 'docs', 'app.js')
+# Packages already loaded by interpreter startup (like site hooks) and private extension modules are not counted.
+IMPORT_SCRIPT = '''
+import sys, time
+loaded_at_start = set(sys.modules)
+start = time.perf_counter()
+import %s
+elapsed = time.perf_counter() - start
+third_party = sorted({name.split('.')[0] for name in set(sys.modules) - loaded_at_start if not name.startswith('_')}
+                     - set(sys.stdlib_module_names) - {'cython_runtime', %s})
+print(elapsed, ','.join(third_party))
+'''
+
+
+def get_local_modules():
+    return {file_name[:-3] for file_name in os.listdir(src_path) if file_name.endswith('.py')}
+
+def measure_import(module, repeat=5):
+    '''
+    Returns tuple of best time in seconds of importing module in a new interpreter and list of third party packages it loaded.
+    '''
+    local_modules = ', '.join(repr(name) for name in sorted(get_local_modules()))
+    best = float('inf')
+    third_party = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT % (module, local_modules)], cwd=src_path,
+                                check=True, capture_output=True, text=True).stdout.split()
+        best = min(best, float(output[0]))
+        third_party = output[1].split(',') if len(output) > 1 else []
+    return (best, third_party)
+
+def measure_interpreter_start(repeat=5):
+    '''
+    Returns best wall clock time in seconds of starting and stopping an interpreter which does nothing.
+    '''
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def extract_bundle_payload(source):
+    '''
+    Returns tuple of Python code embedded in app.js bundle source and list of packages the bundle installs before running it.
+    '''
+    code = re.search(r'const code = `(.*?)`', source, re.DOTALL)
+    packages = re.search(r'const env_spec = \[(.*?)\]', source, re.DOTALL)
+    if code is None:
+        raise ValueError('No Python payload found in bundle')
+    package_names = re.findall(r"'([^']+)'", packages.group(1)) if packages else []
+    return (code.group(1), package_names)
+
+def bench_imports(metrics):
+    metrics['startup.interpreter.sec'] = measure_interpreter_start()
+    for (layer, module) in IMPORT_LAYERS.items():
+        (elapsed, third_party) = measure_import(module)
+        metrics['startup.import.%s.sec' % layer] = elapsed
+        metrics['startup.import.%s.third_party_packages' % layer] = len(third_party)
+
+def bench_bundle(metrics, path=DEFAULT_BUNDLE_PATH):
+    with open(path) as file:
+        (code, packages) = extract_bundle_payload(file.read())
+    metrics['bundle.payload.bytes'] = len(code.encode())
+    metrics['bundle.payload.lines'] = code.count('\n') + 1
+    metrics['bundle.payload.compile.sec'] = min(measure_compile(code) for _ in range(5))
+    metrics['bundle.packages'] = len(packages)
+
+def measure_compile(code):
+    # Pyodide runs the payload with top level await allowed.
+    start = time.perf_counter()
+    compile(code, 'app.js', 'exec', flags=ast.PyCF_ALLOW_TOP_LEVEL_AWAIT)
+    return time.perf_counter() - start
+
+def run_benchmarks(bundle_path=DEFAULT_BUNDLE_PATH):
+    metrics = {}
+    bench_imports(metrics)
+    if os.path.exists(bundle_path):
+        bench_bundle(metrics, bundle_path)
+    return {'python': platform.python_version(), 'machine': platform.machine(), 'metrics': metrics}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Runs startup time benchmarks.')
+    parser.add_argument('--bundle', default=DEFAULT_BUNDLE_PATH, help='Path of Pyodide app.js bundle.')
+    parser.add_argument('--output', help='Path of JSON file to write results to.')
+    parser.add_argument('--compare', help='Path of baseline JSON results to compare with.')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed relative slowdown before a metric is a regression.')
+    args = parser.parse_args()
+    results = run_benchmarks(args.bundle)
+    for (name, value) in sorted(results['metrics'].items()):
+        print('%-45s %.6g' % (name, value))
+    for (layer, module) in IMPORT_LAYERS.items():
+        print('%s layer (import %s) loads: %s' % (layer, module, ', '.join(measure_import(module, repeat=1)[1]) or 'no third party packages'))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare_results(json.load(file), results, args.threshold)
+        for (name, baseline_value, current_value) in regressions:
+            print('REGRESSION %s: %.6g -> %.6g' % (name, baseline_value, current_value))
+        if regressions:
+            sys.exit(1)
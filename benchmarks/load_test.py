@@ -0,0 +1,92 @@
+'''
+Load test of computer moves for many concurrent game sessions in one process.
+
+Usage:
+    python benchmarks/load_test.py --sessions 500 --games 5 --difficulty pro
+    python benchmarks/load_test.py --sessions 500 --games 5 --difficulty pro --unshared
+
+Every session is an asyncio task playing games against computer of given difficulty, user moves being random.
+Computer moves go through a shared MoveService, or with --unshared, every search runs separately on the
+event loop's default executor. Reports p50/p99 computer move latency, computer delay is not included.
+'''
+import argparse
+import asyncio
+import random
+import sys, os.path
+import time
+src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
+sys.path.append(src_path)
+
+from bitboard import BitBoard
+from computer import get_computer_by_difficulty
+from model import Difficulty,GameStatus,Move
+from move_service import MoveService
+
+
+def get_percentile(sorted_values, percentile):
+    '''
+    Returns nearest rank percentile of sorted list of values.
+    '''
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * percentile // 100))
+    return sorted_values[int(rank) - 1]
+
+async def play_session(session_index, difficulty, games, dimension, win_length, service, latencies, seed):
+    rng = random.Random(seed + session_index)
+    loop = asyncio.get_running_loop()
+    for game_index in range(games):
+        board = BitBoard(dimension=dimension, win_length=win_length)
+        computer = get_computer_by_difficulty(difficulty)
+        computer_marker = Move.O if game_index % 2 == 0 else Move.X
+        marker = Move.X
+        while board.get_game_state()[0] == GameStatus.IN_PROGRESS:
+            if marker == computer_marker:
+                start = time.perf_counter()
+                if service is not None:
+                    (row, col) = await service.get_move(computer, board.snapshot(), marker)
+                else:
+                    (row, col) = await loop.run_in_executor(None, computer.choose_move, board.snapshot(), marker)
+                latencies.append(time.perf_counter() - start)
+            else:
+                (row, col) = rng.choice(board.get_available_moves())
+                # Like a user, yield to other sessions between moves.
+                await asyncio.sleep(0)
+            board.set_cell(row, col, marker)
+            marker = Move.O if marker == Move.X else Move.X
+
+async def run_load_test(sessions, difficulty, games, dimension=3, win_length=None, workers=None, unshared=False, seed=0):
+    '''
+    Plays games of all sessions concurrently. Returns tuple of sorted computer move latencies in seconds,
+    elapsed wall clock seconds and the MoveService used (None if unshared).
+    '''
+    service = None if unshared else MoveService(max_workers=workers) if workers else MoveService()
+    latencies = []
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(play_session(index, difficulty, games, dimension, win_length, service, latencies, seed) for index in range(sessions)))
+    finally:
+        if service is not None:
+            service.shutdown()
+    return (sorted(latencies), time.perf_counter() - start, service)
+
+
+if __name__ == '__main__':
+    difficulties = {difficulty.name.lower(): difficulty for difficulty in Difficulty}
+    parser = argparse.ArgumentParser(description='Simulates concurrent game sessions and reports computer move latency.')
+    parser.add_argument('--sessions', type=int, default=100)
+    parser.add_argument('--games', type=int, default=5, help='Games played by every session.')
+    parser.add_argument('--difficulty', choices=difficulties.keys(), default='pro')
+    parser.add_argument('--dimension', type=int, default=3)
+    parser.add_argument('--win-length', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None, help='Move service worker threads.')
+    parser.add_argument('--unshared', action='store_true', help='Run every search separately instead of through the move service.')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    (latencies, elapsed_sec, service) = asyncio.run(run_load_test(args.sessions, difficulties[args.difficulty], args.games,
+        args.dimension, args.win_length, args.workers, args.unshared, args.seed))
+    print('%d sessions, %d computer moves in %.2f sec' % (args.sessions, len(latencies), elapsed_sec))
+    print('move latency p50 %.3f ms, p99 %.3f ms, max %.3f ms' % (1000 * get_percentile(latencies, 50), 1000 * get_percentile(latencies, 99),
+        1000 * (latencies[-1] if latencies else 0)))
+    if service is not None:
+        print('move service: %d requests, %d cache hits, %d coalesced, %d searches' % (service.requests, service.cache_hits, service.coalesced, service.searches))
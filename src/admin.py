@@ -0,0 +1,30 @@
+import panel as pn
+from instrumentation import METRICS
+
+# Admin page with computer move metrics, not linked from the game. Served together with the game:
+# TICTACTOE_INSTRUMENTATION=1 panel serve app.py admin.py
+REFRESH_PERIOD_MS = 2000
+
+def get_summary():
+    '''
+    Returns markdown table with number of moves, mean latency, mean nodes, cache hits, coalesced moves and mistakes per difficulty.
+    '''
+    lines = ['| Difficulty | Moves | Mean latency (ms) | Mean nodes | Cache hits | Coalesced | Mistakes |', '|---|---|---|---|---|---|---|']
+    for (name, aggregate) in sorted(METRICS.get_difficulty_metrics().items()):
+        moves = max(aggregate.moves, 1)
+        lines.append('| %s | %d | %.2f | %.0f | %d | %d | %d |' % (name, aggregate.moves, 1000 * aggregate.search_sec / moves,
+                                                                 aggregate.nodes / moves, aggregate.cache_hits, aggregate.coalesced, aggregate.mistakes))
+    last_move = METRICS.last_move
+    if last_move is not None:
+        lines.append('\nLast move: %s %s in %.2f ms' % (last_move.difficulty.value if last_move.difficulty else 'Unknown', last_move.move, 1000 * last_move.search_sec))
+    return '\n'.join(lines)
+
+summary = pn.pane.Markdown(get_summary())
+prometheus_text = pn.pane.Str(METRICS.render_prometheus())
+
+def refresh():
+    summary.object = get_summary()
+    prometheus_text.object = METRICS.render_prometheus()
+
+pn.state.add_periodic_callback(refresh, period=REFRESH_PERIOD_MS)
+pn.Column('# Computer move metrics', summary, '## Prometheus metrics', prometheus_text).servable(title='TIC TAC TOE admin')
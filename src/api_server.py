@@ -0,0 +1,283 @@
+import argparse
+import json
+import math
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler,ThreadingHTTPServer
+from model import Difficulty,GameStatus,Move
+from bitboard import BitBoard
+from computer import get_computer_by_difficulty
+from move_service import MoveService,SHARED_MOVE_SERVICE,copy_result,join_search
+from consts import API_BATCH_WINDOW_SEC,API_LISTEN_BACKLOG,API_MAX_BATCH_SIZE,API_MAX_DIMENSION,API_MAX_POSITIONS_PER_REQUEST,API_PORT
+
+try:
+    from batch import STATUS_IN_PROGRESS,evaluate_positions,positions_from_bitboards
+except ImportError:
+    # Without numpy, finished positions are found one by one.
+    evaluate_positions = None
+
+DIFFICULTIES = {difficulty.name.lower(): difficulty for difficulty in Difficulty}
+CELL_MOVES = {'X': Move.X, 'O': Move.O, '.': Move.EMPTY}
+
+
+def parse_position(data):
+    '''
+    Returns tuple of BitBoard, marker to move and Difficulty of one position of a request. Raises ValueError if it is invalid.
+    Position is a JSON object with 'board', a string of N*N cells row by row, each 'X', 'O' or '.' for empty, and optionally
+    'marker' to move (by default O if X has more moves, else X), 'win_length' (by default N) and 'difficulty' (by default 'pro').
+    '''
+    if not isinstance(data, dict) or not isinstance(data.get('board'), str):
+        raise ValueError("Position must be an object with a 'board' string")
+    cells = data['board'].upper()
+    dimension = math.isqrt(len(cells))
+    if dimension*dimension != len(cells) or not 2 <= dimension <= API_MAX_DIMENSION:
+        raise ValueError('Board must have N*N cells with N from 2 to %d' % API_MAX_DIMENSION)
+    win_length = data.get('win_length', dimension)
+    if not isinstance(win_length, int) or not 2 <= win_length <= dimension:
+        raise ValueError('Win length must be from 2 to %d' % dimension)
+    bitboard = BitBoard(dimension=dimension, win_length=win_length)
+    for (index, cell) in enumerate(cells):
+        if cell not in CELL_MOVES:
+            raise ValueError("Board cells must be 'X', 'O' or '.'")
+        if CELL_MOVES[cell] is not Move.EMPTY:
+            bitboard.set_cell(index // dimension, index % dimension, CELL_MOVES[cell])
+    marker = data.get('marker', 'O' if bitboard.x_mask.bit_count() > bitboard.o_mask.bit_count() else 'X')
+    if marker not in ('X', 'O'):
+        raise ValueError("Marker must be 'X' or 'O'")
+    difficulty = data.get('difficulty', 'pro')
+    if not isinstance(difficulty, str) or difficulty not in DIFFICULTIES:
+        raise ValueError('Difficulty must be one of %s' % ', '.join(DIFFICULTIES))
+    return (bitboard, CELL_MOVES[marker], DIFFICULTIES[difficulty])
+
+def get_unfinished(bitboards):
+    '''
+    Returns list of booleans, True for every BitBoard whose game is still in progress.
+    Boards of same geometry are evaluated together by batch.evaluate_positions when numpy is available.
+    '''
+    if evaluate_positions is None:
+        return [bitboard.get_game_state()[0] == GameStatus.IN_PROGRESS for bitboard in bitboards]
+    groups = {}
+    for (index, bitboard) in enumerate(bitboards):
+        groups.setdefault((bitboard.dimension, bitboard.win_length), []).append(index)
+    unfinished = [False] * len(bitboards)
+    for ((_, win_length), indices) in groups.items():
+        (status, _, _) = evaluate_positions(positions_from_bitboards([bitboards[index] for index in indices]), win_length)
+        for (index, position_status) in zip(indices, status):
+            unfinished[index] = position_status == STATUS_IN_PROGRESS
+    return unfinished
+
+
+class MoveBatcher:
+    """
+    Collects optimal move lookups of concurrent requests into batches. A batch is closed window_sec seconds after its first
+    position arrives or when it has max_batch_size positions. Finished positions of a batch are found in one vectorized call,
+    identical positions are looked up once, and remaining positions go to move service, which answers them from its result cache
+    or runs their searches on its worker pool.
+
+    Attributes:
+        service (MoveService): Service computing and caching optimal moves.
+        window_sec (float): Seconds a batch waits for more positions after its first one.
+        max_batch_size (int): Maximum positions per batch.
+        batches (int): Number of batches processed.
+        positions (int): Number of positions submitted.
+        unique_positions (int): Number of distinct positions sent to move service.
+        largest_batch (int): Size of largest batch processed.
+
+    Methods:
+        submit(bitboard, marker): Returns concurrent.futures.Future of BestMoveSearch of optimal move, failing with ValueError if game is over.
+        close(): Stops batching thread, after processing positions already submitted.
+    """
+
+    def __init__(self, service: MoveService = SHARED_MOVE_SERVICE, window_sec=API_BATCH_WINDOW_SEC, max_batch_size=API_MAX_BATCH_SIZE):
+        self.service = service
+        self.window_sec = window_sec
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.positions = 0
+        self.unique_positions = 0
+        self.largest_batch = 0
+        self.__pending = []
+        self.__closed = False
+        self.__condition = threading.Condition()
+        self.__thread = threading.Thread(target=self.__run, name='move-batcher', daemon=True)
+        self.__thread.start()
+
+    def submit(self, bitboard: BitBoard, marker: Move):
+        future = Future()
+        with self.__condition:
+            if self.__closed:
+                raise ValueError('Move batcher is closed')
+            self.positions += 1
+            self.__pending.append((bitboard, marker, future))
+            self.__condition.notify()
+        return future
+
+    def close(self):
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify()
+        self.__thread.join()
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                while not self.__pending and not self.__closed:
+                    self.__condition.wait()
+                if not self.__pending:
+                    return
+                deadline = time.perf_counter() + self.window_sec
+                while len(self.__pending) < self.max_batch_size and not self.__closed and time.perf_counter() < deadline:
+                    self.__condition.wait(deadline - time.perf_counter())
+                batch = self.__pending[:self.max_batch_size]
+                del self.__pending[:self.max_batch_size]
+            self.__process(batch)
+
+    def __process(self, batch):
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        unfinished = get_unfinished([bitboard for (bitboard, _, _) in batch])
+        futures = {}
+        for ((bitboard, marker, future), in_progress) in zip(batch, unfinished):
+            if not in_progress:
+                future.set_exception(ValueError('Game is already over'))
+                continue
+            key = (bitboard.x_mask, bitboard.o_mask, bitboard.dimension, bitboard.win_length, marker)
+            if key not in futures:
+                try:
+                    futures[key] = self.service.submit_search(bitboard, marker)
+                except RuntimeError as error:
+                    # Move service was shut down.
+                    futures[key] = Future()
+                    futures[key].set_exception(error)
+                self.unique_positions += 1
+                source = futures[key]
+            else:
+                # Identical positions of a batch wait for first one's search, like coalesced requests of move service.
+                source = join_search(futures[key])
+            source.add_done_callback(lambda done, future=future: copy_result(done, future))
+
+
+class MoveRequestHandler(BaseHTTPRequestHandler):
+    '''
+    Stateless JSON API of computer moves:
+        POST /move with one position (see parse_position) returns {"move": [row, col]}, or status 400 and {"error": message}.
+        POST /move with {"positions": [position, ...]} returns {"results": [...]}, every result being {"move": [row, col]} or {"error": message}.
+            A request with more than server's max_positions positions gets status 413, so one request can not hold a handler thread indefinitely.
+        GET /stats returns counters of batcher and move service.
+    Every position gets a new computer of its difficulty, so Intermediate computer is as likely to make a mistake on every request.
+    '''
+    protocol_version = 'HTTP/1.1'
+    server_version = 'TicTacToeMoveAPI/1'
+
+    def do_POST(self):
+        if self.path != '/move':
+            return self.__send_json(404, {'error': 'Not found'})
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            # Body can not be skipped without its length, so connection can not be reused.
+            self.close_connection = True
+            return self.__send_json(400, {'error': 'Content-Length must be a non negative integer'})
+        try:
+            request = json.loads(self.rfile.read(length))
+        except ValueError:
+            return self.__send_json(400, {'error': 'Request body must be JSON'})
+        if isinstance(request, dict) and 'positions' in request:
+            if not isinstance(request['positions'], list):
+                return self.__send_json(400, {'error': "'positions' must be a list"})
+            if len(request['positions']) > self.server.max_positions:
+                return self.__send_json(413, {'error': 'At most %d positions per request' % self.server.max_positions})
+            return self.__send_json(200, {'results': self.__get_moves(request['positions'])})
+        result = self.__get_moves([request])[0]
+        self.__send_json(400 if 'error' in result else 200, result)
+
+    def do_GET(self):
+        if self.path != '/stats':
+            return self.__send_json(404, {'error': 'Not found'})
+        (batcher, service) = (self.server.batcher, self.server.batcher.service)
+        self.__send_json(200, {'requests': service.requests, 'cache_hits': service.cache_hits, 'coalesced': service.coalesced,
+            'searches': service.searches, 'batches': batcher.batches, 'positions': batcher.positions,
+            'unique_positions': batcher.unique_positions, 'largest_batch': batcher.largest_batch})
+
+    def log_message(self, format, *args):
+        pass
+
+    def __get_moves(self, positions):
+        # All positions of a request are submitted before waiting for any, so they can share a batch.
+        requests = []
+        for data in positions:
+            try:
+                (bitboard, marker, difficulty) = parse_position(data)
+            except ValueError as error:
+                requests.append(error)
+                continue
+            computer = get_computer_by_difficulty(difficulty)
+            best_future = self.server.batcher.submit(bitboard, marker) if computer.needs_best_move else None
+            requests.append((computer, bitboard, marker, best_future))
+        results = []
+        for request in requests:
+            if isinstance(request, ValueError):
+                results.append({'error': str(request)})
+                continue
+            (computer, bitboard, marker, best_future) = request
+            try:
+                # Batcher checks positions it looks up, others are checked here.
+                if best_future is None and bitboard.get_game_state()[0] != GameStatus.IN_PROGRESS:
+                    raise ValueError('Game is already over')
+                best_move_search = best_future.result() if best_future is not None else None
+                best_move = best_move_search.move if best_move_search is not None else None
+                results.append({'move': list(computer.choose_move(bitboard.snapshot(), marker, best_move, best_move_search))})
+            except ValueError as error:
+                results.append({'error': str(error)})
+        return results
+
+    def __send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MoveServer(ThreadingHTTPServer):
+    '''
+    HTTP server handling every connection on its own thread, with a listen backlog large enough for many clients connecting at once.
+    batcher is the MoveBatcher shared by all connections, max_positions is most positions accepted in one request.
+    '''
+    daemon_threads = True
+    request_queue_size = API_LISTEN_BACKLOG
+
+    def __init__(self, server_address, batcher: MoveBatcher, max_positions=API_MAX_POSITIONS_PER_REQUEST):
+        super().__init__(server_address, MoveRequestHandler)
+        self.batcher = batcher
+        self.max_positions = max_positions
+
+
+def create_server(host='127.0.0.1', port=API_PORT, service: MoveService = SHARED_MOVE_SERVICE, window_sec=API_BATCH_WINDOW_SEC,
+                  max_positions=API_MAX_POSITIONS_PER_REQUEST):
+    '''
+    Returns MoveServer with a new MoveBatcher over service, accepting at most max_positions positions per request.
+    Call serve_forever() to run it, and shutdown() followed by server_close() and batcher.close() to stop it.
+    '''
+    return MoveServer((host, port), MoveBatcher(service, window_sec), max_positions)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serves computer moves as a stateless JSON API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=API_PORT)
+    parser.add_argument('--max-positions', type=int, default=API_MAX_POSITIONS_PER_REQUEST, help='Most positions accepted in one request.')
+    args = parser.parse_args()
+    server = create_server(args.host, args.port, max_positions=args.max_positions)
+    print('Serving moves on http://%s:%d/move' % server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.batcher.close()
@@ -1,12 +1,20 @@
 import panel as pn
 from view import ViewRenderer
-from consts import GRID_SIZE
+from consts import GRID_SIZE,GAME_LOG_PATH,INSTRUMENTATION_ENABLED
+from computer import set_default_instrumentation
+from game_log import get_game_log_writer
+from instrumentation import METRICS
 
-viewObj = ViewRenderer()
+if INSTRUMENTATION_ENABLED:
+    set_default_instrumentation(METRICS)
+
+viewObj = ViewRenderer(game_log=get_game_log_writer(GAME_LOG_PATH) if GAME_LOG_PATH else None)
 resetButton = pn.widgets.Button(name='Reset Game', button_type='danger')
-sideViewParam = pn.Param(viewObj.param, parameters=['user_move_marker','difficulty','reset_button'], name='CONFIGURE GAME', widgets = {'reset_button': resetButton})
+hintButton = pn.widgets.Button(name='Hint', button_type='primary')
+sideViewParam = pn.Param(viewObj.param, parameters=['user_move_marker','difficulty','reset_button','hint_button'], name='CONFIGURE GAME',
+    widgets = {'reset_button': resetButton, 'hint_button': hintButton})
 
 bootstrap = pn.template.BootstrapTemplate(title='TIC TAC TOE')
 bootstrap.sidebar.append(pn.Card(sideViewParam))
-bootstrap.main.append(pn.Column(viewObj.game_message, viewObj.board_view))
+bootstrap.main.append(pn.Column(viewObj.game_message, viewObj.board_view()))
 bootstrap.servable()
\ No newline at end of file
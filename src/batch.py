@@ -0,0 +1,83 @@
+import numpy as np
+from model import Move,GameStatus
+from bitboard import get_line_masks
+
+# Cell values of position arrays
+CELL_EMPTY = 0
+CELL_X = 1
+CELL_O = -1
+# Status values returned by evaluate_positions
+STATUS_IN_PROGRESS = 0
+STATUS_WIN = 1
+STATUS_DRAW = 2
+
+STATUS_TO_GAME_STATUS = {STATUS_IN_PROGRESS: GameStatus.IN_PROGRESS, STATUS_WIN: GameStatus.WIN, STATUS_DRAW: GameStatus.DRAW}
+CELL_TO_MOVE = {CELL_EMPTY: Move.EMPTY, CELL_X: Move.X, CELL_O: Move.O}
+
+_LINE_CELLS_CACHE = {}
+
+def get_line_cells(dimension, win_length=None):
+    '''
+    Returns (lines, win_length) array of flat cell indexes of every winning line, in same order as get_line_masks.
+    '''
+    win_length = win_length or dimension
+    if (dimension, win_length) not in _LINE_CELLS_CACHE:
+        _LINE_CELLS_CACHE[(dimension, win_length)] = np.array(
+            [[row*dimension + col for (row, col) in cells] for (_, cells) in get_line_masks(dimension, win_length)], dtype=np.intp)
+    return _LINE_CELLS_CACHE[(dimension, win_length)]
+
+def evaluate_positions(positions, win_length=None):
+    '''
+    Evaluates game state of M positions at once.
+    positions is a (M, N, N) int8 array with CELL_EMPTY, CELL_X or CELL_O for every cell.
+    Returns tuple of 3 arrays of length M:
+        status: STATUS_IN_PROGRESS, STATUS_WIN or STATUS_DRAW.
+        winner: CELL_X or CELL_O for won positions, CELL_EMPTY otherwise.
+        line_index: index of winning line as ordered by get_line_masks, -1 if position is not won.
+    If more than one line is completed, first one is reported, same as Board.get_game_state.
+    '''
+    positions = np.asarray(positions, dtype=np.int8)
+    (count, dimension) = positions.shape[:2]
+    win_length = win_length or dimension
+    cells = positions.reshape(count, dimension*dimension)
+    line_sums = cells[:, get_line_cells(dimension, win_length)].sum(axis=2, dtype=np.int16)
+    completed = np.abs(line_sums) == win_length
+    won = completed.any(axis=1)
+    line_index = np.where(won, completed.argmax(axis=1), -1)
+    winner = np.where(won, np.sign(line_sums[np.arange(count), np.maximum(line_index, 0)]), CELL_EMPTY).astype(np.int8)
+    full = (cells != CELL_EMPTY).all(axis=1)
+    status = np.where(won, STATUS_WIN, np.where(full, STATUS_DRAW, STATUS_IN_PROGRESS)).astype(np.int8)
+    return (status, winner, line_index)
+
+def get_legal_moves_mask(positions, win_length=None):
+    '''
+    Returns (M, N, N) boolean array which is True for every empty cell of positions where game is still in progress.
+    '''
+    positions = np.asarray(positions, dtype=np.int8)
+    (status, _, _) = evaluate_positions(positions, win_length)
+    return (positions == CELL_EMPTY) & (status == STATUS_IN_PROGRESS)[:, None, None]
+
+def positions_from_masks(x_masks, o_masks, dimension):
+    '''
+    Returns (M, N, N) int8 position array from arrays of BitBoard x_mask and o_mask values.
+    Masks are handled as int64, so dimension can be at most 7.
+    '''
+    bits = np.arange(dimension*dimension, dtype=np.int64)
+    x_cells = (np.asarray(x_masks, dtype=np.int64)[:, None] >> bits) & 1
+    o_cells = (np.asarray(o_masks, dtype=np.int64)[:, None] >> bits) & 1
+    return (x_cells - o_cells).astype(np.int8).reshape(-1, dimension, dimension)
+
+def positions_from_bitboards(bitboards):
+    '''
+    Returns (M, N, N) int8 position array for a list of BitBoard of same dimension.
+    '''
+    return positions_from_masks([bitboard.x_mask for bitboard in bitboards], [bitboard.o_mask for bitboard in bitboards], bitboards[0].dimension)
+
+def to_game_state(status, winner, line_index, dimension, win_length=None):
+    '''
+    Converts one result of evaluate_positions to game state tuple returned by Board.get_game_state.
+    '''
+    game_status = STATUS_TO_GAME_STATUS[int(status)]
+    if game_status == GameStatus.WIN:
+        return (game_status, CELL_TO_MOVE[int(winner)], get_line_masks(dimension, win_length)[int(line_index)][1])
+    return (game_status,)
@@ -0,0 +1,165 @@
+from typing import NamedTuple
+from model import Move, GameStatus
+from consts import BOARD_DIMENSION
+
+_LINE_MASKS_CACHE = {}
+
+def get_line_masks(dimension=BOARD_DIMENSION, win_length=None):
+    '''
+    Returns precomputed winning line masks for a board of given dimension, as a tuple of (mask, cells) pairs.
+    A winning line is any run of win_length cells in a row, column or diagonal, win_length defaults to dimension.
+    Lines are ordered as rows, columns, diagonals and anti diagonals, same as Board.get_game_state checks them.
+    '''
+    win_length = win_length or dimension
+    if (dimension, win_length) not in _LINE_MASKS_CACHE:
+        last_start = dimension - win_length
+        lines = []
+        for row in range(dimension):
+            for col in range(last_start+1):
+                lines.append(tuple((row, col+i) for i in range(win_length)))
+        for col in range(dimension):
+            for row in range(last_start+1):
+                lines.append(tuple((row+i, col) for i in range(win_length)))
+        for row in range(last_start+1):
+            for col in range(last_start+1):
+                lines.append(tuple((row+i, col+i) for i in range(win_length)))
+        for row in range(last_start+1):
+            for col in range(win_length-1, dimension):
+                lines.append(tuple((row+i, col-i) for i in range(win_length)))
+        _LINE_MASKS_CACHE[(dimension, win_length)] = tuple((sum(1 << (row*dimension + col) for (row,col) in cells), cells) for cells in lines)
+    return _LINE_MASKS_CACHE[(dimension, win_length)]
+
+def get_win_masks(dimension=BOARD_DIMENSION, win_length=None):
+    '''
+    Returns only the bitmasks of winning lines for a board of given dimension.
+    '''
+    return tuple(mask for (mask, _) in get_line_masks(dimension, win_length))
+
+def get_cell_win_masks(dimension=BOARD_DIMENSION, win_length=None):
+    '''
+    Returns a tuple having, for every cell index, the bitmasks of winning lines passing through that cell.
+    Used to check in constant time whether last move made has won the game.
+    '''
+    win_masks = get_win_masks(dimension, win_length)
+    return tuple(tuple(mask for mask in win_masks if mask >> index & 1) for index in range(dimension*dimension))
+
+
+class BoardSnapshot(NamedTuple):
+    '''
+    Immutable snapshot of a board, cheap to create and to pass to computer implementations.
+    '''
+    x_mask: int
+    o_mask: int
+    dimension: int = BOARD_DIMENSION
+    win_length: int = BOARD_DIMENSION
+
+
+class BitBoard:
+    """
+    The BitBoard class is a compact engine-side representation of the TicTacToe board.
+    Moves of each player are stored as an integer bitmask where bit (row*dimension + col) is set if player occupies the cell.
+
+    Attributes:
+        x_mask (int): Bitmask of cells occupied by Move.X.
+        o_mask (int): Bitmask of cells occupied by Move.O.
+        dimension (int): Number of rows and columns of the board.
+        win_length (int): Number of same moves in a row, column or diagonal needed to win.
+
+    Methods:
+        from_board(board): Creates a BitBoard from a Board object.
+        from_snapshot(snapshot): Creates a BitBoard from a BoardSnapshot.
+        snapshot(): Returns immutable BoardSnapshot of the board.
+        to_board(): Converts BitBoard back to a Board object having Cell grid.
+        get_available_moves(): Returns a list of available moves, represented as tuples of row and column indices.
+        get_game_state(): Returns the current state of the game, in the same format as Board.get_game_state.
+        get_move(row, col): Returns the Move at a given row and column.
+        set_cell(row, col, move): Sets the move for a given cell.
+        get_free_mask(): Returns bitmask of empty cells.
+        get_mask(move): Returns bitmask of cells occupied by a given move.
+    """
+
+    __slots__ = ('x_mask', 'o_mask', 'dimension', 'win_length', 'full_mask')
+
+    def __init__(self, x_mask=0, o_mask=0, dimension=BOARD_DIMENSION, win_length=None):
+        self.x_mask = x_mask
+        self.o_mask = o_mask
+        self.dimension = dimension
+        self.win_length = win_length or dimension
+        self.full_mask = (1 << (dimension*dimension)) - 1
+
+    @classmethod
+    def from_board(cls, board):
+        return cls.from_snapshot(board.snapshot())
+
+    @classmethod
+    def from_snapshot(cls, snapshot: BoardSnapshot):
+        return cls(snapshot.x_mask, snapshot.o_mask, snapshot.dimension, snapshot.win_length)
+
+    def snapshot(self):
+        return BoardSnapshot(self.x_mask, self.o_mask, self.dimension, self.win_length)
+
+    def to_board(self):
+        from board import Board
+        board = Board(dimension=self.dimension, win_length=self.win_length)
+        for row in range(self.dimension):
+            for col in range(self.dimension):
+                move = self.get_move(row, col)
+                if move is not Move.EMPTY:
+                    board.set_cell(row, col, move)
+        return board
+
+    def get_free_mask(self):
+        return self.full_mask & ~(self.x_mask | self.o_mask)
+
+    def get_mask(self, move: Move):
+        return self.x_mask if move == Move.X else self.o_mask
+
+    def get_available_moves(self):
+        available_moves = []
+        free_mask = self.get_free_mask()
+        while free_mask:
+            bit = free_mask & -free_mask
+            available_moves.append(divmod(bit.bit_length() - 1, self.dimension))
+            free_mask ^= bit
+        return available_moves
+
+    def get_game_state(self):
+        '''
+        Returns the current state of the game, represented as a tuple of GameStatus and additional information if GameStatus is WIN.
+        Additional information includes winning move marker and cell indexes which are part of the win represented as tuple of row,col.
+        '''
+        for (mask, cells) in get_line_masks(self.dimension, self.win_length):
+            if self.x_mask & mask == mask:
+                return (GameStatus.WIN, Move.X, cells)
+            if self.o_mask & mask == mask:
+                return (GameStatus.WIN, Move.O, cells)
+        if not self.get_free_mask():
+            return (GameStatus.DRAW,)
+        return (GameStatus.IN_PROGRESS,)
+
+    def get_move(self, row, col):
+        bit = 1 << (row*self.dimension + col)
+        if self.x_mask & bit:
+            return Move.X
+        if self.o_mask & bit:
+            return Move.O
+        return Move.EMPTY
+
+    def set_cell(self, row, col, move: Move):
+        bit = 1 << (row*self.dimension + col)
+        self.x_mask &= ~bit
+        self.o_mask &= ~bit
+        if move == Move.X:
+            self.x_mask |= bit
+        elif move == Move.O:
+            self.o_mask |= bit
+
+
+def has_won(mask, win_masks):
+    '''
+    Returns True if given player bitmask completely covers any of the given winning line masks.
+    '''
+    for win_mask in win_masks:
+        if mask & win_mask == win_mask:
+            return True
+    return False
@@ -1,66 +1,102 @@
 from model import Cell, Move, GameStatus
+from bitboard import BoardSnapshot,get_line_masks
 from consts import BOARD_DIMENSION
 
+_CELL_LINES_CACHE = {}
+
+def get_cell_lines(dimension=BOARD_DIMENSION, win_length=None):
+    '''
+    Returns a 2D list having, for every cell, indexes of winning lines (as ordered by get_line_masks) passing through that cell.
+    '''
+    win_length = win_length or dimension
+    if (dimension, win_length) not in _CELL_LINES_CACHE:
+        cell_lines = [[[] for col in range(dimension)] for row in range(dimension)]
+        for (line_index, (_, cells)) in enumerate(get_line_masks(dimension, win_length)):
+            for (row, col) in cells:
+                cell_lines[row][col].append(line_index)
+        _CELL_LINES_CACHE[(dimension, win_length)] = cell_lines
+    return _CELL_LINES_CACHE[(dimension, win_length)]
+
 class Board:
     """
     The Board class represents the game board of TicTacToe.
+    Board keeps count of moves of each player in every winning line and a bitmask of free cells, updated on every set_cell,
+    so game state and available moves are known without scanning the grid. Hence cell moves must only be changed by set_cell.
 
     Attributes:
         board_grid (list[list[Cell]]): A 2D list of Cell representing the current state of the board.
+        dimension (int): Number of rows and columns of the board.
+        win_length (int): Number of same moves in a row, column or diagonal needed to win. Defaults to dimension.
     
     Methods:
-        __init__(board_grid=None): Initializes a new Board object with a given board grid.
+        __init__(board_grid=None, dimension=BOARD_DIMENSION, win_length=None): Initializes a new Board object with a given board grid or given dimension.
+        reset_board(): Sets all cells to empty.
         get_available_moves(): Returns a list of available moves, represented as tuples of row and column indices.
+        iter_available_moves(): Yields available moves in same order as get_available_moves.
+        snapshot(): Returns immutable BoardSnapshot of the board, used to pass board to computer without copying cells.
         get_game_state(): Returns the current state of the game, represented as a tuple of GameStatus and additional information if GameStatus is WIN.
-        __check_end_condition_by_moves(move1: Move, move2: Move, move3: Move): Returns True if three given moves are same and not empty.
+        __reset_tracking(): Resets line counts and free cells tracked for an empty board.
         get_board_grid(): Returns the 2D game board.
         get_cell(row, col): Returns the Cell object at a given row and column for game board.
         set_cell(row, col, move, winning_cell=False): Sets the move for a given cell and sets it as a winning cell if specified.
     """
 
-    def __init__(self, board_grid=None):
+    def __init__(self, board_grid=None, dimension=BOARD_DIMENSION, win_length=None):
         if board_grid:
-            self.board_grid = [[Cell(move=board_grid[row][col].move) for col in range(BOARD_DIMENSION)] for row in range(BOARD_DIMENSION)]
-        else:  
-            self.board_grid = [[Cell() for col in range(BOARD_DIMENSION)] for row in range(BOARD_DIMENSION)]
+            dimension = len(board_grid)
+        self.dimension = dimension
+        self.win_length = win_length or dimension
+        self.board_grid = [[Cell() for col in range(dimension)] for row in range(dimension)]
+        self.__reset_tracking()
+        if board_grid:
+            for row in range(dimension):
+                for col in range(dimension):
+                    if board_grid[row][col].move is not Move.EMPTY:
+                        self.set_cell(row, col, board_grid[row][col].move)
 
     def reset_board(self):
-        self.board_grid = [[Cell() for col in range(BOARD_DIMENSION)] for row in range(BOARD_DIMENSION)]
+        for row in self.board_grid:
+            for cell in row:
+                cell.move = Move.EMPTY
+                cell.winning_cell = False
+        self.__reset_tracking()
+
+    def __reset_tracking(self):
+        self.__lines = get_line_masks(self.dimension, self.win_length)
+        self.__cell_lines = get_cell_lines(self.dimension, self.win_length)
+        self.__line_counts = {Move.X: [0] * len(self.__lines), Move.O: [0] * len(self.__lines)}
+        # Maps index of each completed line to move which completed it
+        self.__completed_lines = {}
+        self.__free_mask = (1 << (self.dimension*self.dimension)) - 1
+        self.__free_count = self.dimension*self.dimension
+        self.__masks = {Move.X: 0, Move.O: 0}
+
+    def snapshot(self):
+        return BoardSnapshot(self.__masks[Move.X], self.__masks[Move.O], self.dimension, self.win_length)
 
     def get_available_moves(self):
-        available_moves = []
-        for row in range(BOARD_DIMENSION):
-            for col in range(BOARD_DIMENSION):
-                if self.board_grid[row][col].move is Move.EMPTY:
-                    available_moves.append((row, col))
-        return available_moves
+        return list(self.iter_available_moves())
+
+    def iter_available_moves(self):
+        free_mask = self.__free_mask
+        while free_mask:
+            bit = free_mask & -free_mask
+            free_mask ^= bit
+            yield divmod(bit.bit_length() - 1, self.dimension)
     
     def get_game_state(self):
         '''
         Returns the current state of the game, represented as a tuple of GameStatus and additional information if GameStatus is WIN.
-        Additional information includes winning move marker and 3 cell indexes which are part of the win represented as tuple of row,col.
+        Additional information includes winning move marker and win_length cell indexes which are part of the win represented as tuple of row,col.
+        If more than one line is completed, first line in order of rows, columns and diagonals is returned.
         '''
-
-        # Check rows
-        for row in range(BOARD_DIMENSION):
-            if self.__check_end_condition_by_moves(self.board_grid[row][0].move, self.board_grid[row][1].move, self.board_grid[row][2].move):
-                return (GameStatus.WIN, self.board_grid[row][0].move, ((row,0), (row,1), (row,2),))
-        # Check columns
-        for col in range(BOARD_DIMENSION):
-            if self.__check_end_condition_by_moves(self.board_grid[0][col].move, self.board_grid[1][col].move, self.board_grid[2][col].move):
-                return (GameStatus.WIN, self.board_grid[0][col].move, ((0,col), (1,col), (2,col),))
-        # Check diagonals
-        if self.__check_end_condition_by_moves(self.board_grid[0][0].move, self.board_grid[1][1].move, self.board_grid[2][2].move):
-            return (GameStatus.WIN, self.board_grid[0][0].move, ((0,0), (1,1), (2,2),))
-        if self.__check_end_condition_by_moves(self.board_grid[0][2].move, self.board_grid[1][1].move, self.board_grid[2][0].move):
-            return (GameStatus.WIN, self.board_grid[0][2].move, ((0,2), (1,1), (2,0),))
+        if self.__completed_lines:
+            line_index = min(self.__completed_lines)
+            return (GameStatus.WIN, self.__completed_lines[line_index], self.__lines[line_index][1])
         # Game Draw
-        if not self.get_available_moves():
+        if not self.__free_count:
             return (GameStatus.DRAW,)
         return (GameStatus.IN_PROGRESS,)
-        
-    def __check_end_condition_by_moves(self, move1: Move, move2: Move, move3: Move):
-        return move1 == move2 and move2 == move3 and move1 is not Move.EMPTY
     
     def get_board_grid(self):
         return self.board_grid
@@ -69,5 +105,26 @@ class Board:
         return self.board_grid[row][col]
     
     def set_cell(self, row, col, move, winning_cell = False):
+        old_move = self.board_grid[row][col].move
+        if old_move is not move:
+            bit = 1 << (row*self.dimension + col)
+            if old_move is not Move.EMPTY:
+                counts = self.__line_counts[old_move]
+                for line_index in self.__cell_lines[row][col]:
+                    if counts[line_index] == self.win_length:
+                        del self.__completed_lines[line_index]
+                    counts[line_index] -= 1
+                self.__masks[old_move] &= ~bit
+                self.__free_mask |= bit
+                self.__free_count += 1
+            if move is not Move.EMPTY:
+                counts = self.__line_counts[move]
+                for line_index in self.__cell_lines[row][col]:
+                    counts[line_index] += 1
+                    if counts[line_index] == self.win_length:
+                        self.__completed_lines[line_index] = move
+                self.__masks[move] |= bit
+                self.__free_mask &= ~bit
+                self.__free_count -= 1
         self.board_grid[row][col].move = move
         self.board_grid[row][col].winning_cell = winning_cell
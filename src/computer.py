@@ -1,16 +1,50 @@
-from model import Difficulty,GameStatus,Move
+from model import Difficulty,Move
 from board import Board
-from consts import BOARD_DIMENSION,COMPUTER_DELAY_SEC
+from bitboard import BitBoard,BoardSnapshot,get_win_masks,get_cell_win_masks,has_won
+from transposition import TranspositionTable,SHARED_TRANSPOSITION_TABLE,get_canonical_key
+from lookup_table import load_or_build_table
+from tablebase import Tablebase,get_tablebase_path
+from instrumentation import InstrumentationInterface,MoveMetrics
+from consts import ANALYSIS_TIME_BUDGET_SEC,COMPUTER_DELAY_SEC,EXHAUSTIVE_SEARCH_MAX_CELLS,SEARCH_TIME_BUDGET_SEC
+from typing import NamedTuple
 import random
 import math
 import time
 
 class ComputerInterface:
     '''
-    All implementations of ComputerInterface will provide get_move method to make next computer move.
+    All implementations of ComputerInterface will provide _choose_move method to select next computer move,
+    filling search effort in stats if it is not None.
+    Computers with needs_best_move set choose their move based on optimal move. Callers which already know the optimal move
+    (like a shared move service) pass it as best_move, so computer does not search for it again.
+    Board passed to computer can be a Board, BitBoard or BoardSnapshot.
+    get_move waits for COMPUTER_DELAY_SEC before choosing the move, so that computer move does not appear instantly.
+    Callers which must not block (like async game moves) wait on their own and call choose_move directly.
+    If instrumentation is set, choose_move reports MoveMetrics of every move to it. When it is None, no stats are collected.
     '''
+    difficulty = None
+    needs_best_move = False
+    instrumentation: InstrumentationInterface = None
 
     def get_move(self, board: Board, computerMarker: Move):
+        time.sleep(COMPUTER_DELAY_SEC)
+        return self.choose_move(board, computerMarker)
+
+    def choose_move(self, board: Board, computerMarker: Move, best_move=None, best_move_search=None):
+        if self.instrumentation is None:
+            return self._choose_move(board, computerMarker, None, best_move)
+        stats = SearchStats()
+        start = time.perf_counter()
+        move = self._choose_move(board, computerMarker, stats, best_move)
+        search_sec = time.perf_counter() - start
+        if best_move_search is not None:
+            stats.add(best_move_search.stats)
+            search_sec += best_move_search.search_sec
+        self.instrumentation.record_move(MoveMetrics(self.difficulty, move, search_sec, stats.nodes, stats.cutoffs, stats.cache_hits,
+                                                     stats.mistake, stats.coalesced))
+        return move
+
+    def _choose_move(self, board: Board, computerMarker: Move, stats, best_move):
         pass
 
 
@@ -18,62 +52,107 @@ class BeginnerComputer(ComputerInterface):
     '''
     Beginner Computer which randomly selects next move from available moves.
     '''
+    difficulty = Difficulty.EASY
 
-    def get_move(self, board: Board, computerMarker: Move):
-        time.sleep(COMPUTER_DELAY_SEC)
-        available_moves = board.get_available_moves()
+    def _choose_move(self, board: Board, computerMarker: Move, stats, best_move):
+        available_moves = to_bitboard(board).get_available_moves()
         return get_random_next_move(available_moves)
     
 
 class IntermediateComputer(ComputerInterface):
     '''
     Intermediate Computer which for a game can return maximum one non-optimal (mistake) move.
-    For making optimal move, minimax algorithm is used.
-    For making non-optimal move, random available move excluding optimal move is selected.
-    Whether next move will be optimal is decided by mistake_probability.
+    For making optimal move, precomputed perfect play table is used, falling back to minimax algorithm.
+    For making non-optimal move, all available moves are scored in one pass and a random move scoring lower than optimal move is selected.
+    Whether next move will be optimal is decided by mistake_probability, before any search is done.
     If computer keeps making optimal move, mistake_probability is increased by 0.15 to ensure computer will make mistake soon.
+    A mistake is only made if some move scores lower than optimal move.
     Once mistake is done, mistake_probability is reset to 0 to not allow further mistakes.
     '''
+    difficulty = Difficulty.INTERMEDIATE
+    needs_best_move = True
 
     def __init__(self):
         self.mistake_probability = 0.5
 
-    def get_move(self, board: Board, computerMarker: Move):
-        time.sleep(COMPUTER_DELAY_SEC)
-        available_moves = board.get_available_moves()
-        make_mistake = random.random() < self.mistake_probability
-        best_move = get_best_move(board.get_available_moves(), board, computerMarker)
-        if make_mistake:
-            self.mistake_probability = 0
-            return get_non_best_move(available_moves, best_move)
-        else:
-            if self.mistake_probability != 0:
-                self.mistake_probability = min(1, self.mistake_probability+0.15)
-            return best_move
+    def _choose_move(self, board: Board, computerMarker: Move, stats, best_move):
+        if random.random() < self.mistake_probability:
+            move_scores = get_move_scores(board, computerMarker, stats=stats)
+            best_score = max(move_scores.values())
+            mistake_moves = [move for (move, score) in move_scores.items() if score < best_score]
+            if mistake_moves:
+                self.mistake_probability = 0
+                if stats is not None:
+                    stats.mistake = True
+                return random.choice(mistake_moves)
+            if best_move is None:
+                best_move = next(move for (move, score) in move_scores.items() if score == best_score)
+        elif best_move is None:
+            best_move = get_perfect_move(board, computerMarker, stats)
+        if self.mistake_probability != 0:
+            self.mistake_probability = min(1, self.mistake_probability+0.15)
+        return best_move
         
 
 class ExpertComputer(ComputerInterface):
     '''
     Expert Computer which always makes optimal move. Not possible to defeat this computer.
-    For making optimal move, minimax algorithm is used.
+    For making optimal move, precomputed perfect play table is used, falling back to minimax algorithm.
     '''
+    difficulty = Difficulty.PRO
+    needs_best_move = True
 
-    def get_move(self, board: Board, computerMarker: Move):
-        time.sleep(COMPUTER_DELAY_SEC)
-        return get_best_move(board.get_available_moves(), board, computerMarker)
+    def _choose_move(self, board: Board, computerMarker: Move, stats, best_move):
+        if best_move is None:
+            best_move = get_perfect_move(board, computerMarker, stats)
+        return best_move
 
 
+class GradedComputer(ComputerInterface):
+    '''
+    Computer of continuously adjustable skill. On every move all available moves are scored in one search,
+    then a move is picked by softmax over the scores with given temperature (see choose_move_by_temperature).
+    Temperature 0 always plays optimal move like ExpertComputer, higher temperatures make weaker moves more likely,
+    and very high temperatures play nearly at random like BeginnerComputer.
+    '''
+
+    def __init__(self, temperature=0.5):
+        self.temperature = temperature
+
+    def _choose_move(self, board: Board, computerMarker: Move, stats, best_move):
+        move_scores = get_move_scores(board, computerMarker, stats=stats)
+        move = choose_move_by_temperature(move_scores, self.temperature)
+        if stats is not None:
+            stats.mistake = move_scores[move] < max(move_scores.values())
+        return move
+
+
+_default_instrumentation = None
+
+def set_default_instrumentation(instrumentation: InstrumentationInterface):
+    '''
+    Sets instrumentation attached to every computer created by get_computer_by_difficulty afterwards. None disables it.
+    '''
+    global _default_instrumentation
+    _default_instrumentation = instrumentation
+
 def get_computer_by_difficulty(difficulty: Difficulty):
     '''
     Factory method to get computer implementation by game difficulty.
     '''
 
     if difficulty == Difficulty.EASY:
-        return BeginnerComputer()
+        computer = BeginnerComputer()
     elif difficulty == Difficulty.INTERMEDIATE:
-        return IntermediateComputer()
+        computer = IntermediateComputer()
+    elif difficulty == Difficulty.MONTE_CARLO:
+        from mcts import MCTSComputer
+        computer = MCTSComputer()
     else:
-        return ExpertComputer()
+        computer = ExpertComputer()
+    if _default_instrumentation is not None:
+        computer.instrumentation = _default_instrumentation
+    return computer
 
 
 ######## ALGORITHMS FOR COMPUTER'S NEXT MOVE ############
@@ -87,40 +166,412 @@ def get_non_best_move(available_moves, best_move):
     non_best_moves = list(filter(lambda move: move != best_move, available_moves))
     return random.choice(non_best_moves)
 
-def get_best_move(available_moves, board: Board, computerMarker: Move):
+_perfect_play_table = None
+_perfect_play_table_loaded = False
+
+def get_perfect_play_table():
+    '''
+    Lazily loads precomputed perfect play table on first use, rebuilding its file if it is stale, truncated or corrupted.
+    Returns None if table file is missing.
+    '''
+    global _perfect_play_table, _perfect_play_table_loaded
+    if not _perfect_play_table_loaded:
+        _perfect_play_table = load_or_build_table()
+        _perfect_play_table_loaded = True
+    return _perfect_play_table
+
+_tablebases = {}
+
+def get_tablebase(dimension, win_length):
+    '''
+    Lazily loads tablebase generated by tablebase.py for board geometry on first use. Returns None if its file is missing or incomplete.
+    '''
+    if (dimension, win_length) not in _tablebases:
+        _tablebases[(dimension, win_length)] = Tablebase.load(get_tablebase_path(dimension, win_length), dimension, win_length)
+    return _tablebases[(dimension, win_length)]
+
+def get_perfect_move(board, computerMarker: Move, stats=None):
+    '''
+    Returns optimal move for computerMarker by looking up precomputed perfect play table.
+    Falls back to live minimax search if table is not available or does not have the position, like positions of another win length.
+    A table hit is counted as cache hit in stats.
+    '''
+    bitboard = to_bitboard(board)
+    table = get_perfect_play_table()
+    best_move = table.get_best_move(bitboard, computerMarker) if table else None
+    if best_move is None:
+        best_move = get_best_move(bitboard.get_available_moves(), bitboard, computerMarker, stats=stats)
+    elif stats is not None:
+        stats.cache_hits += 1
+    return best_move
+
+def choose_move_by_temperature(move_scores, temperature, rng=random):
+    '''
+    Returns a move of move_scores dictionary picked with probability proportional to exp((score - best score) / (temperature * score range)).
+    Scores are divided by their range, so a temperature means the same skill whatever the scale of scores is.
+    Temperature 0 returns first move having best score.
+    '''
+    best_score = max(move_scores.values())
+    if temperature <= 0:
+        return next(move for (move, score) in move_scores.items() if score == best_score)
+    score_range = (best_score - min(move_scores.values())) or 1
+    moves = list(move_scores)
+    weights = [math.exp((move_scores[move] - best_score) / (temperature * score_range)) for move in moves]
+    return rng.choices(moves, weights)[0]
+
+class SearchStats:
+    '''
+    Counters filled by search functions when passed as stats argument, used to measure search effort.
+    nodes is number of positions visited, cutoffs is number of alpha-beta cutoffs,
+    cache_hits is number of positions found in transposition table, perfect play table or move service result cache.
+    coalesced is number of move service requests which waited for a search already running for the same position.
+    mistake is set by computers which deliberately chose a non optimal move.
+    '''
+
+    def __init__(self):
+        self.nodes = 0
+        self.cutoffs = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.mistake = False
+
+    def add(self, other: 'SearchStats'):
+        self.nodes += other.nodes
+        self.cutoffs += other.cutoffs
+        self.cache_hits += other.cache_hits
+        self.coalesced += other.coalesced
+        self.mistake = self.mistake or other.mistake
+
+
+class BestMoveSearch(NamedTuple):
+    '''
+    Optimal move found outside of a computer, like by move service, with effort and seconds taken to find it.
+    '''
+    move: tuple
+    stats: SearchStats
+    search_sec: float
+
+
+def get_best_move(available_moves, board, computerMarker: Move, transposition_table: TranspositionTable = SHARED_TRANSPOSITION_TABLE, stats: SearchStats = None):
+    '''
+    Returns optimal move for computerMarker among available_moves using minimax algorithm.
+    Search runs on BitBoard form of the board, board can be either Board or BitBoard.
+    Searched positions are cached in transposition_table, which by default is shared by all computers in the process.
+    Boards larger than EXHAUSTIVE_SEARCH_MAX_CELLS are looked up in their tablebase, if one was generated, else searched by
+    get_best_move_within_budget. A tablebase hit is counted as cache hit in stats.
+    '''
+    bitboard = to_bitboard(board)
+    if bitboard.dimension*bitboard.dimension > EXHAUSTIVE_SEARCH_MAX_CELLS:
+        tablebase = get_tablebase(bitboard.dimension, bitboard.win_length)
+        best_move = tablebase.get_best_move(bitboard, computerMarker) if tablebase else None
+        if best_move is not None and best_move in available_moves:
+            if stats is not None:
+                stats.cache_hits += 1
+            return best_move
+        return get_best_move_within_budget(available_moves, bitboard, computerMarker, stats=stats)
     best_score = -math.inf
     best_move = None
-    if len(available_moves) == BOARD_DIMENSION*BOARD_DIMENSION:
+    if len(available_moves) == bitboard.dimension*bitboard.dimension:
         best_move = (0,0) #Optimization for empty grid
     else:
+        win_masks = get_win_masks(bitboard.dimension, bitboard.win_length)
+        max_mask = bitboard.get_mask(computerMarker)
+        min_mask = bitboard.get_mask(get_opponent_marker(computerMarker))
         for (row,col) in available_moves:
-            board.set_cell(row,col,computerMarker)
-            score = minimax(False, board, computerMarker)
-            board.set_cell(row,col,Move.EMPTY)
+            bit = 1 << (row*bitboard.dimension + col)
+            score = _minimax(False, max_mask | bit, min_mask, bitboard, win_masks, transposition_table, stats)
             if (score > best_score):
                 best_score = score
                 best_move = (row,col) 
 
     return best_move
 
-def minimax(is_max_turn, board: Board, maximizeMarker: Move):
-    state = board.get_game_state()
-    if state[0] == GameStatus.DRAW:
+def get_move_scores(board, computerMarker: Move, transposition_table: TranspositionTable = SHARED_TRANSPOSITION_TABLE, stats: SearchStats = None):
+    '''
+    Returns dictionary of every available move, in board order, to its score for computerMarker, searching each root move once.
+    Scores are exact minimax scores, 1 for win, 0 for draw and -1 for loss. Where precomputed perfect play table is available,
+    every move is scored by looking up position after the move.
+    Boards larger than EXHAUSTIVE_SEARCH_MAX_CELLS are scored from their tablebase, if one was generated (see Tablebase for its scores),
+    else by get_move_scores_within_budget.
+    '''
+    bitboard = to_bitboard(board)
+    available_moves = bitboard.get_available_moves()
+    if bitboard.dimension*bitboard.dimension > EXHAUSTIVE_SEARCH_MAX_CELLS:
+        tablebase = get_tablebase(bitboard.dimension, bitboard.win_length)
+        scores = tablebase.get_move_scores(bitboard, computerMarker) if tablebase else None
+        if scores:
+            if stats is not None:
+                stats.cache_hits += 1
+            return scores
+        return get_move_scores_within_budget(available_moves, bitboard, computerMarker, stats=stats)
+    table = get_perfect_play_table()
+    if table is not None and (table.dimension != bitboard.dimension or bitboard.win_length != bitboard.dimension):
+        table = None
+    win_masks = get_win_masks(bitboard.dimension, bitboard.win_length)
+    max_mask = bitboard.get_mask(computerMarker)
+    min_mask = bitboard.get_mask(get_opponent_marker(computerMarker))
+    scores = {}
+    for (row,col) in available_moves:
+        new_mask = max_mask | (1 << (row*bitboard.dimension + col))
+        # Table has no entries for finished positions, minimax scores them without searching.
+        entry = table.get_entry(min_mask, new_mask) if table is not None else None
+        if entry is not None:
+            scores[(row,col)] = -entry[0]
+            if stats is not None:
+                stats.cache_hits += 1
+        else:
+            scores[(row,col)] = _minimax(False, new_mask, min_mask, bitboard, win_masks, transposition_table, stats)
+    return scores
+
+def minimax(is_max_turn, board, maximizeMarker: Move, transposition_table: TranspositionTable = SHARED_TRANSPOSITION_TABLE, stats: SearchStats = None):
+    '''
+    Returns minimax score of board for maximizeMarker, 1 for win, -1 for loss and 0 for draw.
+    '''
+    bitboard = to_bitboard(board)
+    max_mask = bitboard.get_mask(maximizeMarker)
+    min_mask = bitboard.get_mask(get_opponent_marker(maximizeMarker))
+    return _minimax(is_max_turn, max_mask, min_mask, bitboard, get_win_masks(bitboard.dimension, bitboard.win_length), transposition_table, stats)
+
+def _minimax(is_max_turn, max_mask, min_mask, bitboard: BitBoard, win_masks, transposition_table: TranspositionTable, stats: SearchStats):
+    if stats is not None:
+        stats.nodes += 1
+    if has_won(max_mask, win_masks):
+        return 1
+    if has_won(min_mask, win_masks):
+        return -1
+    free_mask = bitboard.full_mask & ~(max_mask | min_mask)
+    if not free_mask:
         return 0
-    elif state[0] == GameStatus.WIN:
-        return 1 if state[1] == maximizeMarker else -1
 
-    scores = []
-    for (row,col) in board.get_available_moves():
-        minimize_marker = Move.X if maximizeMarker == Move.O else Move.O
+    # Cached scores are stored from the perspective of player to move.
+    if is_max_turn:
+        key = get_canonical_key(max_mask, min_mask, bitboard.dimension, bitboard.win_length)
+    else:
+        key = get_canonical_key(min_mask, max_mask, bitboard.dimension, bitboard.win_length)
+    cached_score = transposition_table.get(key)
+    if cached_score is not None:
+        if stats is not None:
+            stats.cache_hits += 1
+        return cached_score if is_max_turn else -cached_score
+
+    best_score = -2 if is_max_turn else 2
+    while free_mask:
+        bit = free_mask & -free_mask
+        free_mask ^= bit
         if is_max_turn:
-            board.set_cell(row,col,maximizeMarker)
+            score = _minimax(False, max_mask | bit, min_mask, bitboard, win_masks, transposition_table, stats)
+            if score > best_score:
+                best_score = score
+                if best_score == 1:
+                    break
         else:
-            board.set_cell(row,col,minimize_marker)
-        scores.append(minimax(not is_max_turn, board, maximizeMarker))
-        board.set_cell(row,col,Move.EMPTY)
-        if (is_max_turn and max(scores) == 1) or (not is_max_turn and min(scores) == -1):
+            score = _minimax(True, max_mask, min_mask | bit, bitboard, win_masks, transposition_table, stats)
+            if score < best_score:
+                best_score = score
+                if best_score == -1:
+                    break
+
+    transposition_table.put(key, best_score if is_max_turn else -best_score)
+    return best_score
+
+WIN_SCORE = 1000000
+
+class SearchTimeout(Exception):
+    '''
+    Raised inside alpha-beta search when time budget for the move is exhausted.
+    '''
+
+
+class SearchContext:
+    '''
+    Per search constants for alpha-beta search on a board of given dimension and win length.
+    Cells are ordered by number of winning lines passing through them, so central cells are tried first.
+    Search stops by raising SearchTimeout after deadline, or once cancelled threading.Event is set by another thread.
+    '''
+
+    def __init__(self, bitboard: BitBoard, deadline=None, stats: SearchStats = None, cancelled=None):
+        cell_win_masks = get_cell_win_masks(bitboard.dimension, bitboard.win_length)
+        cell_order = sorted(range(bitboard.dimension*bitboard.dimension), key=lambda index: -len(cell_win_masks[index]))
+        self.dimension = bitboard.dimension
+        self.full_mask = bitboard.full_mask
+        self.win_masks = get_win_masks(bitboard.dimension, bitboard.win_length)
+        self.cell_win_masks = cell_win_masks
+        self.ordered_cells = tuple((1 << index, cell_win_masks[index]) for index in cell_order)
+        self.cell_order = {index: order for (order, index) in enumerate(cell_order)}
+        # Cancellation is only checked along with deadline, which keeps searches without a deadline free of the check.
+        self.deadline = deadline if deadline is not None or cancelled is None else math.inf
+        self.cancelled = cancelled
+        self.stats = stats
+
+
+def get_best_move_within_budget(available_moves, board, computerMarker: Move, time_budget=SEARCH_TIME_BUDGET_SEC, max_depth=None, stats: SearchStats = None):
+    '''
+    Returns best move for computerMarker found by iterative deepening alpha-beta search within time_budget seconds.
+    Every iteration searches one ply deeper than previous, trying best moves of previous iteration first.
+    When time budget runs out, best move of last completed iteration is returned, so a move is always returned in time.
+    Search stops early if all moves are searched till end of game or a forced win or loss is found.
+    '''
+    (root_moves, _) = _iterative_deepening(available_moves, board, computerMarker, time_budget, max_depth, stats, False)
+    return root_moves[0]
+
+def get_move_scores_within_budget(available_moves, board, computerMarker: Move, time_budget=SEARCH_TIME_BUDGET_SEC, max_depth=None, stats: SearchStats = None):
+    '''
+    Returns dictionary of every move of available_moves to its alpha-beta score for computerMarker, searching deeper within time_budget
+    seconds like get_best_move_within_budget. Every root move is searched with full window, so scores of all moves are exact
+    for deepest completed depth. Moves are ordered best first. If not even depth 1 completes in time, all moves score 0.
+    '''
+    (root_moves, scores) = _iterative_deepening(available_moves, board, computerMarker, time_budget, max_depth, stats, True)
+    return {move: scores.get(move, 0) for move in root_moves}
+
+def _iterative_deepening(available_moves, board, computerMarker: Move, time_budget, max_depth, stats: SearchStats, exact_scores):
+    # Returns root moves ordered best first and their scores from deepest completed iteration.
+    bitboard = to_bitboard(board)
+    deadline = time.perf_counter() + time_budget if time_budget else None
+    context = SearchContext(bitboard, deadline, stats)
+    mover_mask = bitboard.get_mask(computerMarker)
+    opponent_mask = bitboard.get_mask(get_opponent_marker(computerMarker))
+    root_moves = sorted(available_moves, key=lambda move: context.cell_order[move[0]*bitboard.dimension + move[1]])
+    best_scores = {}
+    max_depth = min(max_depth or len(available_moves), len(available_moves))
+    for depth in range(1, max_depth+1):
+        try:
+            scores = search_root_moves(root_moves, mover_mask, opponent_mask, depth, context, exact_scores)
+        except SearchTimeout:
             break
+        root_moves = sorted(root_moves, key=lambda move: -scores[move])
+        best_scores = scores
+        if abs(scores[root_moves[0]]) > WIN_SCORE - len(available_moves) - 1:
+            break
+    return (root_moves, best_scores)
+
+def search_root_moves(root_moves, mover_mask, opponent_mask, depth, context: SearchContext, exact_scores=False):
+    '''
+    Runs alpha-beta search of given depth for every root move in given order and returns dictionary of move to score.
+    Score is exact for best move and an upper bound for others, unless exact_scores is set, in which case every move is
+    searched with full window.
+    '''
+    scores = {}
+    alpha = -WIN_SCORE - 1
+    for (row,col) in root_moves:
+        scores[(row,col)] = score = _score_move(mover_mask, opponent_mask, row*context.dimension + col, depth, 1, alpha, WIN_SCORE + 1, context)
+        if not exact_scores:
+            alpha = max(alpha, score)
+    return scores
+
+class CellEvaluation(NamedTuple):
+    '''
+    Evaluation of one move found by iter_move_evaluations. score is alpha-beta score of the move searched depth moves ahead,
+    exact is True once score can not change with deeper search (move was searched till end of game or a forced result was found).
+    '''
+    move: tuple
+    depth: int
+    score: int
+    exact: bool
+
+
+def iter_move_evaluations(board, computerMarker: Move, time_budget=ANALYSIS_TIME_BUDGET_SEC, stats: SearchStats = None, cancelled=None):
+    '''
+    Generator of progressively deeper evaluations of every available move for computerMarker, by iterative deepening alpha-beta search.
+    Every depth yields a CellEvaluation as soon as each move not yet exact is searched, best moves of previous depth first,
+    so callers can show scores while they firm up and stop iterating whenever they like.
+    Stops when every move is exact, after time_budget seconds or once cancelled threading.Event is set, which also stops a search
+    running on another thread within one node. A move whose search was cut short is not yielded.
+    '''
+    bitboard = to_bitboard(board)
+    deadline = time.perf_counter() + time_budget if time_budget else None
+    context = SearchContext(bitboard, deadline, stats, cancelled)
+    mover_mask = bitboard.get_mask(computerMarker)
+    opponent_mask = bitboard.get_mask(get_opponent_marker(computerMarker))
+    pending_moves = sorted(bitboard.get_available_moves(), key=lambda move: context.cell_order[move[0]*bitboard.dimension + move[1]])
+    free_count = len(pending_moves)
+    depth = 0
+    while pending_moves:
+        depth += 1
+        scores = {}
+        exact_moves = set()
+        for (row,col) in pending_moves:
+            try:
+                score = _score_move(mover_mask, opponent_mask, row*bitboard.dimension + col, depth, 1, -WIN_SCORE - 1, WIN_SCORE + 1, context)
+            except SearchTimeout:
+                return
+            exact = depth >= free_count or abs(score) > WIN_SCORE - free_count - 1
+            scores[(row,col)] = score
+            if exact:
+                exact_moves.add((row,col))
+            yield CellEvaluation((row,col), depth, score, exact)
+        pending_moves = sorted((move for move in pending_moves if move not in exact_moves), key=lambda move: -scores[move])
+
+def alphabeta(board, maximizeMarker: Move, depth, alpha=-WIN_SCORE-1, beta=WIN_SCORE+1):
+    '''
+    Returns alpha-beta score of board for maximizeMarker moving next, searching depth moves ahead.
+    Forced wins score WIN_SCORE less number of moves needed, unfinished lines at search depth are scored heuristically.
+    '''
+    bitboard = to_bitboard(board)
+    return _alphabeta(bitboard.get_mask(maximizeMarker), bitboard.get_mask(get_opponent_marker(maximizeMarker)), depth, 1, alpha, beta, SearchContext(bitboard))
+
+def _alphabeta(mover_mask, opponent_mask, depth, ply, alpha, beta, context: SearchContext):
+    # Scores are from the perspective of player to move, negated while going up the tree.
+    if context.deadline is not None and (time.perf_counter() > context.deadline or context.cancelled is not None and context.cancelled.is_set()):
+        raise SearchTimeout()
+    if context.stats is not None:
+        context.stats.nodes += 1
+    free_mask = context.full_mask & ~(mover_mask | opponent_mask)
+    best_score = -WIN_SCORE - 1
+    for (bit, cell_win_masks) in context.ordered_cells:
+        if not free_mask & bit:
+            continue
+        new_mask = mover_mask | bit
+        if has_won(new_mask, cell_win_masks):
+            score = WIN_SCORE - ply
+        elif free_mask == bit:
+            score = 0
+        elif depth <= 1:
+            score = evaluate_position(new_mask, opponent_mask, context.win_masks)
+        else:
+            score = -_alphabeta(opponent_mask, new_mask, depth-1, ply+1, -beta, -alpha, context)
+        if score > best_score:
+            best_score = score
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    if context.stats is not None:
+                        context.stats.cutoffs += 1
+                    break
+    return best_score
+
+def _score_move(mover_mask, opponent_mask, index, depth, ply, alpha, beta, context: SearchContext):
+    bit = 1 << index
+    new_mask = mover_mask | bit
+    if has_won(new_mask, context.cell_win_masks[index]):
+        return WIN_SCORE - ply
+    if (new_mask | opponent_mask) == context.full_mask:
+        return 0
+    if depth <= 1:
+        return evaluate_position(new_mask, opponent_mask, context.win_masks)
+    return -_alphabeta(opponent_mask, new_mask, depth-1, ply+1, -beta, -alpha, context)
+
+def evaluate_position(mover_mask, opponent_mask, win_masks):
+    '''
+    Returns heuristic score of unfinished position for player owning mover_mask.
+    Every line still open for only one player adds or subtracts square of moves already made in it.
+    '''
+    score = 0
+    for win_mask in win_masks:
+        if not opponent_mask & win_mask:
+            score += (mover_mask & win_mask).bit_count() ** 2
+        elif not mover_mask & win_mask:
+            score -= (opponent_mask & win_mask).bit_count() ** 2
+    return score
+
+def to_bitboard(board):
+    '''
+    Returns BitBoard form of given Board, BitBoard or BoardSnapshot. BitBoard objects are returned as is.
+    '''
+    if isinstance(board, BitBoard):
+        return board
+    if isinstance(board, BoardSnapshot):
+        return BitBoard.from_snapshot(board)
+    return BitBoard.from_board(board)
 
-    return max(scores) if is_max_turn else min(scores)
-        
\ No newline at end of file
+def get_opponent_marker(marker: Move):
+    return Move.X if marker == Move.O else Move.O
@@ -1,5 +1,35 @@
+import os
+
 BOARD_DIMENSION = 3
 GRID_SIZE = 300
 GAME_MESSAGE_WIDTH = 400
 GRID_BUTTON_SIZE = 100
-COMPUTER_DELAY_SEC = 0.5
\ No newline at end of file
+COMPUTER_DELAY_SEC = 0.5
+TRANSPOSITION_TABLE_SIZE = 100000
+# Boards with more cells than this are searched by time bounded alpha-beta instead of exhaustive minimax.
+EXHAUSTIVE_SEARCH_MAX_CELLS = 9
+SEARCH_TIME_BUDGET_SEC = 1.0
+# Hint analysis of all moves stops deepening after this many seconds.
+ANALYSIS_TIME_BUDGET_SEC = 10.0
+# Monte Carlo tree search computer: limits per move (first reached ends search), root parallel processes and UCT exploration constant.
+MCTS_TIME_BUDGET_SEC = 1.0
+MCTS_PLAYOUTS = 20000
+MCTS_WORKERS = 1
+MCTS_EXPLORATION = 1.4
+# Shared move service: maximum number of concurrent searches and number of cached optimal moves.
+MOVE_SERVICE_WORKERS = 4
+MOVE_CACHE_SIZE = 100000
+# Move API server: default port and listen backlog, seconds a batch of optimal move lookups waits for more requests, positions per batch,
+# largest board and most positions one request may carry.
+API_PORT = 8000
+API_LISTEN_BACKLOG = 128
+API_BATCH_WINDOW_SEC = 0.002
+API_MAX_BATCH_SIZE = 256
+API_MAX_DIMENSION = 7
+API_MAX_POSITIONS_PER_REQUEST = 256
+# Set TICTACTOE_GAME_LOG to a file path to append every game played to it. Log writes are batched.
+GAME_LOG_PATH = os.environ.get('TICTACTOE_GAME_LOG')
+GAME_LOG_FLUSH_SEC = 1.0
+GAME_LOG_BATCH_SIZE = 1000
+# Set TICTACTOE_INSTRUMENTATION=1 to collect computer move metrics shown by admin.py app.
+INSTRUMENTATION_ENABLED = os.environ.get('TICTACTOE_INSTRUMENTATION') == '1'
\ No newline at end of file
@@ -1,7 +1,15 @@
+import asyncio
+import logging
+import threading
 import param
 from model import Move,Difficulty,GameStatus
-from computer import *
+from computer import ComputerInterface,BeginnerComputer,get_computer_by_difficulty,iter_move_evaluations
 from board import Board
+from move_service import MoveService,SHARED_MOVE_SERVICE
+from game_log import GameRecord
+from consts import COMPUTER_DELAY_SEC
+
+logger = logging.getLogger(__name__)
 
 class TicTacToe(param.Parameterized):
     """
@@ -17,14 +25,34 @@ class TicTacToe(param.Parameterized):
         board (Board): Object having board 2D grid, provides methods to update game board and also provides game status.
         difficulty (Difficulty): Difficulty level selected by user.
         computer (ComputerInterface): ComputerInterface implementation object providing next move by computer. 
+        state_version (int): Incremented once with every state transition (a move or a reset). Views depending on it are
+            refreshed exactly once per transition, as all parameter changes of a transition are applied in a single batch.
+        moves_made (int): Number of moves applied to the board since this game controller was created.
+        async_computer_moves (bool): If True and an asyncio event loop is running, computer move is made without blocking the loop.
+            Search is submitted to move_service while delay is awaited, and the move is applied once search completes.
+        move_service (MoveService): Service running computer searches of async moves, shared by all games of the process by default.
+        game_log (GameLogWriter): If set, every game is appended to it when it ends, or when it is reset before ending.
+        move_history (list): Moves (row, col) of current game in order they were made.
+        analysis (dict): Latest CellEvaluation of every move analysed for user in current position, filled progressively by request_analysis.
 
     Methods:
-        reset_game_state(): Resets the board and game state to their initial values.
-        make_move(row, col): Makes a move on the board at the specified row and column if it's a valid move.
-        __update_game_state_on_move(gameState): Update game state like game_ended based on current board state. 
+        reset_game_state(): Resets the board and game state to their initial values. Cancels pending computer move if any.
+        make_move(row, col): Makes a user move on the board at the specified row and column if it's a valid move.
+        is_computer_move_pending(): Returns True if async computer move is scheduled but not yet applied.
+        cancel_pending_computer_move(): Cancels async computer move if any, so that its result is never applied.
+        request_analysis(): Starts analysis of every available move for user, replacing any earlier analysis.
+        cancel_analysis(): Stops running analysis, including its search step running on a worker thread, so that its further results
+            are never applied, and clears analysis.
+        _run_on_session(callback): Runs callback which applies async computer move. Overridden by UI to run it on UI session.
+        __apply_move(row, col): Makes a move on the board for current player and makes computer move if computer plays next.
+        __get_game_state_changes(gameState): Returns parameter changes like game_ended for current board state, marking winning cells. 
+        __log_game(): Appends current game to game_log.
         __make_computer_move(): Makes a move for the computer player.
-        __switch_player(): Switches the current player to the other player Eg. X to O.
-        __switch_first_mover(): On every game reset, first mover is switched to add fairness to the game.
+        __make_computer_move_async(generation): Coroutine making computer move without blocking event loop. If the move fails,
+            error is logged and move is no longer pending, so that the game does not ignore user moves till reset.
+        __analyse_async(evaluations, generation): Coroutine running analysis steps on a worker thread and applying their results.
+        __apply_evaluation(evaluation, generation): Adds CellEvaluation to analysis unless analysis was cancelled.
+        __get_other_player(move): Returns the other player Eg. X for O.
         __get_computer_move_marker(): Gives current move marker assigned to computer.
     """
     first_mover = param.Selector(objects=[Move.X, Move.O], default=Move.X)    
@@ -33,52 +61,181 @@ class TicTacToe(param.Parameterized):
     game_ended = param.Boolean(default=False)
     winner = param.Selector(objects=[Move.X, Move.O, Move.EMPTY], default=Move.EMPTY)
     board: Board = param.Parameter(Board(), instantiate=True)
-    difficulty = param.ObjectSelector(default=Difficulty.EASY, objects=[Difficulty.EASY, Difficulty.INTERMEDIATE, Difficulty.PRO])
+    difficulty = param.ObjectSelector(default=Difficulty.EASY, objects=[Difficulty.EASY, Difficulty.INTERMEDIATE, Difficulty.PRO, Difficulty.MONTE_CARLO])
     computer: ComputerInterface = param.Parameter(BeginnerComputer(), instantiate=True)
+    state_version = param.Integer(default=0)
+    async_computer_moves = param.Boolean(default=False)
+    move_service: MoveService = param.Parameter(SHARED_MOVE_SERVICE)
+    game_log = param.Parameter(None)
+    analysis = param.Dict(default={})
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self.__pending_move_task = None
+        # Incremented on every cancellation, so results of cancelled moves scheduled on session are ignored
+        self.__move_generation = 0
+        self.__analysis_task = None
+        # Like move generation, incremented on every cancellation so that outdated analysis results are ignored
+        self.__analysis_generation = 0
+        # Set on cancellation, stopping search step of running analysis on its worker thread.
+        self.__analysis_cancelled = threading.Event()
+        self.moves_made = 0
+        self.move_history = []
+        # Settings current game was started with, as they can change before the game is logged.
+        self.__game_user_move_marker = self.user_move_marker
+        self.__game_difficulty = self.difficulty
 
     def reset_game_state(self):
+        self.cancel_pending_computer_move()
+        self.cancel_analysis()
+        if self.move_history and not self.game_ended:
+            self.__log_game()
+        self.move_history = []
+        self.__game_user_move_marker = self.user_move_marker
+        self.__game_difficulty = self.difficulty
         self.board.reset_board()
-        self.computer = get_computer_by_difficulty(self.difficulty)
-        self.__switch_first_mover()
-        self.current_move = self.first_mover
-        self.game_ended = False
-        self.winner = Move.EMPTY
+        # On every game reset, first mover is switched to add fairness to the game.
+        first_mover = self.__get_other_player(self.first_mover)
+        self.param.update(computer=get_computer_by_difficulty(self.difficulty), first_mover=first_mover, current_move=first_mover,
+            game_ended=False, winner=Move.EMPTY, state_version=self.state_version+1)
         if self.current_move == self.__get_computer_move_marker():
             self.__make_computer_move()
 
     def make_move(self, row, col):
+        if self.is_computer_move_pending():
+            return
+        self.__apply_move(row, col)
+
+    def is_computer_move_pending(self):
+        return self.__pending_move_task is not None
+
+    def cancel_pending_computer_move(self):
+        if self.__pending_move_task is not None:
+            self.__pending_move_task.cancel()
+            self.__pending_move_task = None
+        self.__move_generation += 1
+
+    def request_analysis(self):
+        '''
+        Analyses every available move for user by iter_move_evaluations, adding each evaluation to analysis as it is found.
+        Does nothing unless it is user's turn. With async_computer_moves and a running event loop, search steps run on a worker thread
+        and their results are applied on the session, else analysis runs to completion before returning.
+        '''
+        self.cancel_analysis()
+        if self.game_ended or self.is_computer_move_pending() or self.current_move != self.user_move_marker:
+            return
+        self.__analysis_cancelled = threading.Event()
+        evaluations = iter_move_evaluations(self.board.snapshot(), self.current_move, cancelled=self.__analysis_cancelled)
+        if self.async_computer_moves:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                self.__analysis_task = loop.create_task(self.__analyse_async(evaluations, self.__analysis_generation))
+                return
+        for evaluation in evaluations:
+            self.__apply_evaluation(evaluation, self.__analysis_generation)
+
+    def cancel_analysis(self):
+        self.__analysis_cancelled.set()
+        if self.__analysis_task is not None:
+            self.__analysis_task.cancel()
+            self.__analysis_task = None
+        self.__analysis_generation += 1
+        if self.analysis:
+            self.analysis = {}
+
+    def _run_on_session(self, callback):
+        callback()
+
+    def __apply_move(self, row, col):
         if self.board.get_cell(row,col).move is not Move.EMPTY or self.game_ended:
             return
         
+        self.cancel_analysis()
         self.board.set_cell(row,col,self.current_move)
-        gameState = self.board.get_game_state()
-        self.__update_game_state_on_move(gameState)
+        self.moves_made += 1
+        self.move_history.append((row,col))
+        changes = self.__get_game_state_changes(self.board.get_game_state())
+        if not changes:
+            changes['current_move'] = self.__get_other_player(self.current_move)
+        changes['state_version'] = self.state_version + 1
+        self.param.update(**changes)
 
         if self.game_ended:
+            self.__log_game()
             return
         
-        self.__switch_player()
         if self.current_move == self.__get_computer_move_marker():
             self.__make_computer_move()
 
-    def __update_game_state_on_move(self, gameState):
+    def __get_game_state_changes(self, gameState):
         if gameState[0] == GameStatus.WIN:
             for (row,col) in gameState[2]:
                 self.board.set_cell(row, col, gameState[1], True)
-            self.winner = gameState[1]
-            self.game_ended = True
+            return {'winner': gameState[1], 'game_ended': True}
         elif gameState[0] == GameStatus.DRAW:
-            self.game_ended = True
+            return {'game_ended': True}
+        return {}
+
+    def __log_game(self):
+        if self.game_log is None:
+            return
+        if self.game_ended:
+            status = GameStatus.WIN if self.winner != Move.EMPTY else GameStatus.DRAW
+        else:
+            status = GameStatus.IN_PROGRESS
+        # Game is played on even if it can not be logged, like games on larger boards or after log was closed.
+        try:
+            self.game_log.append(GameRecord(self.first_mover, self.__game_user_move_marker, self.__game_difficulty, status, self.winner, tuple(self.move_history)))
+        except Exception:
+            logger.exception('Game could not be logged')
 
     def __make_computer_move(self):
-            (row,col) = self.computer.get_move(Board(self.board.get_board_grid()), self.__get_computer_move_marker())
-            self.make_move(row, col)
-    
-    def __switch_player(self):
-        self.current_move = Move.O if self.current_move == Move.X else Move.X
+        if self.async_computer_moves:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                self.__pending_move_task = loop.create_task(self.__make_computer_move_async(self.__move_generation))
+                return
+        (row,col) = self.computer.get_move(self.board.snapshot(), self.__get_computer_move_marker())
+        self.__apply_move(row, col)
+
+    async def __make_computer_move_async(self, generation):
+        board = self.board.snapshot()
+        move = None
+        try:
+            move = await self.move_service.get_move(self.computer, board, self.__get_computer_move_marker(), COMPUTER_DELAY_SEC)
+        except Exception:
+            logger.exception('Computer move failed')
+        finally:
+            def apply_computer_move():
+                if generation != self.__move_generation:
+                    return
+                self.__pending_move_task = None
+                if move is not None:
+                    self.__apply_move(*move)
+            self._run_on_session(apply_computer_move)
+
+    async def __analyse_async(self, evaluations, generation):
+        loop = asyncio.get_running_loop()
+        while generation == self.__analysis_generation:
+            # Every step searches one move one depth. Cancellation also stops the step running, so its worker is freed at once.
+            evaluation = await loop.run_in_executor(None, next, evaluations, None)
+            if evaluation is None:
+                return
+            self._run_on_session(lambda evaluation=evaluation: self.__apply_evaluation(evaluation, generation))
+
+    def __apply_evaluation(self, evaluation, generation):
+        if generation != self.__analysis_generation:
+            return
+        self.analysis = {**self.analysis, evaluation.move: evaluation}
     
-    def __switch_first_mover(self):
-        self.first_mover = Move.O if self.first_mover == Move.X else Move.X
+    def __get_other_player(self, move):
+        return Move.O if move == Move.X else Move.X
 
     def __get_computer_move_marker(self):
         return Move.X if self.user_move_marker == Move.O else Move.O
@@ -0,0 +1,304 @@
+import argparse
+import atexit
+import os
+import threading
+from typing import NamedTuple
+from model import Difficulty,GameStatus,Move
+from consts import BOARD_DIMENSION,GAME_LOG_BATCH_SIZE,GAME_LOG_FLUSH_SEC
+
+# File starts with magic and format version, followed by game records.
+LOG_MAGIC = b'TTTL'
+LOG_FORMAT_VERSION = 1
+LOG_HEADER = LOG_MAGIC + bytes([LOG_FORMAT_VERSION])
+# Record: flags byte, then byte with move count in high nibble and first move in low nibble, then remaining moves two per byte.
+# Every move is a cell index row*3 + col in 4 bits, so a full game takes 6 bytes.
+# Flags bits: 0 first mover is O, 1 user marker is O, 2-3 difficulty code, 4-5 result code.
+DIFFICULTY_CODES = (Difficulty.EASY, Difficulty.INTERMEDIATE, Difficulty.PRO, Difficulty.MONTE_CARLO)
+RESULT_DRAW = 0
+RESULT_X_WON = 1
+RESULT_O_WON = 2
+RESULT_UNFINISHED = 3
+MAX_MOVES = BOARD_DIMENSION * BOARD_DIMENSION
+READ_CHUNK_SIZE = 1 << 16
+
+
+class GameRecord(NamedTuple):
+    '''
+    One logged game. status is GameStatus.IN_PROGRESS for games reset before they ended, winner is Move.EMPTY unless status is WIN.
+    moves is tuple of (row, col) in order they were played, starting with first_mover.
+    '''
+    first_mover: Move
+    user_marker: Move
+    difficulty: Difficulty
+    status: GameStatus
+    winner: Move
+    moves: tuple
+
+
+def encode_game(record: GameRecord):
+    '''
+    Returns bytes of record in log format. Raises ValueError for games not on a 3x3 board.
+    '''
+    if len(record.moves) > MAX_MOVES:
+        raise ValueError('Game log supports %dx%d boards only' % (BOARD_DIMENSION, BOARD_DIMENSION))
+    if record.status == GameStatus.WIN:
+        result = RESULT_X_WON if record.winner == Move.X else RESULT_O_WON
+    else:
+        result = RESULT_DRAW if record.status == GameStatus.DRAW else RESULT_UNFINISHED
+    flags = (record.first_mover == Move.O) | (record.user_marker == Move.O) << 1 | DIFFICULTY_CODES.index(record.difficulty) << 2 | result << 4
+    cells = []
+    for (row, col) in record.moves:
+        if not (0 <= row < BOARD_DIMENSION and 0 <= col < BOARD_DIMENSION):
+            raise ValueError('Game log supports %dx%d boards only' % (BOARD_DIMENSION, BOARD_DIMENSION))
+        cells.append(row*BOARD_DIMENSION + col)
+    data = bytearray([flags, len(cells) << 4 | (cells[0] if cells else 0)])
+    for index in range(1, len(cells), 2):
+        data.append(cells[index] << 4 | (cells[index+1] if index+1 < len(cells) else 0))
+    return bytes(data)
+
+def get_record_size(count_byte):
+    '''
+    Returns size in bytes of record whose second byte is count_byte.
+    '''
+    return 2 + (count_byte >> 4) // 2
+
+def decode_flags(flags):
+    '''
+    Returns tuple of first mover, user marker, difficulty, status and winner encoded in flags byte of a record.
+    '''
+    result = flags >> 4 & 3
+    if result == RESULT_DRAW:
+        (status, winner) = (GameStatus.DRAW, Move.EMPTY)
+    elif result == RESULT_UNFINISHED:
+        (status, winner) = (GameStatus.IN_PROGRESS, Move.EMPTY)
+    else:
+        (status, winner) = (GameStatus.WIN, Move.X if result == RESULT_X_WON else Move.O)
+    return (Move.O if flags & 1 else Move.X, Move.O if flags & 2 else Move.X, DIFFICULTY_CODES[flags >> 2 & 3], status, winner)
+
+def decode_game(data, offset=0):
+    '''
+    Returns GameRecord encoded in data at offset.
+    '''
+    count = data[offset+1] >> 4
+    cells = [data[offset+1] & 0xF]
+    for byte in data[offset+2:offset+get_record_size(data[offset+1])]:
+        cells.append(byte >> 4)
+        cells.append(byte & 0xF)
+    return GameRecord(*decode_flags(data[offset]), tuple(divmod(cell, BOARD_DIMENSION) for cell in cells[:count]))
+
+
+class GameLogWriter:
+    """
+    Appends games to a log file. Games are encoded when appended and written to the file in batches by a background thread,
+    every GAME_LOG_FLUSH_SEC seconds or as soon as batch_size games are waiting, so appending never blocks on file IO.
+
+    Attributes:
+        path (str): Path of log file, created with header if it does not exist. An incomplete record at its end is truncated.
+        games_written (int): Number of games written to the file.
+
+    Methods:
+        append(record): Queues GameRecord to be written.
+        flush(): Blocks until all queued games are written.
+        close(): Writes queued games and stops background thread.
+    """
+
+    def __init__(self, path, flush_interval=GAME_LOG_FLUSH_SEC, batch_size=GAME_LOG_BATCH_SIZE):
+        self.path = path
+        self.games_written = 0
+        self.__flush_interval = flush_interval
+        self.__batch_size = batch_size
+        self.__buffer = bytearray()
+        self.__pending_games = 0
+        self.__games_appended = 0
+        self.__flush_requested = False
+        self.__closed = False
+        self.__condition = threading.Condition()
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, 'wb') as file:
+                file.write(LOG_HEADER)
+        else:
+            # A write cut short by a crash leaves an incomplete record at end, which would misalign every record appended after it.
+            complete_size = get_complete_size(path)
+            if complete_size < os.path.getsize(path):
+                os.truncate(path, complete_size)
+        self.__thread = threading.Thread(target=self.__run, name='game-log-writer', daemon=True)
+        self.__thread.start()
+
+    def append(self, record: GameRecord):
+        data = encode_game(record)
+        with self.__condition:
+            if self.__closed:
+                raise ValueError('Game log is closed')
+            self.__buffer += data
+            self.__pending_games += 1
+            self.__games_appended += 1
+            if self.__pending_games >= self.__batch_size:
+                self.__condition.notify()
+
+    def flush(self):
+        with self.__condition:
+            games_appended = self.__games_appended
+            self.__flush_requested = True
+            self.__condition.notify()
+            while self.games_written < games_appended and self.__thread.is_alive():
+                self.__condition.wait()
+
+    def close(self):
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify()
+        self.__thread.join()
+
+    def __run(self):
+        with open(self.path, 'ab') as file:
+            while True:
+                with self.__condition:
+                    if not (self.__closed or self.__flush_requested or self.__pending_games >= self.__batch_size):
+                        self.__condition.wait(self.__flush_interval)
+                    (data, games) = (bytes(self.__buffer), self.__pending_games)
+                    self.__buffer.clear()
+                    self.__pending_games = 0
+                    self.__flush_requested = False
+                    closed = self.__closed
+                if data:
+                    file.write(data)
+                    file.flush()
+                with self.__condition:
+                    self.games_written += games
+                    self.__condition.notify_all()
+                if closed:
+                    return
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+def get_game_log_writer(path):
+    '''
+    Returns GameLogWriter for path shared by all games of the process, creating it on first use.
+    A new writer is closed at interpreter exit, so games still buffered are written to the log.
+    '''
+    with _writers_lock:
+        if path not in _writers:
+            _writers[path] = GameLogWriter(path)
+            atexit.register(_writers[path].close)
+        return _writers[path]
+
+def iter_record_offsets(path, chunk_size=READ_CHUNK_SIZE):
+    '''
+    Generator yielding (data, offset) of every record in log file, reading it in chunks so memory use does not grow with file size.
+    data is only valid until next record is requested. An incomplete record at end of file (from a write cut short) is ignored.
+    '''
+    with open(path, 'rb') as file:
+        if file.read(len(LOG_HEADER)) != LOG_HEADER:
+            raise ValueError('%s is not a game log of format version %d' % (path, LOG_FORMAT_VERSION))
+        data = b''
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                return
+            data += chunk
+            offset = 0
+            while offset + 1 < len(data):
+                size = 2 + (data[offset+1] >> 4) // 2
+                if offset + size > len(data):
+                    break
+                yield (data, offset)
+                offset += size
+            data = data[offset:]
+
+def get_complete_size(path, chunk_size=READ_CHUNK_SIZE):
+    '''
+    Returns size in bytes of header and complete records of log file, less than file size if its last record is incomplete.
+    Raises ValueError if file is not a game log.
+    '''
+    size = len(LOG_HEADER)
+    for (data, offset) in iter_record_offsets(path, chunk_size):
+        size += get_record_size(data[offset+1])
+    return size
+
+def read_games(path, chunk_size=READ_CHUNK_SIZE):
+    '''
+    Generator yielding GameRecord for every game in log file.
+    '''
+    for (data, offset) in iter_record_offsets(path, chunk_size):
+        yield decode_game(data, offset)
+
+
+class GameLogSummary:
+    """
+    Streaming summary of logged games per difficulty, from the user's perspective.
+
+    Attributes:
+        difficulties (dict): Dictionary of Difficulty to dictionary of counts with keys 'games', 'user_wins', 'computer_wins', 'draws',
+            'unfinished' and 'moves'.
+
+    Methods:
+        add(record): Adds one GameRecord.
+        add_games(user_marker, difficulty, status, winner, moves, games): Adds games of same kind having moves moves in total.
+        get_user_win_rate(difficulty): Returns fraction of finished games of difficulty won by user.
+    """
+
+    def __init__(self):
+        self.difficulties = {}
+
+    def add(self, record: GameRecord):
+        self.add_games(record.user_marker, record.difficulty, record.status, record.winner, len(record.moves), 1)
+
+    def add_games(self, user_marker, difficulty, status, winner, moves, games):
+        counts = self.difficulties.get(difficulty)
+        if counts is None:
+            counts = self.difficulties[difficulty] = {'games': 0, 'user_wins': 0, 'computer_wins': 0, 'draws': 0, 'unfinished': 0, 'moves': 0}
+        counts['games'] += games
+        counts['moves'] += moves
+        if status == GameStatus.WIN:
+            counts['user_wins' if winner == user_marker else 'computer_wins'] += games
+        elif status == GameStatus.DRAW:
+            counts['draws'] += games
+        else:
+            counts['unfinished'] += games
+
+    def get_user_win_rate(self, difficulty: Difficulty):
+        counts = self.difficulties.get(difficulty)
+        finished = counts['games'] - counts['unfinished'] if counts else 0
+        return counts['user_wins'] / finished if finished else 0.0
+
+    def __str__(self):
+        lines = []
+        for difficulty in DIFFICULTY_CODES:
+            counts = self.difficulties.get(difficulty)
+            if counts:
+                lines.append('%s: %d games, user won %d, computer won %d, draw %d, unfinished %d, average length %.2f moves' % (difficulty.value,
+                    counts['games'], counts['user_wins'], counts['computer_wins'], counts['draws'], counts['unfinished'], counts['moves'] / counts['games']))
+        return '\n'.join(lines)
+
+def summarize_games(records):
+    '''
+    Returns GameLogSummary of an iterable of GameRecord, like the generator returned by read_games.
+    '''
+    summary = GameLogSummary()
+    for record in records:
+        summary.add(record)
+    return summary
+
+def summarize_log(path, chunk_size=READ_CHUNK_SIZE):
+    '''
+    Returns GameLogSummary of log file without decoding moves. Games are counted by flags byte and move count,
+    so memory use is constant however many games the log has.
+    '''
+    kinds = {}
+    for (data, offset) in iter_record_offsets(path, chunk_size):
+        key = (data[offset], data[offset+1] >> 4)
+        kinds[key] = kinds.get(key, 0) + 1
+    summary = GameLogSummary()
+    for ((flags, moves), games) in kinds.items():
+        (_, user_marker, difficulty, status, winner) = decode_flags(flags)
+        summary.add_games(user_marker, difficulty, status, winner, moves * games, games)
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Summarizes a game log file.')
+    parser.add_argument('path')
+    args = parser.parse_args()
+    print(summarize_log(args.path))
@@ -0,0 +1,136 @@
+import bisect
+import threading
+
+# Upper bounds in seconds of move latency histogram buckets, last bucket (+Inf) is implicit.
+LATENCY_BUCKETS_SEC = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5)
+METRIC_PREFIX = 'tictactoe_computer'
+
+
+class MoveMetrics:
+    '''
+    Metrics of one computer move, reported to instrumentation by ComputerInterface.choose_move.
+    nodes, cutoffs and cache_hits are search effort, mistake is True if computer deliberately chose a non optimal move.
+    coalesced is 1 if optimal move came from a move service search started by another request for the same position.
+    '''
+    __slots__ = ('difficulty', 'move', 'search_sec', 'nodes', 'cutoffs', 'cache_hits', 'mistake', 'coalesced')
+
+    def __init__(self, difficulty, move, search_sec, nodes=0, cutoffs=0, cache_hits=0, mistake=False, coalesced=0):
+        self.difficulty = difficulty
+        self.move = move
+        self.search_sec = search_sec
+        self.nodes = nodes
+        self.cutoffs = cutoffs
+        self.cache_hits = cache_hits
+        self.mistake = mistake
+        self.coalesced = coalesced
+
+
+class InstrumentationInterface:
+    '''
+    All implementations of InstrumentationInterface will provide record_move method, called with MoveMetrics after every computer move.
+    record_move can be called from executor threads, so implementations must be thread safe.
+    '''
+
+    def record_move(self, metrics: MoveMetrics):
+        pass
+
+
+class DifficultyMetrics:
+    """
+    Aggregated metrics of computer moves of one difficulty.
+
+    Attributes:
+        bucket_counts (list): Number of moves per LATENCY_BUCKETS_SEC bucket, with one extra bucket for slower moves.
+        moves (int): Number of moves.
+        search_sec (float): Total time spent choosing moves.
+        nodes (int): Total number of positions searched.
+        cutoffs (int): Total number of alpha-beta cutoffs.
+        cache_hits (int): Total number of transposition table, perfect play table and move service cache hits.
+        coalesced (int): Number of moves whose optimal move came from a move service search of another request.
+        mistakes (int): Number of deliberately non optimal moves.
+
+    Methods:
+        add(metrics): Adds MoveMetrics of one move.
+    """
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS_SEC) + 1)
+        self.moves = 0
+        self.search_sec = 0.0
+        self.nodes = 0
+        self.cutoffs = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.mistakes = 0
+
+    def add(self, metrics: MoveMetrics):
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS_SEC, metrics.search_sec)] += 1
+        self.moves += 1
+        self.search_sec += metrics.search_sec
+        self.nodes += metrics.nodes
+        self.cutoffs += metrics.cutoffs
+        self.cache_hits += metrics.cache_hits
+        self.coalesced += metrics.coalesced
+        self.mistakes += int(metrics.mistake)
+
+
+class MetricsAggregator(InstrumentationInterface):
+    """
+    Process wide aggregator of computer move metrics, keeping per difficulty latency histograms and search counters.
+
+    Attributes:
+        last_move (MoveMetrics): Metrics of most recent move, None before first move.
+
+    Methods:
+        record_move(metrics): Adds metrics of one move.
+        get_difficulty_metrics(): Returns copy of dictionary of difficulty name to DifficultyMetrics.
+        reset(): Clears all aggregated metrics.
+        render_prometheus(): Returns aggregated metrics in Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__difficulties = {}
+        self.last_move = None
+
+    def record_move(self, metrics: MoveMetrics):
+        name = metrics.difficulty.value if metrics.difficulty is not None else 'Unknown'
+        with self.__lock:
+            if name not in self.__difficulties:
+                self.__difficulties[name] = DifficultyMetrics()
+            self.__difficulties[name].add(metrics)
+            self.last_move = metrics
+
+    def get_difficulty_metrics(self):
+        with self.__lock:
+            return dict(self.__difficulties)
+
+    def reset(self):
+        with self.__lock:
+            self.__difficulties = {}
+            self.last_move = None
+
+    def render_prometheus(self):
+        with self.__lock:
+            difficulties = sorted(self.__difficulties.items())
+            lines = ['# HELP %s_move_seconds Time taken by computer to choose a move.' % METRIC_PREFIX,
+                     '# TYPE %s_move_seconds histogram' % METRIC_PREFIX]
+            for (name, aggregate) in difficulties:
+                cumulative = 0
+                for (bound, count) in zip(LATENCY_BUCKETS_SEC + ('+Inf',), aggregate.bucket_counts):
+                    cumulative += count
+                    lines.append('%s_move_seconds_bucket{difficulty="%s",le="%s"} %d' % (METRIC_PREFIX, name, bound, cumulative))
+                lines.append('%s_move_seconds_sum{difficulty="%s"} %.6f' % (METRIC_PREFIX, name, aggregate.search_sec))
+                lines.append('%s_move_seconds_count{difficulty="%s"} %d' % (METRIC_PREFIX, name, aggregate.moves))
+            for (counter, description) in (('nodes', 'Positions searched.'), ('cutoffs', 'Alpha-beta cutoffs.'),
+                                           ('cache_hits', 'Transposition, perfect play table and move service cache hits.'),
+                                           ('coalesced', 'Moves waiting for a move service search of another request.'),
+                                           ('mistakes', 'Deliberately non optimal moves.')):
+                lines.append('# HELP %s_%s_total %s' % (METRIC_PREFIX, counter, description))
+                lines.append('# TYPE %s_%s_total counter' % (METRIC_PREFIX, counter))
+                for (name, aggregate) in difficulties:
+                    lines.append('%s_%s_total{difficulty="%s"} %d' % (METRIC_PREFIX, counter, name, getattr(aggregate, counter)))
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = MetricsAggregator()
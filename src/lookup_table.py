@@ -0,0 +1,192 @@
+import os
+import struct
+import sys
+import zlib
+from model import Move
+from bitboard import BitBoard,get_win_masks,has_won
+from consts import BOARD_DIMENSION
+
+TABLE_MAGIC = b'TTTP'
+TABLE_FORMAT_VERSION = 2
+# Header: magic, format version, board dimension, number of entries, CRC32 of entries.
+HEADER_FORMAT = '<4sBBII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+# Entry: score for player to move and bitmask of best moves. Unreachable or finished positions have NO_SCORE.
+ENTRY_FORMAT = '<bH'
+ENTRY_SIZE = struct.calcsize(ENTRY_FORMAT)
+NO_SCORE = -128
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perfect_play_%dx%d.bin' % (BOARD_DIMENSION, BOARD_DIMENSION))
+
+_TERNARY_CACHE = {}
+
+def get_ternary_digits(dimension=BOARD_DIMENSION):
+    '''
+    Returns a list mapping every cell bitmask to sum of 3^cell for set cells, used to compute position index in O(1).
+    '''
+    if dimension not in _TERNARY_CACHE:
+        cell_count = dimension*dimension
+        digits = [0] * (1 << cell_count)
+        for mask in range(1, 1 << cell_count):
+            lowest_bit = mask & -mask
+            digits[mask] = digits[mask ^ lowest_bit] + 3 ** (lowest_bit.bit_length() - 1)
+        _TERNARY_CACHE[dimension] = digits
+    return _TERNARY_CACHE[dimension]
+
+def get_position_index(mover_mask, opponent_mask, dimension=BOARD_DIMENSION):
+    '''
+    Returns base 3 index of position where each cell digit is 0 for empty, 1 for player to move and 2 for its opponent.
+    '''
+    digits = get_ternary_digits(dimension)
+    return digits[mover_mask] + 2*digits[opponent_mask]
+
+def get_reachable_positions(dimension=BOARD_DIMENSION):
+    '''
+    Returns set of (mover_mask, opponent_mask) for every position reachable from empty board
+    where game is still in progress, irrespective of which player moved first.
+    '''
+    win_masks = get_win_masks(dimension)
+    full_mask = (1 << (dimension*dimension)) - 1
+    positions = set()
+    pending = [(0, 0)]
+    while pending:
+        (mover_mask, opponent_mask) = pending.pop()
+        if (mover_mask, opponent_mask) in positions:
+            continue
+        if has_won(opponent_mask, win_masks) or (mover_mask | opponent_mask) == full_mask:
+            continue
+        positions.add((mover_mask, opponent_mask))
+        free_mask = full_mask & ~(mover_mask | opponent_mask)
+        while free_mask:
+            bit = free_mask & -free_mask
+            free_mask ^= bit
+            pending.append((opponent_mask, mover_mask | bit))
+    return positions
+
+
+class PerfectPlayTable:
+    """
+    Read only table of precomputed perfect play results, indexed by position index.
+    Table file is memory mapped if possible, so loading it costs no parsing.
+
+    Attributes:
+        dimension (int): Board dimension for which table was built.
+
+    Methods:
+        load(path): Returns PerfectPlayTable for file at path or None if file is missing, stale, truncated or corrupted.
+        get_entry(mover_mask, opponent_mask): Returns (score, best_moves_mask) for position or None if not in table.
+        get_best_move(board, marker): Returns best move for marker on board or None if position is not in table or board has another win length.
+        close(): Releases memory mapped file.
+    """
+
+    def __init__(self, data, dimension=BOARD_DIMENSION):
+        self.dimension = dimension
+        self.__data = data
+
+    @classmethod
+    def load(cls, path=DEFAULT_TABLE_PATH, dimension=BOARD_DIMENSION):
+        try:
+            with open(path, 'rb') as file:
+                try:
+                    import mmap
+                    data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                except (ImportError, OSError, ValueError):
+                    data = file.read()
+        except OSError:
+            return None
+        if len(data) < HEADER_SIZE or not _is_valid_table(data, dimension):
+            if hasattr(data, 'close'):
+                data.close()
+            return None
+        return cls(data, dimension)
+
+    def get_entry(self, mover_mask, opponent_mask):
+        offset = HEADER_SIZE + get_position_index(mover_mask, opponent_mask, self.dimension)*ENTRY_SIZE
+        (score, best_moves_mask) = struct.unpack_from(ENTRY_FORMAT, self.__data, offset)
+        if score == NO_SCORE:
+            return None
+        return (score, best_moves_mask)
+
+    def get_best_move(self, board: BitBoard, marker: Move):
+        # Table is built for win length equal to dimension.
+        if board.dimension != self.dimension or board.win_length != self.dimension:
+            return None
+        opponent = Move.X if marker == Move.O else Move.O
+        entry = self.get_entry(board.get_mask(marker), board.get_mask(opponent))
+        if entry is None:
+            return None
+        best_moves_mask = entry[1]
+        return divmod((best_moves_mask & -best_moves_mask).bit_length() - 1, self.dimension)
+
+    def close(self):
+        if hasattr(self.__data, 'close'):
+            self.__data.close()
+
+
+def _is_valid_table(data, dimension):
+    (magic, version, table_dimension, entry_count, checksum) = struct.unpack_from(HEADER_FORMAT, data)
+    # Size and checksum catch a table whose body was cut short or damaged after its header was written.
+    return magic == TABLE_MAGIC and version == TABLE_FORMAT_VERSION and table_dimension == dimension \
+        and entry_count == 3 ** (dimension*dimension) and len(data) == HEADER_SIZE + entry_count*ENTRY_SIZE \
+        and zlib.crc32(data[HEADER_SIZE:]) == checksum
+
+def load_or_build_table(path=DEFAULT_TABLE_PATH, dimension=BOARD_DIMENSION):
+    '''
+    Returns PerfectPlayTable for file at path, rebuilding the file first if it exists but is stale, truncated or corrupted.
+    Returns None if file is missing, as building it is optional, or if it can not be rebuilt.
+    '''
+    table = PerfectPlayTable.load(path, dimension)
+    if table is not None or not os.path.exists(path):
+        return table
+    try:
+        build_table(path, dimension)
+    except OSError:
+        return None
+    return PerfectPlayTable.load(path, dimension)
+
+def build_table(path=DEFAULT_TABLE_PATH, dimension=BOARD_DIMENSION):
+    '''
+    Solves every reachable position once with minimax and writes the table to path.
+    For each position, table stores minimax score for player to move and bitmask of all moves having that score.
+    '''
+    from computer import minimax
+    entry_count = 3 ** (dimension*dimension)
+    entries = bytearray(struct.pack(ENTRY_FORMAT, NO_SCORE, 0) * entry_count)
+    for (mover_mask, opponent_mask) in get_reachable_positions(dimension):
+        board = BitBoard(mover_mask, opponent_mask, dimension)
+        scores = {}
+        for (row,col) in board.get_available_moves():
+            board.set_cell(row, col, Move.X)
+            scores[(row,col)] = minimax(False, board, Move.X)
+            board.set_cell(row, col, Move.EMPTY)
+        best_score = max(scores.values())
+        best_moves_mask = sum(1 << (row*dimension + col) for ((row,col), score) in scores.items() if score == best_score)
+        struct.pack_into(ENTRY_FORMAT, entries, get_position_index(mover_mask, opponent_mask, dimension)*ENTRY_SIZE, best_score, best_moves_mask)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(struct.pack(HEADER_FORMAT, TABLE_MAGIC, TABLE_FORMAT_VERSION, dimension, entry_count, zlib.crc32(entries)))
+        file.write(entries)
+    os.replace(temp_path, path)
+
+def verify_table(table: PerfectPlayTable):
+    '''
+    Returns list of positions, as (mover_mask, opponent_mask), for which table move differs from live get_best_move search.
+    '''
+    from computer import get_best_move
+    mismatches = []
+    for (mover_mask, opponent_mask) in get_reachable_positions(table.dimension):
+        board = BitBoard(mover_mask, opponent_mask, table.dimension)
+        if table.get_best_move(board, Move.X) != get_best_move(board.get_available_moves(), board, Move.X):
+            mismatches.append((mover_mask, opponent_mask))
+    return mismatches
+
+
+if __name__ == '__main__':
+    # Usage: python lookup_table.py [table_path]
+    table_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TABLE_PATH
+    build_table(table_path)
+    table = PerfectPlayTable.load(table_path)
+    mismatches = verify_table(table)
+    table.close()
+    if mismatches:
+        sys.exit('Table %s does not match live search for %d positions' % (table_path, len(mismatches)))
+    print('Table written to %s' % table_path)
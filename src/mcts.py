@@ -0,0 +1,237 @@
+import math
+import multiprocessing
+import random
+import time
+from model import Difficulty,Move
+from bitboard import BitBoard,get_cell_win_masks
+from computer import ComputerInterface,SearchStats,get_opponent_marker,to_bitboard
+from consts import MCTS_EXPLORATION,MCTS_PLAYOUTS,MCTS_TIME_BUDGET_SEC,MCTS_WORKERS
+
+# Clock is read once every this many playouts.
+TIME_CHECK_INTERVAL = 64
+WIN_REWARD = 1.0
+DRAW_REWARD = 0.5
+# Random bits drawn per free cell by rollout, enough for unbiased shuffles of boards up to 128 cells.
+ROLLOUT_RANDOM_BITS_PER_CELL = 7
+
+
+class MCTSNode:
+    '''
+    Node of Monte Carlo search tree for position with mover_mask to move.
+    cell is index of cell played to reach node from parent, wins is sum of rewards of playouts through node
+    for player who played that cell (1 for win, 0.5 for draw). result is that reward if node is a finished position, else None.
+    '''
+    __slots__ = ('mover_mask', 'opponent_mask', 'free_cells', 'parent', 'cell', 'children', 'untried_cells', 'visits', 'wins', 'result')
+
+    def __init__(self, mover_mask, opponent_mask, free_cells, parent=None, cell=None, result=None):
+        self.mover_mask = mover_mask
+        self.opponent_mask = opponent_mask
+        self.free_cells = free_cells
+        self.parent = parent
+        self.cell = cell
+        self.children = []
+        self.untried_cells = list(free_cells) if result is None else []
+        self.visits = 0
+        self.wins = 0.0
+        self.result = result
+
+    def expand(self, cell, cell_win_masks):
+        new_mask = self.mover_mask | (1 << cell)
+        free_cells = tuple(free_cell for free_cell in self.free_cells if free_cell != cell)
+        result = None
+        for win_mask in cell_win_masks[cell]:
+            if new_mask & win_mask == win_mask:
+                result = WIN_REWARD
+                break
+        else:
+            if not free_cells:
+                result = DRAW_REWARD
+        child = MCTSNode(self.opponent_mask, new_mask, free_cells, self, cell, result)
+        self.children.append(child)
+        return child
+
+
+def rollout(mover_mask, opponent_mask, free_cells, cell_win_masks, getrandbits):
+    '''
+    Plays random moves from position till game ends. Returns 1 if player owning mover_mask (to move) wins, -1 if opponent wins, 0 for draw.
+    Moves are drawn by an incremental Fisher-Yates shuffle of free cells, taking all random digits from a single getrandbits call.
+    '''
+    cells = list(free_cells)
+    remaining = len(cells)
+    randoms = getrandbits(remaining*ROLLOUT_RANDOM_BITS_PER_CELL + 32)
+    turn = 1
+    while remaining:
+        (randoms, index) = divmod(randoms, remaining)
+        remaining -= 1
+        cell = cells[index]
+        cells[index] = cells[remaining]
+        if turn > 0:
+            mover_mask |= 1 << cell
+            mask = mover_mask
+        else:
+            opponent_mask |= 1 << cell
+            mask = opponent_mask
+        for win_mask in cell_win_masks[cell]:
+            if mask & win_mask == win_mask:
+                return turn
+        turn = -turn
+    return 0
+
+def run_playouts(root: MCTSNode, cell_win_masks, time_budget=None, playouts=None, exploration=MCTS_EXPLORATION, rng=random):
+    '''
+    Grows tree under root by UCT selection, one expansion and one random rollout per playout, until time_budget seconds pass
+    or playouts playouts are done, whichever comes first. Clock is first read after TIME_CHECK_INTERVAL playouts,
+    so root always gets expanded. Returns number of playouts done.
+    '''
+    deadline = time.perf_counter() + time_budget if time_budget else None
+    playouts = playouts if playouts else math.inf
+    (log, sqrt, randrange, getrandbits) = (math.log, math.sqrt, rng.randrange, rng.getrandbits)
+    done = 0
+    while done < playouts:
+        if deadline is not None and done and done % TIME_CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+            break
+        node = root
+        while not node.untried_cells and node.children:
+            log_visits = log(node.visits)
+            best_value = -1.0
+            for child in node.children:
+                value = child.wins / child.visits + exploration * sqrt(log_visits / child.visits)
+                if value > best_value:
+                    (best_value, best_child) = (value, child)
+            node = best_child
+        if node.untried_cells:
+            untried_cells = node.untried_cells
+            node = node.expand(untried_cells.pop(randrange(len(untried_cells))), cell_win_masks)
+        if node.result is not None:
+            reward = node.result
+        else:
+            # Rollout outcome is for player to move at node, reward is for player who moved into node.
+            reward = (1 - rollout(node.mover_mask, node.opponent_mask, node.free_cells, cell_win_masks, getrandbits)) / 2
+        while node is not None:
+            node.visits += 1
+            node.wins += reward
+            reward = 1 - reward
+            node = node.parent
+        done += 1
+    return done
+
+def create_root(mover_mask, opponent_mask, dimension):
+    free_mask = ((1 << (dimension*dimension)) - 1) & ~(mover_mask | opponent_mask)
+    return MCTSNode(mover_mask, opponent_mask, tuple(cell for cell in range(dimension*dimension) if free_mask >> cell & 1))
+
+def search_new_tree(mover_mask, opponent_mask, dimension, win_length, time_budget, playouts, exploration, seed):
+    '''
+    Runs playouts in a new tree for position, used by root parallel worker processes.
+    Returns tuple of number of playouts done and dictionary of root move cell index to (visits, wins).
+    '''
+    root = create_root(mover_mask, opponent_mask, dimension)
+    done = run_playouts(root, get_cell_win_masks(dimension, win_length), time_budget, playouts, exploration, random.Random(seed))
+    return (done, {child.cell: (child.visits, child.wins) for child in root.children})
+
+def _search_new_tree_task(task):
+    return search_new_tree(*task)
+
+_pool = None
+_pool_processes = 0
+
+def get_worker_pool(processes):
+    '''
+    Returns process pool with given number of processes for root parallel searches, shared by all MCTSComputer of the process.
+    '''
+    global _pool, _pool_processes
+    if _pool is None or _pool_processes != processes:
+        close_worker_pool()
+        _pool = multiprocessing.Pool(processes)
+        _pool_processes = processes
+    return _pool
+
+def close_worker_pool():
+    global _pool, _pool_processes
+    if _pool is not None:
+        _pool.terminate()
+        _pool.join()
+    (_pool, _pool_processes) = (None, 0)
+
+
+class MCTSComputer(ComputerInterface):
+    """
+    Computer choosing moves by Monte Carlo tree search with UCT selection and random rollouts, for boards too large for minimax.
+    Search is anytime: it stops after time_budget seconds or playouts playouts, whichever comes first, and plays most visited move.
+    With workers > 1, workers-1 processes search the same position in their own new trees while this process grows its tree
+    (root parallelism), and visits of root moves of all trees are added up.
+    Tree of this process is kept between moves of a game: subtree of the position after opponent's reply becomes next root.
+
+    Attributes:
+        time_budget (float): Maximum seconds per move, None for no limit.
+        playouts (int): Maximum playouts per move, over all processes, None for no limit.
+        workers (int): Number of processes searching every move.
+        exploration (float): UCT exploration constant.
+        last_playouts (int): Number of playouts done for last move, over all processes.
+        last_search_sec (float): Wall clock seconds spent on last move.
+        last_reused_visits (int): Visits of root kept from earlier moves, when last move started.
+
+    Methods:
+        get_playouts_per_second(): Returns playouts per second of last move.
+    """
+    difficulty = Difficulty.MONTE_CARLO
+
+    def __init__(self, time_budget=MCTS_TIME_BUDGET_SEC, playouts=MCTS_PLAYOUTS, workers=MCTS_WORKERS, exploration=MCTS_EXPLORATION):
+        self.time_budget = time_budget
+        self.playouts = playouts
+        self.workers = workers
+        self.exploration = exploration
+        self.last_playouts = 0
+        self.last_search_sec = 0.0
+        self.last_reused_visits = 0
+        self.__root = None
+        self.__geometry = None
+
+    def get_playouts_per_second(self):
+        return self.last_playouts / self.last_search_sec if self.last_search_sec else 0.0
+
+    def _choose_move(self, board, computerMarker: Move, stats: SearchStats, best_move):
+        bitboard = to_bitboard(board)
+        mover_mask = bitboard.get_mask(computerMarker)
+        opponent_mask = bitboard.get_mask(get_opponent_marker(computerMarker))
+        start = time.perf_counter()
+        root = self.__get_root(mover_mask, opponent_mask, bitboard)
+        self.last_reused_visits = root.visits
+        local_playouts = self.playouts // self.workers + self.playouts % self.workers if self.playouts else None
+        pending = None
+        if self.workers > 1:
+            tasks = [(mover_mask, opponent_mask, bitboard.dimension, bitboard.win_length, self.time_budget,
+                      self.playouts // self.workers if self.playouts else None, self.exploration, random.getrandbits(32)) for _ in range(self.workers-1)]
+            pending = get_worker_pool(self.workers-1).map_async(_search_new_tree_task, tasks)
+        done = run_playouts(root, get_cell_win_masks(bitboard.dimension, bitboard.win_length), self.time_budget, local_playouts, self.exploration)
+        visits = {child.cell: child.visits for child in root.children}
+        if pending is not None:
+            for (worker_done, worker_children) in pending.get():
+                done += worker_done
+                for (cell, (child_visits, _)) in worker_children.items():
+                    visits[cell] = visits.get(cell, 0) + child_visits
+        self.last_playouts = done
+        self.last_search_sec = time.perf_counter() - start
+        if stats is not None:
+            stats.nodes += done
+        cell = max(sorted(visits), key=lambda cell: visits[cell])
+        self.__keep_subtree(root, cell)
+        return divmod(cell, bitboard.dimension)
+
+    def __get_root(self, mover_mask, opponent_mask, bitboard: BitBoard):
+        geometry = (bitboard.dimension, bitboard.win_length)
+        if self.__root is not None and self.__geometry == geometry:
+            if (self.__root.mover_mask, self.__root.opponent_mask) == (mover_mask, opponent_mask):
+                return self.__root
+            for child in self.__root.children:
+                if (child.mover_mask, child.opponent_mask) == (mover_mask, opponent_mask):
+                    child.parent = None
+                    return child
+        self.__geometry = geometry
+        return create_root(mover_mask, opponent_mask, bitboard.dimension)
+
+    def __keep_subtree(self, root: MCTSNode, cell):
+        self.__root = None
+        for child in root.children:
+            if child.cell == cell:
+                child.parent = None
+                self.__root = child
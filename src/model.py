@@ -1,4 +1,3 @@
-import param
 from enum import Enum
 
 class Move(Enum):
@@ -10,12 +9,20 @@ class Difficulty(Enum):
     EASY = 'Easy'
     INTERMEDIATE = 'Intermediate'
     PRO = 'Pro'
+    MONTE_CARLO = 'Monte Carlo'
 
 class GameStatus(Enum):
     DRAW = 'Draw'
     WIN = 'Win'
     IN_PROGRESS = 'In Progress'    
 
-class Cell(param.Parameterized):
-    winning_cell = param.Boolean(default=False)
-    move = param.ObjectSelector(default=Move.EMPTY, objects=[Move.EMPTY, Move.X, Move.O])
\ No newline at end of file
+class Cell:
+    '''
+    Cell of the board grid having move made in it and whether it is part of the winning line.
+    Plain slotted class rather than Parameterized, as nothing watches a cell and every session holds a full grid of them.
+    '''
+    __slots__ = ('move', 'winning_cell')
+
+    def __init__(self, move=Move.EMPTY, winning_cell=False):
+        self.move = move
+        self.winning_cell = winning_cell
\ No newline at end of file
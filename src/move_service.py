@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from model import Move
+from computer import BestMoveSearch,ComputerInterface,SearchStats,get_perfect_move,to_bitboard
+from transposition import TranspositionTable
+from consts import MOVE_CACHE_SIZE,MOVE_SERVICE_WORKERS
+
+
+class MoveService:
+    """
+    Process level service computing optimal moves for all game sessions.
+    Identical positions requested while a search for them is running share that search, finished searches are
+    answered from a bounded result cache and remaining searches run on a bounded pool of worker threads.
+    Optimal move of a position does not depend on difficulty, so one cache entry serves every difficulty needing it.
+
+    Attributes:
+        max_workers (int): Maximum number of searches running at the same time.
+        requests (int): Number of best move requests.
+        cache_hits (int): Number of requests answered from result cache.
+        coalesced (int): Number of requests which joined a search already running for the same position.
+        searches (int): Number of searches started.
+
+    Methods:
+        submit(board, marker): Returns concurrent.futures.Future of optimal move for marker on board.
+        submit_search(board, marker): Returns concurrent.futures.Future of BestMoveSearch of optimal move for marker on board,
+            with effort and seconds of the search, or a cache hit or coalesced request with no search effort.
+            Every call returns a new future, which caller may cancel without affecting other requests.
+        get_move(computer, board, marker, delay=0): Coroutine returning computer's move, using optimal move from the service if computer needs it.
+        get_pending_count(): Returns number of searches submitted but not finished.
+        shutdown(): Waits for running searches and stops worker threads.
+    """
+
+    def __init__(self, max_workers=MOVE_SERVICE_WORKERS, cache_size=MOVE_CACHE_SIZE):
+        self.max_workers = max_workers
+        self.requests = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.searches = 0
+        self.__lock = threading.Lock()
+        self.__cache = TranspositionTable(cache_size)
+        self.__in_flight = {}
+        self.__executor = None
+
+    def submit(self, board, marker: Move):
+        future = Future()
+        self.submit_search(board, marker).add_done_callback(lambda done: copy_result(done, future, lambda search: search.move))
+        return future
+
+    def submit_search(self, board, marker: Move):
+        bitboard = to_bitboard(board)
+        key = (bitboard.x_mask, bitboard.o_mask, bitboard.dimension, bitboard.win_length, marker)
+        snapshot = bitboard.snapshot()
+        with self.__lock:
+            self.requests += 1
+            best_move = self.__cache.get(key)
+            if best_move is not None:
+                self.cache_hits += 1
+                stats = SearchStats()
+                stats.cache_hits = 1
+                future = Future()
+                future.set_result(BestMoveSearch(best_move, stats, 0.0))
+                return future
+            future = self.__in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return join_search(future)
+            self.searches += 1
+            future = self.__get_executor().submit(_search, snapshot, marker)
+            self.__in_flight[key] = future
+        future.add_done_callback(lambda done: self.__complete(key, done))
+        # Callers get their own future, so a caller cancelling it does not cancel search shared with coalesced requests.
+        caller_future = Future()
+        future.add_done_callback(lambda done: copy_result(done, caller_future))
+        return caller_future
+
+    async def get_move(self, computer: ComputerInterface, board, marker: Move, delay=0):
+        '''
+        Returns move of computer for marker on board. Optimal move search starts before waiting delay seconds,
+        so search time is hidden behind the delay. Computers not needing optimal move never submit a search.
+        Computer may still search on its own (like MCTSComputer, or IntermediateComputer making a mistake),
+        so its choose_move also runs on a worker thread rather than on the event loop.
+        Effort and seconds of the optimal move search are reported with computer's move to its instrumentation.
+        '''
+        future = self.submit_search(board, marker) if computer.needs_best_move else None
+        if delay:
+            await asyncio.sleep(delay)
+        best_move_search = await asyncio.wrap_future(future) if future is not None else None
+        best_move = best_move_search.move if best_move_search is not None else None
+        with self.__lock:
+            move_future = self.__get_executor().submit(computer.choose_move, board, marker, best_move, best_move_search)
+        return await asyncio.wrap_future(move_future)
+
+    def get_pending_count(self):
+        with self.__lock:
+            return len(self.__in_flight)
+
+    def shutdown(self):
+        with self.__lock:
+            executor = self.__executor
+            self.__executor = None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def __get_executor(self):
+        # Called with lock held.
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='move-service')
+        return self.__executor
+
+    def __complete(self, key, future):
+        with self.__lock:
+            self.__in_flight.pop(key, None)
+            if not future.cancelled() and future.exception() is None:
+                self.__cache.put(key, future.result().move)
+
+
+def _search(board, marker: Move):
+    stats = SearchStats()
+    start = time.perf_counter()
+    best_move = get_perfect_move(board, marker, stats)
+    return BestMoveSearch(best_move, stats, time.perf_counter() - start)
+
+def join_search(future: Future):
+    '''
+    Returns concurrent.futures.Future of BestMoveSearch for a request joining running search of future. Its result has same move,
+    no search effort, as search is counted once by request which started it, and seconds the request waited for the search.
+    '''
+    joined = Future()
+    start = time.perf_counter()
+    def get_joined_search(search):
+        stats = SearchStats()
+        stats.coalesced = 1
+        return BestMoveSearch(search.move, stats, time.perf_counter() - start)
+    future.add_done_callback(lambda done: copy_result(done, joined, get_joined_search))
+    return joined
+
+def copy_result(source: Future, target: Future, convert=None):
+    '''
+    Completes target future like finished source future, with its result passed through convert if given, its exception or its
+    cancellation. Does nothing if target was already cancelled by its caller.
+    '''
+    if source.cancelled():
+        target.cancel()
+        return
+    if not target.set_running_or_notify_cancel():
+        return
+    if source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(convert(source.result()) if convert is not None else source.result())
+
+
+# Shared by all game sessions of a process.
+SHARED_MOVE_SERVICE = MoveService()
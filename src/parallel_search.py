@@ -0,0 +1,91 @@
+import multiprocessing
+import threading
+from model import Move
+from bitboard import BitBoard
+from computer import SearchContext,SearchStats,WIN_SCORE,_iterative_deepening,_score_move,get_opponent_marker,to_bitboard
+
+_pool = None
+_pool_processes = 0
+# Best root score found so far by any worker of current search, shared by parent and worker processes.
+_shared_best_score = None
+# Searches share the pool and its bound, so only one runs at a time.
+_search_lock = threading.Lock()
+_contexts = {}
+
+
+def _init_worker(shared_best_score):
+    global _shared_best_score
+    _shared_best_score = shared_best_score
+
+def _search_root_move(task):
+    # Returns score of root move and number of nodes searched for it.
+    (mover_mask, opponent_mask, index, depth, dimension, win_length) = task
+    if (dimension, win_length) not in _contexts:
+        _contexts[(dimension, win_length)] = SearchContext(BitBoard(dimension=dimension, win_length=win_length))
+    context = _contexts[(dimension, win_length)]
+    context.stats = SearchStats()
+    # A move scoring below best score so far can not be best move, so its search may fail low just below it.
+    # Moves scoring equal or higher get exact scores, which keeps tie break on root order same as sequential search.
+    alpha = _shared_best_score.value - 1
+    score = _score_move(mover_mask, opponent_mask, index, depth, 1, alpha, WIN_SCORE + 1, context)
+    with _shared_best_score.get_lock():
+        if score > _shared_best_score.value:
+            _shared_best_score.value = score
+    return (score, context.stats.nodes)
+
+def get_search_pool(processes):
+    '''
+    Returns process pool with given number of processes for parallel searches and its shared best score, creating them on first use.
+    '''
+    global _pool, _pool_processes, _shared_best_score
+    if _pool is None or _pool_processes != processes:
+        close_search_pool()
+        _shared_best_score = multiprocessing.Value('i', -WIN_SCORE - 1)
+        _pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(_shared_best_score,))
+        _pool_processes = processes
+    return (_pool, _shared_best_score)
+
+def close_search_pool():
+    global _pool, _pool_processes
+    if _pool is not None:
+        _pool.terminate()
+        _pool.join()
+    (_pool, _pool_processes) = (None, 0)
+
+def search_root_moves_parallel(root_moves, mover_mask, opponent_mask, depth, bitboard: BitBoard, processes=None, stats: SearchStats = None):
+    '''
+    Runs alpha-beta search of given depth for every root move on a pool of processes, root moves being handed out in given order.
+    Workers share best score found so far and search every move with alpha just below it. Returns dictionary of move to score,
+    which is exact for every move scoring at least as high as best score when its search started, and an upper bound lower than
+    best score for others. Hence first move in root order having highest score is same move as sequential search_root_moves picks.
+    '''
+    with _search_lock:
+        (pool, shared_best_score) = get_search_pool(processes or multiprocessing.cpu_count())
+        shared_best_score.value = -WIN_SCORE - 1
+        tasks = [(mover_mask, opponent_mask, row*bitboard.dimension + col, depth, bitboard.dimension, bitboard.win_length) for (row,col) in root_moves]
+        results = pool.map(_search_root_move, tasks, chunksize=1)
+    if stats is not None:
+        stats.nodes += sum(nodes for (_, nodes) in results)
+    return {move: score for (move, (score, _)) in zip(root_moves, results)}
+
+def get_best_move_parallel(available_moves, board, computerMarker: Move, depth, processes=None, stats: SearchStats = None):
+    '''
+    Returns same move as get_best_move_within_budget(available_moves, board, computerMarker, time_budget=None, max_depth=depth),
+    searching last depth in parallel over root moves on processes processes (all cores by default).
+    Shallower iterations only order root moves and take a small part of the time, so they run in this process, which also keeps
+    root order of last depth same as in sequential search.
+    '''
+    bitboard = to_bitboard(board)
+    depth = min(depth, len(available_moves))
+    if depth > 1:
+        (root_moves, scores) = _iterative_deepening(available_moves, bitboard, computerMarker, None, depth-1, stats, False)
+        # Sequential search stops deepening once a forced result is found.
+        if abs(scores[root_moves[0]]) > WIN_SCORE - len(available_moves) - 1:
+            return root_moves[0]
+    else:
+        context = SearchContext(bitboard)
+        root_moves = sorted(available_moves, key=lambda move: context.cell_order[move[0]*bitboard.dimension + move[1]])
+    scores = search_root_moves_parallel(root_moves, bitboard.get_mask(computerMarker), bitboard.get_mask(get_opponent_marker(computerMarker)),
+                                        depth, bitboard, processes, stats)
+    best_score = max(scores.values())
+    return next(move for move in root_moves if scores[move] == best_score)
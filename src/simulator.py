@@ -0,0 +1,155 @@
+import argparse
+import multiprocessing
+import random
+import time
+from model import Difficulty,GameStatus,Move
+from bitboard import BitBoard
+from computer import get_computer_by_difficulty
+from consts import BOARD_DIMENSION
+
+PLAYER_A = 'A'
+PLAYER_B = 'B'
+DRAW = 'Draw'
+
+
+class SimulationStats:
+    """
+    Aggregated results of simulated games between player A and player B.
+
+    Attributes:
+        games (int): Number of games played.
+        results (dict): Number of games for every (first mover, outcome) pair, where first mover is PLAYER_A or PLAYER_B
+            and outcome is PLAYER_A, PLAYER_B or DRAW.
+        game_lengths (dict): Number of games for every game length in moves.
+        elapsed_sec (float): Wall clock time spent playing games.
+
+    Methods:
+        add_game(first_mover, outcome, length): Records result of one game.
+        merge(other): Adds results of other SimulationStats to this one.
+        get_outcome_count(outcome, first_mover=None): Returns number of games with outcome, optionally only where first_mover started.
+        get_average_length(): Returns average game length in moves.
+        get_games_per_second(): Returns number of games played per second of elapsed time.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.results = {(first_mover, outcome): 0 for first_mover in (PLAYER_A, PLAYER_B) for outcome in (PLAYER_A, PLAYER_B, DRAW)}
+        self.game_lengths = {}
+        self.elapsed_sec = 0.0
+
+    def add_game(self, first_mover, outcome, length):
+        self.games += 1
+        self.results[(first_mover, outcome)] += 1
+        self.game_lengths[length] = self.game_lengths.get(length, 0) + 1
+
+    def merge(self, other):
+        self.games += other.games
+        for (key, count) in other.results.items():
+            self.results[key] += count
+        for (length, count) in other.game_lengths.items():
+            self.game_lengths[length] = self.game_lengths.get(length, 0) + count
+
+    def get_outcome_count(self, outcome, first_mover=None):
+        return sum(count for ((mover, result), count) in self.results.items() if result == outcome and first_mover in (None, mover))
+
+    def get_average_length(self):
+        return sum(length*count for (length, count) in self.game_lengths.items()) / self.games if self.games else 0.0
+
+    def get_games_per_second(self):
+        return self.games / self.elapsed_sec if self.elapsed_sec else 0.0
+
+    def __str__(self):
+        lines = ['Games: %d, %.0f games/sec, average length %.2f moves' % (self.games, self.get_games_per_second(), self.get_average_length())]
+        for first_mover in (PLAYER_A, PLAYER_B):
+            lines.append('%s first: A won %d, B won %d, draw %d' % (first_mover, self.get_outcome_count(PLAYER_A, first_mover),
+                self.get_outcome_count(PLAYER_B, first_mover), self.get_outcome_count(DRAW, first_mover)))
+        return '\n'.join(lines)
+
+
+def play_game(first_computer, second_computer, dimension=BOARD_DIMENSION, win_length=None):
+    '''
+    Plays one game between two ComputerInterface implementations without any delay, first_computer playing X.
+    Returns tuple of final GameStatus, winning Move (Move.EMPTY for draw) and number of moves played.
+    '''
+    board = BitBoard(dimension=dimension, win_length=win_length)
+    players = ((first_computer, Move.X), (second_computer, Move.O))
+    moves = 0
+    while True:
+        (computer, marker) = players[moves % 2]
+        (row, col) = computer.choose_move(board, marker)
+        board.set_cell(row, col, marker)
+        moves += 1
+        game_state = board.get_game_state()
+        if game_state[0] == GameStatus.WIN:
+            return (GameStatus.WIN, game_state[1], moves)
+        if game_state[0] == GameStatus.DRAW:
+            return (GameStatus.DRAW, Move.EMPTY, moves)
+
+def play_batch(difficulty_a: Difficulty, difficulty_b: Difficulty, games, seed, first_game_index=0, dimension=BOARD_DIMENSION, win_length=None):
+    '''
+    Plays a batch of games between new computers of given difficulties, alternating first mover between games.
+    Random generator is seeded with seed, so a batch always plays same games irrespective of worker running it.
+    '''
+    random.seed(seed)
+    stats = SimulationStats()
+    start = time.perf_counter()
+    for game_index in range(first_game_index, first_game_index + games):
+        computer_a = get_computer_by_difficulty(difficulty_a)
+        computer_b = get_computer_by_difficulty(difficulty_b)
+        if game_index % 2 == 0:
+            (first_mover, players) = (PLAYER_A, (computer_a, computer_b))
+        else:
+            (first_mover, players) = (PLAYER_B, (computer_b, computer_a))
+        (status, winner, length) = play_game(players[0], players[1], dimension, win_length)
+        if status == GameStatus.DRAW:
+            outcome = DRAW
+        elif (winner == Move.X) == (first_mover == PLAYER_A):
+            outcome = PLAYER_A
+        else:
+            outcome = PLAYER_B
+        stats.add_game(first_mover, outcome, length)
+    stats.elapsed_sec = time.perf_counter() - start
+    return stats
+
+def _play_batch_task(task):
+    return play_batch(*task)
+
+def run_simulation(difficulty_a: Difficulty, difficulty_b: Difficulty, games, workers=None, batch_size=1000, seed=0, dimension=BOARD_DIMENSION, win_length=None):
+    '''
+    Plays games between computers of given difficulties on a pool of worker processes.
+    Generator yielding aggregated SimulationStats after every completed batch, last one having results of all games.
+    Batch i is seeded with seed + i, so results of a simulation are reproducible for a given seed and batch size.
+    '''
+    tasks = []
+    for (batch_index, first_game_index) in enumerate(range(0, games, batch_size)):
+        tasks.append((difficulty_a, difficulty_b, min(batch_size, games - first_game_index), seed + batch_index, first_game_index, dimension, win_length))
+    total = SimulationStats()
+    start = time.perf_counter()
+    workers = workers or multiprocessing.cpu_count()
+    if workers == 1:
+        for task in tasks:
+            total.merge(_play_batch_task(task))
+            total.elapsed_sec = time.perf_counter() - start
+            yield total
+        return
+    with multiprocessing.Pool(workers) as pool:
+        for stats in pool.imap_unordered(_play_batch_task, tasks):
+            total.merge(stats)
+            total.elapsed_sec = time.perf_counter() - start
+            yield total
+
+
+if __name__ == '__main__':
+    difficulties = {difficulty.name.lower(): difficulty for difficulty in Difficulty}
+    parser = argparse.ArgumentParser(description='Plays games between two computer difficulty levels without UI.')
+    parser.add_argument('player_a', choices=difficulties.keys())
+    parser.add_argument('player_b', choices=difficulties.keys())
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    stats = None
+    for stats in run_simulation(difficulties[args.player_a], difficulties[args.player_b], args.games, args.workers, args.batch_size, args.seed):
+        print('%d/%d games, %.0f games/sec' % (stats.games, args.games, stats.get_games_per_second()), flush=True)
+    print(stats)
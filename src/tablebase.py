@@ -0,0 +1,309 @@
+import argparse
+import itertools
+import json
+import mmap
+import os
+import struct
+import time
+from model import Move
+from bitboard import BitBoard,get_cell_win_masks,get_win_masks,has_won
+from lookup_table import NO_SCORE,get_ternary_digits
+from transposition import get_symmetry_tables,transform_mask
+
+TABLEBASE_MAGIC = b'TTTB'
+TABLEBASE_FORMAT_VERSION = 1
+# Header: magic, format version, board dimension, win length, number of entries.
+HEADER_FORMAT = '<4sBBBI'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+# Entry: one signed byte per position index (see lookup_table.get_position_index), score for player to move.
+# A win in n plies scores TABLEBASE_WIN_SCORE - n, a loss in n plies the negation, a draw 0.
+# Finished, unreachable and not yet solved positions have NO_SCORE.
+TABLEBASE_WIN_SCORE = 100
+# Table has 3^cells entries, so boards up to 4x4 (43 MB) are supported.
+TABLEBASE_MAX_CELLS = 16
+# Number of occupied cell masks per task sent to a worker process.
+TASK_SIZE = 64
+WRITE_BLOCK_SIZE = 1 << 20
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_SYMMETRIC_TERNARY_CACHE = {}
+
+def get_tablebase_path(dimension, win_length=None):
+    '''
+    Returns default path of tablebase file for board geometry, next to this module.
+    '''
+    return os.path.join(SRC_DIR, 'tablebase_%dx%d_k%d.bin' % (dimension, dimension, win_length or dimension))
+
+def get_symmetric_ternary_digits(dimension):
+    '''
+    Returns a list with one table per board symmetry, mapping every cell bitmask to ternary digits of its image under that symmetry.
+    Position index of image of (mover_mask, opponent_mask) is then table[mover_mask] + 2*table[opponent_mask]. Identity is first.
+    '''
+    if dimension not in _SYMMETRIC_TERNARY_CACHE:
+        digits = get_ternary_digits(dimension)
+        _SYMMETRIC_TERNARY_CACHE[dimension] = [[digits[transform_mask(mask, chunk_tables)] for mask in range(1 << (dimension*dimension))]
+                                               for chunk_tables in get_symmetry_tables(dimension)]
+    return _SYMMETRIC_TERNARY_CACHE[dimension]
+
+def get_parent_score(child_score):
+    '''
+    Returns score for player who moved into a position which scores child_score for its player to move.
+    '''
+    if child_score > 0:
+        return 1 - child_score
+    if child_score < 0:
+        return -1 - child_score
+    return 0
+
+def _to_signed(byte):
+    return byte - 256 if byte > 127 else byte
+
+
+class Tablebase:
+    """
+    Read only table of retrograde analysis results for every position of one board dimension and win length.
+    Table file is memory mapped if possible, so loading it costs no parsing and only looked up pages are read.
+
+    Attributes:
+        dimension (int): Board dimension for which table was generated.
+        win_length (int): Win length for which table was generated.
+
+    Methods:
+        load(path, dimension, win_length): Returns Tablebase for complete file at path or None if file is missing or for another board.
+        get_score(mover_mask, opponent_mask): Returns score of position for player to move or None if not in table.
+        get_move_scores(board, marker): Returns dictionary of every available move, in board order, to its score for marker.
+        get_best_move(board, marker): Returns move winning fastest, or losing slowest, for marker or None if position is not in table.
+        close(): Releases memory mapped file.
+    """
+
+    def __init__(self, data, dimension, win_length):
+        self.dimension = dimension
+        self.win_length = win_length
+        self.__data = data
+        self.__ternary_digits = get_ternary_digits(dimension)
+        self.__cell_win_masks = get_cell_win_masks(dimension, win_length)
+
+    @classmethod
+    def load(cls, path, dimension, win_length=None):
+        win_length = win_length or dimension
+        try:
+            with open(path, 'rb') as file:
+                try:
+                    data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    data = file.read()
+        except OSError:
+            return None
+        if len(data) < HEADER_SIZE:
+            return None
+        (magic, version, table_dimension, table_win_length, entry_count) = struct.unpack_from(HEADER_FORMAT, data)
+        if magic != TABLEBASE_MAGIC or version != TABLEBASE_FORMAT_VERSION or (table_dimension, table_win_length) != (dimension, win_length) \
+            or entry_count != 3 ** (dimension*dimension) or len(data) != HEADER_SIZE + entry_count:
+            return None
+        return cls(data, dimension, win_length)
+
+    def get_score(self, mover_mask, opponent_mask):
+        score = _to_signed(self.__data[HEADER_SIZE + self.__ternary_digits[mover_mask] + 2*self.__ternary_digits[opponent_mask]])
+        return None if score == NO_SCORE else score
+
+    def get_move_scores(self, board: BitBoard, marker: Move):
+        if (board.dimension, board.win_length) != (self.dimension, self.win_length):
+            return None
+        mover_mask = board.get_mask(marker)
+        opponent_mask = board.get_mask(Move.X if marker == Move.O else Move.O)
+        if self.get_score(mover_mask, opponent_mask) is None:
+            return None
+        free_mask = board.full_mask & ~(mover_mask | opponent_mask)
+        scores = {}
+        for index in range(self.dimension*self.dimension):
+            bit = 1 << index
+            if not free_mask & bit:
+                continue
+            new_mask = mover_mask | bit
+            if has_won(new_mask, self.__cell_win_masks[index]):
+                score = TABLEBASE_WIN_SCORE - 1
+            elif free_mask == bit:
+                score = 0
+            else:
+                score = get_parent_score(self.get_score(opponent_mask, new_mask))
+            scores[divmod(index, self.dimension)] = score
+        return scores
+
+    def get_best_move(self, board: BitBoard, marker: Move):
+        scores = self.get_move_scores(board, marker)
+        if not scores:
+            return None
+        return max(scores, key=scores.get)
+
+    def close(self):
+        if hasattr(self.__data, 'close'):
+            self.__data.close()
+
+
+class _LevelSolver:
+    # Per process state of the generator: lookup tables and a read only mapping of table file being generated.
+
+    def __init__(self, path, dimension, win_length):
+        self.full_mask = (1 << (dimension*dimension)) - 1
+        self.win_masks = get_win_masks(dimension, win_length)
+        self.cell_win_masks = get_cell_win_masks(dimension, win_length)
+        self.ternary_digits = get_ternary_digits(dimension)
+        self.symmetric_ternary_digits = get_symmetric_ternary_digits(dimension)
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def solve(self, level, occupied_masks):
+        '''
+        Solves positions with level moves made whose occupied cells are one of occupied_masks, taking scores of positions
+        one move later from the table. Returns list of (score, indices of all symmetric images) of canonical unfinished positions.
+        Player to move has made level // 2 moves, its opponent the rest.
+        '''
+        (full_mask, win_masks, cell_win_masks, digits, data) = (self.full_mask, self.win_masks, self.cell_win_masks, self.ternary_digits, self.data)
+        results = []
+        for occupied_mask in occupied_masks:
+            cells = [cell for cell in range(full_mask.bit_length()) if occupied_mask >> cell & 1]
+            free_cells = [cell for cell in range(full_mask.bit_length()) if not occupied_mask >> cell & 1]
+            for opponent_cells in itertools.combinations(cells, level - level // 2):
+                opponent_mask = sum(1 << cell for cell in opponent_cells)
+                mover_mask = occupied_mask ^ opponent_mask
+                # Only the image with lowest index is solved, its score is written to every image.
+                indices = {table[mover_mask] + 2*table[opponent_mask] for table in self.symmetric_ternary_digits}
+                if digits[mover_mask] + 2*digits[opponent_mask] != min(indices):
+                    continue
+                if has_won(opponent_mask, win_masks) or has_won(mover_mask, win_masks):
+                    continue
+                best_score = -TABLEBASE_WIN_SCORE
+                for cell in free_cells:
+                    new_mask = mover_mask | (1 << cell)
+                    if has_won(new_mask, cell_win_masks[cell]):
+                        best_score = TABLEBASE_WIN_SCORE - 1
+                        break
+                    if len(free_cells) == 1:
+                        score = 0
+                    else:
+                        score = get_parent_score(_to_signed(data[HEADER_SIZE + digits[opponent_mask] + 2*digits[new_mask]]))
+                    if score > best_score:
+                        best_score = score
+                results.append((best_score, sorted(indices)))
+        return results
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+_solver = None
+
+def _init_solver(path, dimension, win_length):
+    global _solver
+    _solver = _LevelSolver(path, dimension, win_length)
+
+def _solve_task(task):
+    return _solver.solve(*task)
+
+def _close_solver():
+    global _solver
+    if _solver is not None:
+        _solver.close()
+        _solver = None
+
+def _read_state(state_path, partial_path, dimension, win_length):
+    # Returns level to solve next if a matching interrupted generation can be resumed, else None.
+    try:
+        with open(state_path) as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if (state.get('dimension'), state.get('win_length')) != (dimension, win_length) or not os.path.exists(partial_path) \
+        or os.path.getsize(partial_path) != HEADER_SIZE + 3 ** (dimension*dimension):
+        return None
+    return state.get('next_level')
+
+def _write_state(state_path, dimension, win_length, next_level):
+    temp_path = state_path + '.tmp'
+    with open(temp_path, 'w') as file:
+        json.dump({'dimension': dimension, 'win_length': win_length, 'next_level': next_level}, file)
+    os.replace(temp_path, state_path)
+
+def _create_partial_table(partial_path, dimension, win_length):
+    entry_count = 3 ** (dimension*dimension)
+    block = bytes([NO_SCORE & 0xFF]) * WRITE_BLOCK_SIZE
+    with open(partial_path, 'wb') as file:
+        file.write(struct.pack(HEADER_FORMAT, TABLEBASE_MAGIC, TABLEBASE_FORMAT_VERSION, dimension, win_length, entry_count))
+        for start in range(0, entry_count, WRITE_BLOCK_SIZE):
+            file.write(block[:min(WRITE_BLOCK_SIZE, entry_count - start)])
+
+def generate_tablebase(path, dimension, win_length=None, processes=None, max_levels=None, verbose=False):
+    '''
+    Solves every legal position of board by retrograde analysis and writes the table to path.
+    Positions are solved level by level, from positions with one free cell back to empty board, so every position only needs
+    scores of positions one move later, which are already in the table. Only one position of every set of symmetric positions
+    is solved and its score is written for all of them. Positions of a level are solved in parallel by processes worker processes
+    (all cores by default, 1 solves in this process).
+    Table is built in path + '.partial' and the last finished level is kept in path + '.state' after every level, so an interrupted
+    generation resumes from the level it was solving. With max_levels, stops after solving that many levels.
+    Returns True if table is complete and was moved to path.
+    '''
+    win_length = win_length or dimension
+    cell_count = dimension*dimension
+    if cell_count > TABLEBASE_MAX_CELLS:
+        raise ValueError('Tablebase supports boards of at most %d cells' % TABLEBASE_MAX_CELLS)
+    (partial_path, state_path) = (path + '.partial', path + '.state')
+    next_level = _read_state(state_path, partial_path, dimension, win_length)
+    if next_level is None:
+        _create_partial_table(partial_path, dimension, win_length)
+        next_level = cell_count - 1
+        _write_state(state_path, dimension, win_length, next_level)
+    # Tables are built before starting workers, so forked workers share them.
+    get_symmetric_ternary_digits(dimension)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    pool = None
+    if processes > 1:
+        import multiprocessing
+        pool = multiprocessing.Pool(processes, initializer=_init_solver, initargs=(partial_path, dimension, win_length))
+    else:
+        _init_solver(partial_path, dimension, win_length)
+    try:
+        with open(partial_path, 'r+b') as file, mmap.mmap(file.fileno(), 0) as data:
+            levels_solved = 0
+            while next_level >= 0 and (max_levels is None or levels_solved < max_levels):
+                start = time.perf_counter()
+                occupied_masks = [sum(1 << cell for cell in cells) for cells in itertools.combinations(range(cell_count), next_level)]
+                tasks = [(next_level, occupied_masks[index:index+TASK_SIZE]) for index in range(0, len(occupied_masks), TASK_SIZE)]
+                solved = 0
+                for results in (pool.imap_unordered(_solve_task, tasks) if pool is not None else map(_solve_task, tasks)):
+                    for (score, indices) in results:
+                        for index in indices:
+                            data[HEADER_SIZE + index] = score & 0xFF
+                    solved += len(results)
+                data.flush()
+                next_level -= 1
+                levels_solved += 1
+                _write_state(state_path, dimension, win_length, next_level)
+                if verbose:
+                    print('Level %d: %d positions solved in %.2f sec' % (next_level + 1, solved, time.perf_counter() - start))
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        else:
+            _close_solver()
+    if next_level >= 0:
+        return False
+    os.replace(partial_path, path)
+    os.remove(state_path)
+    return True
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generates tablebase of every position of a board by retrograde analysis. '
+                                                 'Rerun same command to resume an interrupted generation.')
+    parser.add_argument('--dimension', type=int, default=4)
+    parser.add_argument('--win-length', type=int, default=None)
+    parser.add_argument('--processes', type=int, default=None, help='Worker processes, all cores by default.')
+    parser.add_argument('--output', default=None, help='Path of table file, by default the one computer loads.')
+    args = parser.parse_args()
+    output_path = args.output or get_tablebase_path(args.dimension, args.win_length)
+    start = time.perf_counter()
+    generate_tablebase(output_path, args.dimension, args.win_length, args.processes, verbose=True)
+    print('Tablebase written to %s in %.1f sec' % (output_path, time.perf_counter() - start))
@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from consts import BOARD_DIMENSION,TRANSPOSITION_TABLE_SIZE
+
+# Symmetry transforms are applied by table lookup on chunks of CHUNK_BITS cells.
+CHUNK_BITS = 9
+_SYMMETRY_TABLES_CACHE = {}
+
+def get_symmetric_cells(row, col, dimension):
+    '''
+    Returns the 8 images of a cell under rotations and reflections of the board.
+    Identity is always first.
+    '''
+    last = dimension - 1
+    return ((row, col), (col, last-row), (last-row, last-col), (last-col, row),
+            (row, last-col), (last-row, col), (col, row), (last-col, last-row))
+
+def get_symmetry_tables(dimension=BOARD_DIMENSION):
+    '''
+    Returns precomputed lookup tables for 8 board symmetries.
+    For each symmetry, there is one table per chunk of CHUNK_BITS cells mapping chunk bits to transformed mask bits.
+    '''
+    if dimension not in _SYMMETRY_TABLES_CACHE:
+        cell_count = dimension*dimension
+        images = [get_symmetric_cells(index // dimension, index % dimension, dimension) for index in range(cell_count)]
+        symmetry_tables = []
+        for symmetry in range(8):
+            chunk_tables = []
+            for chunk_start in range(0, cell_count, CHUNK_BITS):
+                chunk_size = min(CHUNK_BITS, cell_count - chunk_start)
+                table = [0] * (1 << chunk_size)
+                for chunk in range(1 << chunk_size):
+                    mask = 0
+                    for offset in range(chunk_size):
+                        if chunk >> offset & 1:
+                            (row, col) = images[chunk_start + offset][symmetry]
+                            mask |= 1 << (row*dimension + col)
+                    table[chunk] = mask
+                chunk_tables.append(table)
+            symmetry_tables.append(chunk_tables)
+        _SYMMETRY_TABLES_CACHE[dimension] = symmetry_tables
+    return _SYMMETRY_TABLES_CACHE[dimension]
+
+def transform_mask(mask, chunk_tables):
+    transformed = 0
+    for (chunk_index, table) in enumerate(chunk_tables):
+        transformed |= table[(mask >> (chunk_index*CHUNK_BITS)) & ((1 << CHUNK_BITS) - 1)]
+    return transformed
+
+def get_canonical_key(mover_mask, opponent_mask, dimension=BOARD_DIMENSION, win_length=None):
+    '''
+    Returns a single integer key which is same for all 8 rotations and reflections of the position.
+    Key is formed from bitmask of player to move and bitmask of its opponent, hence does not depend on their markers.
+    Win length is part of the key, as same position has different result for different win length.
+    '''
+    shift = dimension*dimension
+    symmetry_tables = get_symmetry_tables(dimension)
+    if len(symmetry_tables[0]) == 1:
+        key = min((tables[0][mover_mask] << shift) | tables[0][opponent_mask] for tables in symmetry_tables)
+    else:
+        key = min((transform_mask(mover_mask, tables) << shift) | transform_mask(opponent_mask, tables) for tables in symmetry_tables)
+    return ((win_length or dimension) << (2*shift)) | key
+
+
+class TranspositionTable:
+    """
+    Bounded cache of already searched positions, evicting least recently used entries when full.
+
+    Attributes:
+        max_size (int): Maximum number of entries kept in the table.
+        hits (int): Number of lookups which found an entry.
+        misses (int): Number of lookups which did not find an entry.
+
+    Methods:
+        get(key): Returns value stored for key or None, updating hit/miss counters.
+        put(key, value): Stores value for key, evicting least recently used entry if table is full.
+        clear(): Removes all entries and resets counters.
+        reset_stats(): Resets hit/miss counters.
+    """
+
+    def __init__(self, max_size=TRANSPOSITION_TABLE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, key):
+        try:
+            value = self.__entries[key]
+            self.__entries.move_to_end(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.__entries[key] = value
+        if len(self.__entries) > self.max_size:
+            try:
+                self.__entries.popitem(last=False)
+            except KeyError:
+                pass
+
+    def clear(self):
+        self.__entries.clear()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+
+# Shared by all computers of a process, so positions searched in one session are reused by every other session.
+SHARED_TRANSPOSITION_TABLE = TranspositionTable()
@@ -1,22 +1,63 @@
 from game import TicTacToe
 import param
 from model import Move
-from consts import BOARD_DIMENSION,GRID_SIZE,GRID_BUTTON_SIZE,GAME_MESSAGE_WIDTH
+from computer import CellEvaluation
+from consts import GRID_BUTTON_SIZE,GAME_MESSAGE_WIDTH
 import panel as pn
 
+def get_hint_button_type(evaluation: CellEvaluation):
+    '''
+    Returns button type colouring a cell by its evaluation: light while score can still change, then primary for a win,
+    warning for a draw and danger for a loss.
+    '''
+    if not evaluation.exact:
+        return 'light'
+    if evaluation.score > 0:
+        return 'primary'
+    return 'danger' if evaluation.score < 0 else 'warning'
+
 class ViewRenderer(TicTacToe):
     """
     A class used to separate panel rendering from game logic
 
     Attributes:
         reset_button: Gets mapped to Button widget. Used to call reset game state in TicTacToe class
+        hint_button: Gets mapped to Button widget. Used to start analysis of user moves, shown by colouring empty cells.
+        render_counts (dict): Number of times each view (game_message, board_view) was rendered, to monitor renders per move.
 
     Methods:
         reset_game_state(): Forwards request to parent game controller class to reset game state.
+        show_hint(): Forwards request to parent game controller class to analyse user moves.
+        _run_on_session(callback): Runs callback applying async computer move on the Bokeh document of this session.
         game_message(): Returns the game message according to the current state of the game.
-        board_view(): Returns a Panel grid representing the current state of the game board.
+        get_renders_per_move(): Returns average number of renders of each view per move made.
+        board_view(): Returns the Panel grid of this session representing the current state of the game board.
+        update_board_view(): Updates grid buttons whose move or winning state changed.
+        update_hint_view(): Updates colour of grid buttons of empty cells whose analysis changed.
+        __get_button_type(row, col): Returns button type of cell from its winning state or its analysis.
+        __create_board_view(): Creates grid and buttons for the current board dimension.
     """
     reset_button = param.Action(lambda x: x.param.trigger('reset_button'), label='Reset Game')
+    hint_button = param.Action(lambda x: x.param.trigger('hint_button'), label='Hint')
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self.__document = pn.state.curdoc
+        # Computer moves must not block event loop shared by all sessions when app is served by panel server
+        if self.__document is not None and self.__document.session_context is not None:
+            self.async_computer_moves = True
+        self.__grid = None
+        self.__buttons = None
+        self.render_counts = {'game_message': 0, 'board_view': 0}
+
+    def get_renders_per_move(self):
+        return {view: count / max(self.moves_made, 1) for (view, count) in self.render_counts.items()}
+
+    def _run_on_session(self, callback):
+        if self.__document is not None and self.__document.session_context is not None:
+            self.__document.add_next_tick_callback(callback)
+        else:
+            callback()
 
     @param.depends('reset_button','difficulty','user_move_marker', watch=True)
     def reset_game_state(self):
@@ -26,6 +67,14 @@ class ViewRenderer(TicTacToe):
         '''
         super().reset_game_state()
 
+    @param.depends('hint_button', watch=True)
+    def show_hint(self):
+        '''
+        Invoked when hint_button clicked. Forwards request to parent class to analyse user moves,
+        buttons are coloured by update_hint_view as evaluations arrive.
+        '''
+        self.request_analysis()
+
     @param.depends('current_move','game_ended','winner')
     def game_message(self):
         """
@@ -37,6 +86,7 @@ class ViewRenderer(TicTacToe):
         Returns:
             Markdown representing the current game state message.
         """
+        self.render_counts['game_message'] += 1
         markdown =  pn.pane.Markdown(" ", width=GAME_MESSAGE_WIDTH)               
         if self.game_ended:
             if self.winner is not Move.EMPTY:
@@ -53,29 +103,74 @@ class ViewRenderer(TicTacToe):
                 markdown = pn.pane.Markdown(f"## Computer's turn", width=GAME_MESSAGE_WIDTH)
         return markdown
 
-    @param.depends('current_move','game_ended')
     def board_view(self):
         """
-        Returns a Panel grid representing the current state of the game board.
+        Returns the Panel grid of this session representing the current state of the game board.
         
-        This method uses the current state of the game board to generate a Panel grid
-        representing the positions and values of the game buttons. Each button is associated
-        with a closure that is triggered when the button is clicked, and updates the game
-        state accordingly.
+        Grid and its buttons are created once per session and afterwards only updated in place
+        by update_board_view, so that a move does not rebuild and resend the whole grid to browser.
+        Each button is associated with a closure that is triggered when the button is clicked,
+        and updates the game state accordingly.
         
         Returns:
             A Panel GridSpec object representing the current state of the game board.
         """
-        grid = pn.GridSpec(width=GRID_SIZE, height=GRID_SIZE)
-        for i in range(BOARD_DIMENSION):
-            for j in range(BOARD_DIMENSION):
+        if self.__grid is None or len(self.__buttons) != self.board.dimension:
+            self.__create_board_view()
+        self.update_board_view()
+        return self.__grid
+
+    @param.depends('state_version', watch=True)
+    def update_board_view(self):
+        """
+        Updates name and type of only those grid buttons whose cell move or winning state differs from the button.
+        Invoked once per state transition (move or reset) when parameter dependency 'state_version' is updated.
+        """
+        if self.__buttons is None:
+            return
+        self.render_counts['board_view'] += 1
+        for i in range(self.board.dimension):
+            for j in range(self.board.dimension):
+                cell = self.board.get_cell(i,j)
+                button = self.__buttons[i][j]
+                button_type = self.__get_button_type(i, j)
+                if button.name != cell.move.value or button.button_type != button_type:
+                    button.param.update(name=cell.move.value, button_type=button_type)
+
+    @param.depends('analysis', watch=True)
+    def update_hint_view(self):
+        """
+        Updates type of only those grid buttons of empty cells whose colour for their latest analysis differs from the button.
+        Invoked every time an evaluation is added to analysis or analysis is cleared, so cells are coloured as their scores firm up.
+        """
+        if self.__buttons is None:
+            return
+        for i in range(self.board.dimension):
+            for j in range(self.board.dimension):
+                button = self.__buttons[i][j]
+                if self.board.get_cell(i,j).move is Move.EMPTY and button.button_type != self.__get_button_type(i, j):
+                    button.button_type = self.__get_button_type(i, j)
+
+    def __get_button_type(self, row, col):
+        if self.board.get_cell(row,col).winning_cell:
+            return 'success'
+        evaluation = self.analysis.get((row,col))
+        if evaluation is None:
+            return 'default'
+        return get_hint_button_type(evaluation)
+
+    def __create_board_view(self):
+        grid_size = GRID_BUTTON_SIZE*self.board.dimension
+        self.__grid = pn.GridSpec(width=grid_size, height=grid_size)
+        self.__buttons = []
+        for i in range(self.board.dimension):
+            row_buttons = []
+            for j in range(self.board.dimension):
                 def make_move_closure(event, row=i, col=j):
                     self.make_move(row, col)
-                button_type = 'success' if self.board.get_cell(i,j).winning_cell else 'default'   
-                button = pn.widgets.Button(name=self.board.get_cell(i,j).move.value, \
-                    width=GRID_BUTTON_SIZE, height=GRID_BUTTON_SIZE, button_type=button_type)
+                button = pn.widgets.Button(name=Move.EMPTY.value, \
+                    width=GRID_BUTTON_SIZE, height=GRID_BUTTON_SIZE, button_type='default', margin=0)
                 button.param.watch(make_move_closure, 'clicks')
-                grid[i, j] = button
-                grid[i, j].margin = 0
-
-        return grid
\ No newline at end of file
+                self.__grid[i, j] = button
+                row_buttons.append(button)
+            self.__buttons.append(row_buttons)
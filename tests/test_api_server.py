@@ -0,0 +1,127 @@
+import unittest
+import http.client
+import json
+import threading
+from unittest import mock
+import sys, os.path
+src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
+sys.path.append(src_path)
+
+import api_server
+from api_server import MoveBatcher, create_server, get_unfinished, parse_position
+from bitboard import BitBoard
+from model import Difficulty, Move
+from move_service import MoveService
+
+class TestMoveApi(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service = MoveService(max_workers=2)
+        cls.server = create_server(port=0, service=cls.service, max_positions=4)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.server.batcher.close()
+        cls.service.shutdown()
+
+    def request(self, method, path, data=None):
+        connection = http.client.HTTPConnection(*self.server.server_address[:2])
+        connection.request(method, path, json.dumps(data) if data is not None else None)
+        response = connection.getresponse()
+        result = (response.status, json.loads(response.read()))
+        connection.close()
+        return result
+
+    def test_single_position(self):
+        self.assertEqual(self.request('POST', '/move', {'board': 'XX..O....'}), (200, {'move': [0, 2]}))
+
+    def test_batch_of_positions(self):
+        (status, response) = self.request('POST', '/move', {'positions': [{'board': 'XX..O....'}, {'board': 'XXX.OO...'},
+            {'board': 'XO'}, {'board': 'X' + '.'*8, 'difficulty': 'easy'}]})
+        self.assertEqual(status, 200)
+        self.assertEqual(response['results'][:3], [{'move': [0, 2]}, {'error': 'Game is already over'},
+            {'error': 'Board must have N*N cells with N from 2 to 7'}])
+        self.assertIn('move', response['results'][3])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.request('POST', '/move', {'board': 'XX..O...Z'})[0], 400)
+        self.assertEqual(self.request('POST', '/move', {'board': 'XXX.OO...', 'difficulty': 'easy'}),
+            (400, {'error': 'Game is already over'}))
+        self.assertEqual(self.request('POST', '/move', {'positions': 'XX..O....'})[0], 400)
+        self.assertEqual(self.request('GET', '/missing')[0], 404)
+        self.assertEqual(self.request('POST', '/move', {'positions': [{'board': 'XX..O....', 'difficulty': ['pro']},
+            {'board': 'XX..O....', 'difficulty': {}}, {'board': 'XX..O....'}]}), (200, {'results': [
+            {'error': 'Difficulty must be one of easy, intermediate, pro, monte_carlo'}]*2 + [{'move': [0, 2]}]}))
+
+    def test_invalid_content_length(self):
+        for length in ('-1', 'abc'):
+            connection = http.client.HTTPConnection(*self.server.server_address[:2], timeout=5)
+            connection.putrequest('POST', '/move')
+            connection.putheader('Content-Length', length)
+            connection.endheaders()
+            response = connection.getresponse()
+            self.assertEqual((response.status, json.loads(response.read())), (400, {'error': 'Content-Length must be a non negative integer'}))
+            connection.close()
+
+    def test_too_many_positions(self):
+        self.assertEqual(self.request('POST', '/move', {'positions': [{'board': 'XX..O....'}]*5}),
+            (413, {'error': 'At most 4 positions per request'}))
+        self.assertEqual(self.request('POST', '/move', {'positions': [{'board': 'XX..O....'}]*4})[0], 200)
+
+    def test_stats(self):
+        self.request('POST', '/move', {'board': 'XX..O....'})
+        (status, stats) = self.request('GET', '/stats')
+        self.assertEqual(status, 200)
+        self.assertGreaterEqual(stats['batches'], 1)
+        self.assertGreaterEqual(stats['positions'], stats['unique_positions'])
+
+    def test_parse_position(self):
+        (bitboard, marker, difficulty) = parse_position({'board': 'x...o...x', 'difficulty': 'intermediate'})
+        self.assertEqual((bitboard.x_mask, bitboard.o_mask, marker, difficulty), (0b100000001, 0b10000, Move.O, Difficulty.INTERMEDIATE))
+        self.assertEqual(parse_position({'board': '.'*16, 'win_length': 3})[0].win_length, 3)
+        for invalid in ({'board': 'X'}, {'board': '.'*9, 'marker': 'Z'}, {'board': '.'*9, 'win_length': 4}, {'board': '.'*9, 'difficulty': 'hard'},
+                        {'board': '.'*9, 'difficulty': ['pro']}, {'board': '.'*9, 'marker': ['X']}, []):
+            with self.assertRaises(ValueError):
+                parse_position(invalid)
+
+
+class TestMoveBatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.service = MoveService(max_workers=2)
+        self.bitboard = BitBoard()
+        self.bitboard.set_cell(0,0,Move.X)
+        self.bitboard.set_cell(0,1,Move.X)
+        self.bitboard.set_cell(1,1,Move.O)
+
+    def tearDown(self):
+        self.service.shutdown()
+
+    def test_concurrent_positions_share_batch(self):
+        batcher = MoveBatcher(self.service, window_sec=0.2)
+        futures = [batcher.submit(self.bitboard, Move.O) for _ in range(5)] + [batcher.submit(BitBoard(x_mask=0b111, o_mask=0b11000), Move.O)]
+        self.assertEqual([future.result().move for future in futures[:5]], [(0,2)]*5)
+        self.assertEqual([future.result().stats.coalesced for future in futures[:5]], [0, 1, 1, 1, 1])
+        self.assertRaises(ValueError, futures[5].result)
+        batcher.close()
+        self.assertEqual((batcher.batches, batcher.positions, batcher.unique_positions, self.service.searches), (1, 6, 1, 1))
+
+    def test_batch_size_limit(self):
+        batcher = MoveBatcher(self.service, window_sec=0.2, max_batch_size=2)
+        futures = [batcher.submit(self.bitboard, Move.O) for _ in range(5)]
+        self.assertEqual([future.result().move for future in futures], [(0,2)]*5)
+        batcher.close()
+        self.assertEqual((batcher.batches, batcher.largest_batch), (3, 2))
+
+    def test_get_unfinished(self):
+        bitboards = [self.bitboard, BitBoard(x_mask=0b111, o_mask=0b11000), BitBoard(dimension=4, win_length=3)]
+        self.assertEqual(get_unfinished(bitboards), [True, False, True])
+        with mock.patch('api_server.evaluate_positions', None):
+            self.assertEqual(api_server.get_unfinished(bitboards), [True, False, True])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import itertools
+import sys, os.path
+src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
+sys.path.append(src_path)
+
+import numpy as np
+from batch import evaluate_positions, get_legal_moves_mask, positions_from_bitboards, to_game_state, CELL_X, CELL_O, STATUS_IN_PROGRESS
+from bitboard import BitBoard
+from board import Board
+from model import Move
+
+CELL_MOVES = {0: Move.EMPTY, CELL_X: Move.X, CELL_O: Move.O}
+
+class TestBatchEvaluation(unittest.TestCase):
+
+    def test_matches_board_game_state_for_all_positions(self):
+        positions = np.array(list(itertools.product([0, CELL_X, CELL_O], repeat=9)), dtype=np.int8).reshape(-1, 3, 3)
+        (status, winner, line_index) = evaluate_positions(positions)
+        board = Board()
+        for index in range(len(positions)):
+            for row in range(3):
+                for col in range(3):
+                    board.set_cell(row, col, CELL_MOVES[positions[index, row, col]])
+            self.assertEqual(to_game_state(status[index], winner[index], line_index[index], 3), board.get_game_state())
+
+    def test_matches_board_game_state_for_win_length(self):
+        rng = np.random.default_rng(5)
+        positions = rng.choice([0, CELL_X, CELL_O], size=(500, 5, 5)).astype(np.int8)
+        (status, winner, line_index) = evaluate_positions(positions, win_length=4)
+        for index in range(len(positions)):
+            board = Board(dimension=5, win_length=4)
+            for row in range(5):
+                for col in range(5):
+                    board.set_cell(row, col, CELL_MOVES[positions[index, row, col]])
+            self.assertEqual(to_game_state(status[index], winner[index], line_index[index], 5, 4), board.get_game_state())
+
+    def test_legal_moves_mask(self):
+        in_progress = BitBoard()
+        in_progress.set_cell(1,1,Move.X)
+        won = BitBoard(x_mask=0b111, o_mask=0b11000)
+        mask = get_legal_moves_mask(positions_from_bitboards([in_progress, won]))
+        self.assertEqual(mask[0].sum(), 8)
+        self.assertFalse(mask[0, 1, 1])
+        self.assertEqual(mask[1].sum(), 0)
+
+    def test_positions_from_bitboards(self):
+        bitboard = BitBoard()
+        bitboard.set_cell(0,2,Move.X)
+        bitboard.set_cell(2,0,Move.O)
+        positions = positions_from_bitboards([bitboard])
+        self.assertEqual(positions[0, 0, 2], CELL_X)
+        self.assertEqual(positions[0, 2, 0], CELL_O)
+        (status, _, _) = evaluate_positions(positions)
+        self.assertEqual(status[0], STATUS_IN_PROGRESS)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import sys, os.path
+bench_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/benchmarks/')
+sys.path.append(bench_path)
+
+import asyncio
+import random
+from bench import compare_results, measure
+from bench_startup import extract_bundle_payload, measure_import
+from api_load_test import get_random_position, run_api_load_test
+from load_test import get_percentile, run_load_test
+from model import Difficulty
+
+class TestBench(unittest.TestCase):
+
+    def test_compare_results_reports_regression(self):
+        baseline = {'metrics': {'search.sec': 1.0, 'search.nodes': 100, 'removed.sec': 1.0}}
+        current = {'metrics': {'search.sec': 1.2, 'search.nodes': 130, 'added.sec': 5.0}}
+        self.assertEqual(compare_results(baseline, current, 0.25), [('search.nodes', 100, 130)])
+
+    def test_compare_results_without_regression(self):
+        baseline = {'metrics': {'search.sec': 1.0}}
+        self.assertEqual(compare_results(baseline, {'metrics': {'search.sec': 0.5}}, 0.1), [])
+
+    def test_measure(self):
+        calls = []
+        self.assertGreaterEqual(measure(lambda: calls.append(1), repeat=2, number=3), 0)
+        self.assertEqual(len(calls), 6)
+
+    def test_get_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual((get_percentile(values, 50), get_percentile(values, 99), get_percentile([], 50)), (50, 99, 0.0))
+
+    def test_load_test_shares_searches(self):
+        (latencies, _, service) = asyncio.run(run_load_test(10, Difficulty.PRO, 2, workers=2))
+        self.assertEqual(len(latencies), service.requests)
+        self.assertLess(service.searches, service.requests)
+
+    def test_api_load_test(self):
+        (latencies, _, errors, stats) = run_api_load_test(4, 5, batch_size=3)
+        self.assertEqual((len(latencies), errors, stats['positions']), (20, [], 60))
+        self.assertLessEqual(stats['unique_positions'], stats['positions'])
+
+    def test_random_position_in_progress(self):
+        position = get_random_position(random.Random(0), 4, 3)
+        self.assertEqual((len(position['board']), position['win_length']), (16, 3))
+
+    def test_extract_bundle_payload(self):
+        source = "const env_spec = ['panel-0.14.3-py3-none-any.whl', 'param']\nconst code = `\nimport param\n`\n"
+        self.assertEqual(extract_bundle_payload(source), ('\nimport param\n', ['panel-0.14.3-py3-none-any.whl', 'param']))
+
+    def test_engine_imports_no_third_party_packages(self):
+        for module in ('board', 'computer', 'simulator', 'move_service', 'game_log'):
+            self.assertEqual(measure_import(module, repeat=1)[1], [], module)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import sys, os.path
+src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
+sys.path.append(src_path)
+
+from bitboard import BitBoard, get_line_masks, get_win_masks, has_won
+from board import Board
+from model import Move,GameStatus
+
+class TestBitBoard(unittest.TestCase):
+
+    def setUp(self):
+        self.bitboard = BitBoard()
+
+    def test_get_set_cell(self):
+        self.bitboard.set_cell(1,2,Move.O)
+        self.assertEqual(self.bitboard.get_move(1,2), Move.O)
+        self.assertEqual(self.bitboard.o_mask, 1 << 5)
+        self.bitboard.set_cell(1,2,Move.EMPTY)
+        self.assertEqual(self.bitboard.get_move(1,2), Move.EMPTY)
+        self.assertEqual(self.bitboard.o_mask, 0)
+
+    def test_get_available_moves(self):
+        self.bitboard.set_cell(0,0,Move.X)
+        self.bitboard.set_cell(0,1,Move.O)
+        self.assertEqual(self.bitboard.get_available_moves(), [(0,2),(1,0),(1,1),(1,2),(2,0),(2,1),(2,2)])
+
+    def test_game_winning_state(self):
+        self.bitboard.set_cell(0,2,Move.O)
+        self.bitboard.set_cell(1,1,Move.O)
+        self.bitboard.set_cell(2,0,Move.O)
+        self.assertEqual(self.bitboard.get_game_state(), (GameStatus.WIN, Move.O, ((0,2), (1,1), (2,0),)))
+        self.assertTrue(has_won(self.bitboard.o_mask, get_win_masks()))
+
+    def test_line_masks_for_win_length(self):
+        self.assertEqual(len(get_line_masks(3)), 8)
+        self.assertEqual(len(get_line_masks(5, 4)), 28)
+        self.assertEqual(get_line_masks(4, 3)[0][1], ((0,0), (0,1), (0,2)))
+
+    def test_game_draw_state(self):
+        moves = [[Move.X, Move.O, Move.X],
+                 [Move.X, Move.O, Move.O],
+                 [Move.O, Move.X, Move.X]]
+        for row in range(3):
+            for col in range(3):
+                self.bitboard.set_cell(row,col,moves[row][col])
+        self.assertEqual(self.bitboard.get_game_state(), (GameStatus.DRAW,))
+
+    def test_board_conversion(self):
+        board = Board()
+        board.set_cell(0,0,Move.X)
+        board.set_cell(2,1,Move.O)
+        bitboard = BitBoard.from_board(board)
+        self.assertEqual(bitboard.x_mask, 1)
+        self.assertEqual(bitboard.o_mask, 1 << 7)
+        converted = bitboard.to_board()
+        self.assertEqual(converted.get_cell(0,0).move, Move.X)
+        self.assertEqual(converted.get_cell(2,1).move, Move.O)
+        self.assertEqual(converted.get_available_moves(), board.get_available_moves())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,11 @@
 import unittest
+import random
 import sys, os.path  
 src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
 sys.path.append(src_path)
 
 from board import Board
+from bitboard import BitBoard
 from model import Move,GameStatus
 
 class TestBoard(unittest.TestCase):
@@ -22,6 +24,25 @@ class TestBoard(unittest.TestCase):
         self.board.reset_board()
         self.assertTrue(self.board.get_cell(0,0).move == Move.EMPTY)
 
+    def test_reset_board_reuses_cells(self):
+        cell = self.board.get_cell(0,0)
+        self.board.set_cell(0,0,Move.X,True)
+        self.board.reset_board()
+        self.assertIs(self.board.get_cell(0,0), cell)
+        self.assertFalse(cell.winning_cell)
+        self.assertEqual(self.board.snapshot().x_mask, 0)
+
+    def test_snapshot(self):
+        self.board.set_cell(0,1,Move.X)
+        self.board.set_cell(2,2,Move.O)
+        snapshot = self.board.snapshot()
+        self.assertEqual((snapshot.x_mask, snapshot.o_mask, snapshot.dimension, snapshot.win_length), (1 << 1, 1 << 8, 3, 3))
+        self.board.set_cell(0,1,Move.EMPTY)
+        self.assertEqual(snapshot.x_mask, 1 << 1)
+        self.assertEqual(self.board.snapshot().x_mask, 0)
+        with self.assertRaises(AttributeError):
+            snapshot.x_mask = 0
+
     def test_get_available_moves(self):
         self.board.set_cell(0,0,Move.X)
         self.board.set_cell(0,1,Move.O)
@@ -38,6 +59,43 @@ class TestBoard(unittest.TestCase):
         self.assertEqual(game_state[1], Move.X)
         self.assertEqual(game_state[2], ((0,0), (1,1), (2,2),))
 
+    def test_game_winning_state_for_larger_board(self):
+        board = Board(dimension=5, win_length=4)
+        for (row,col) in [(1,4),(2,3),(3,2),(4,1)]:
+            board.set_cell(row,col,Move.O)
+        game_state = board.get_game_state()
+        self.assertEqual(game_state[0], GameStatus.WIN)
+        self.assertEqual(game_state[1], Move.O)
+        self.assertEqual(game_state[2], ((1,4), (2,3), (3,2), (4,1),))
+
+    def test_game_in_progress_state_for_larger_board(self):
+        board = Board(dimension=4, win_length=4)
+        for (row,col) in [(0,0),(0,1),(0,2)]:
+            board.set_cell(row,col,Move.X)
+        self.assertEqual(board.get_game_state(), (GameStatus.IN_PROGRESS,))
+        self.assertEqual(len(board.get_available_moves()), 13)
+
+    def test_game_state_after_undo(self):
+        for (row,col) in [(0,0),(1,1),(2,2)]:
+            self.board.set_cell(row,col,Move.X)
+        self.board.set_cell(2,2,Move.EMPTY)
+        self.assertEqual(self.board.get_game_state(), (GameStatus.IN_PROGRESS,))
+        self.assertIn((2,2), self.board.get_available_moves())
+        self.board.set_cell(2,2,Move.O)
+        self.assertEqual(self.board.get_game_state(), (GameStatus.IN_PROGRESS,))
+
+    def test_incremental_game_state_matches_full_scan(self):
+        rng = random.Random(7)
+        board = Board(dimension=4, win_length=3)
+        bitboard = BitBoard(dimension=4, win_length=3)
+        for _ in range(2000):
+            (row, col) = (rng.randrange(4), rng.randrange(4))
+            move = rng.choice([Move.X, Move.O, Move.EMPTY])
+            board.set_cell(row,col,move)
+            bitboard.set_cell(row,col,move)
+            self.assertEqual(board.get_game_state(), bitboard.get_game_state())
+            self.assertEqual(board.get_available_moves(), bitboard.get_available_moves())
+
     def test_get_set_cell(self):
         self.board.set_cell(0,0,Move.X)
         self.assertTrue(self.board.get_cell(0,0).move == Move.X)        
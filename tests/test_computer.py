@@ -1,11 +1,18 @@
 import unittest
+import threading
+import time
 import sys, os.path  
 src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
 sys.path.append(src_path)
 
 from model import Cell,Move
 from board import Board
-from computer import get_best_move, get_non_best_move, BeginnerComputer
+from bitboard import BitBoard
+from transposition import TranspositionTable
+import random
+from unittest import mock
+from computer import SearchStats, get_best_move, get_best_move_within_budget, get_move_scores, get_move_scores_within_budget, get_perfect_move, \
+    get_non_best_move, minimax, choose_move_by_temperature, iter_move_evaluations, BeginnerComputer, ExpertComputer, GradedComputer, IntermediateComputer
 
 class TestComputer(unittest.TestCase):
 
@@ -18,6 +25,71 @@ class TestComputer(unittest.TestCase):
         best_move = get_best_move(available_moves, board, Move.O)
         self.assertEqual(best_move, (2,2))
 
+    def test_get_best_move_on_bitboard(self):
+        bitboard = BitBoard()
+        bitboard.set_cell(0,0,Move.X)
+        bitboard.set_cell(0,1,Move.X)
+        bitboard.set_cell(1,1,Move.O)
+        best_move = get_best_move(bitboard.get_available_moves(), bitboard, Move.O)
+        self.assertEqual(best_move, (0,2))
+
+    def test_search_stats_count_nodes(self):
+        table = TranspositionTable()
+        bitboard = BitBoard()
+        bitboard.set_cell(1,1,Move.X)
+        cold_stats = SearchStats()
+        get_best_move(bitboard.get_available_moves(), bitboard, Move.O, table, cold_stats)
+        warm_stats = SearchStats()
+        get_best_move(bitboard.get_available_moves(), bitboard, Move.O, table, warm_stats)
+        self.assertGreater(cold_stats.nodes, warm_stats.nodes)
+        self.assertEqual(warm_stats.nodes, 8)
+
+    def test_get_perfect_move(self):
+        bitboard = BitBoard()
+        bitboard.set_cell(0,0,Move.X)
+        bitboard.set_cell(0,1,Move.X)
+        bitboard.set_cell(1,1,Move.O)
+        self.assertEqual(get_perfect_move(bitboard, Move.O), (0,2))
+
+    def test_minimax(self):
+        bitboard = BitBoard()
+        bitboard.set_cell(0,0,Move.X)
+        bitboard.set_cell(0,1,Move.X)
+        self.assertEqual(minimax(True, bitboard, Move.X), 1)
+        self.assertEqual(minimax(True, BitBoard(), Move.X), 0)
+
+    def test_get_best_move_within_budget_finds_win(self):
+        bitboard = BitBoard(dimension=4, win_length=3)
+        bitboard.set_cell(1,1,Move.X)
+        bitboard.set_cell(1,2,Move.X)
+        bitboard.set_cell(0,0,Move.O)
+        bitboard.set_cell(1,3,Move.O)
+        self.assertEqual(get_best_move(bitboard.get_available_moves(), bitboard, Move.X), (1,0))
+
+    def test_get_best_move_within_budget_blocks_loss(self):
+        bitboard = BitBoard(dimension=5, win_length=4)
+        for (row,col) in [(2,0),(2,1),(2,2)]:
+            bitboard.set_cell(row,col,Move.X)
+        for (row,col) in [(0,0),(4,4)]:
+            bitboard.set_cell(row,col,Move.O)
+        self.assertEqual(get_best_move_within_budget(bitboard.get_available_moves(), bitboard, Move.O, time_budget=0.5), (2,3))
+
+    def test_get_best_move_within_budget_respects_time_budget(self):
+        bitboard = BitBoard(dimension=6, win_length=4)
+        start = time.perf_counter()
+        move = get_best_move_within_budget(bitboard.get_available_moves(), bitboard, Move.X, time_budget=0.2)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertIn(move, bitboard.get_available_moves())
+
+    def test_get_best_move_within_budget_matches_minimax(self):
+        bitboard = BitBoard()
+        bitboard.set_cell(0,0,Move.X)
+        bitboard.set_cell(1,1,Move.O)
+        bitboard.set_cell(2,2,Move.X)
+        move = get_best_move_within_budget(bitboard.get_available_moves(), bitboard, Move.O, time_budget=None)
+        bitboard.set_cell(move[0],move[1],Move.O)
+        self.assertEqual(minimax(False, bitboard, Move.O), 0)
+
     def test_get_non_best_move(self):
         board_grid = [[Cell(move=Move.X), Cell(move=Move.EMPTY), Cell(move=Move.O)],
                            [Cell(move=Move.O), Cell(move=Move.X), Cell(move=Move.O)],
@@ -38,6 +110,112 @@ class TestComputer(unittest.TestCase):
         non_best_move = get_non_best_move(available_moves, best_move)
         self.assertEqual(non_best_move, (2,2))        
 
+    def test_get_move_scores(self):
+        bitboard = BitBoard()
+        bitboard.set_cell(0,0,Move.X)
+        bitboard.set_cell(0,1,Move.X)
+        bitboard.set_cell(1,1,Move.O)
+        expected = {move: -1 for move in bitboard.get_available_moves()}
+        expected[(0,2)] = 0
+        self.assertEqual(get_move_scores(bitboard, Move.O, TranspositionTable()), expected)
+        with mock.patch('computer.get_perfect_play_table', return_value=None):
+            self.assertEqual(get_move_scores(bitboard, Move.O, TranspositionTable()), expected)
+
+    def test_get_move_scores_matches_best_move(self):
+        rng = random.Random(1)
+        for _ in range(20):
+            bitboard = BitBoard()
+            marker = Move.X
+            for _ in range(rng.randrange(0, 5)):
+                (row, col) = rng.choice(bitboard.get_available_moves())
+                bitboard.set_cell(row, col, marker)
+                marker = Move.O if marker == Move.X else Move.X
+            scores = get_move_scores(bitboard, marker)
+            self.assertEqual(scores[get_best_move(bitboard.get_available_moves(), bitboard, marker)], max(scores.values()))
+
+    def test_get_move_scores_within_budget(self):
+        bitboard = BitBoard(dimension=4, win_length=3)
+        bitboard.set_cell(1,1,Move.X)
+        bitboard.set_cell(1,2,Move.X)
+        scores = get_move_scores_within_budget(bitboard.get_available_moves(), bitboard, Move.O, time_budget=None, max_depth=2)
+        self.assertEqual(len(scores), 14)
+        self.assertEqual(next(iter(scores)), get_best_move_within_budget(bitboard.get_available_moves(), bitboard, Move.O, time_budget=None, max_depth=2))
+        self.assertEqual(list(scores.values()), sorted(scores.values(), reverse=True))
+
+    def test_iter_move_evaluations(self):
+        bitboard = BitBoard()
+        bitboard.set_cell(0,0,Move.X)
+        bitboard.set_cell(0,1,Move.X)
+        bitboard.set_cell(1,1,Move.O)
+        final = {}
+        depths = {}
+        for evaluation in iter_move_evaluations(bitboard, Move.O):
+            self.assertNotIn(evaluation.move, final)
+            self.assertGreaterEqual(evaluation.depth, depths.get(evaluation.move, 0))
+            depths[evaluation.move] = evaluation.depth
+            if evaluation.exact:
+                final[evaluation.move] = evaluation.score
+        self.assertEqual(set(final), set(bitboard.get_available_moves()))
+        # Only blocking move does not lose, and its exact score agrees with minimax.
+        self.assertEqual(max(final, key=final.get), (0,2))
+        self.assertEqual({move: (score > 0) - (score < 0) for (move, score) in final.items()}, get_move_scores(bitboard, Move.O))
+
+    def test_iter_move_evaluations_respects_time_budget(self):
+        start = time.perf_counter()
+        evaluations = list(iter_move_evaluations(BitBoard(dimension=5, win_length=4), Move.X, time_budget=0.2))
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(evaluations[0].depth, 1)
+        self.assertFalse(evaluations[-1].exact)
+
+    def test_iter_move_evaluations_stops_when_cancelled(self):
+        cancelled = threading.Event()
+        threading.Timer(0.2, cancelled.set).start()
+        start = time.perf_counter()
+        evaluations = list(iter_move_evaluations(BitBoard(dimension=5, win_length=4), Move.X, time_budget=None, cancelled=cancelled))
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertFalse(evaluations[-1].exact)
+
+    def test_choose_move_by_temperature(self):
+        scores = {(0,0): 0, (0,1): 1, (0,2): 1, (1,0): -1}
+        self.assertEqual(choose_move_by_temperature(scores, 0), (0,1))
+        rng = random.Random(0)
+        cold = [choose_move_by_temperature(scores, 0.05, rng) for _ in range(200)]
+        hot = [choose_move_by_temperature(scores, 100, rng) for _ in range(200)]
+        self.assertEqual(set(cold), {(0,1),(0,2)})
+        self.assertEqual(set(hot), set(scores))
+
+    def test_graded_computer(self):
+        bitboard = BitBoard()
+        bitboard.set_cell(0,0,Move.X)
+        bitboard.set_cell(0,1,Move.X)
+        bitboard.set_cell(1,1,Move.O)
+        self.assertEqual(GradedComputer(temperature=0).choose_move(bitboard, Move.O), (0,2))
+
+    def test_intermediate_mistake_is_lower_scoring_move(self):
+        bitboard = BitBoard()
+        bitboard.set_cell(0,0,Move.X)
+        bitboard.set_cell(0,1,Move.X)
+        bitboard.set_cell(1,1,Move.O)
+        computer = IntermediateComputer()
+        computer.mistake_probability = 1
+        self.assertNotEqual(computer.choose_move(bitboard, Move.O), (0,2))
+        self.assertEqual(computer.mistake_probability, 0)
+
+    def test_intermediate_keeps_mistake_when_all_moves_equal(self):
+        computer = IntermediateComputer()
+        computer.mistake_probability = 0.9
+        with mock.patch('computer.random.random', return_value=0):
+            self.assertEqual(computer.choose_move(BitBoard(), Move.X), (0,0))
+        self.assertEqual(computer.mistake_probability, 1)
+
+    def test_computer_move_on_snapshot(self):
+        board = Board()
+        board.set_cell(0,0,Move.X)
+        board.set_cell(0,1,Move.X)
+        board.set_cell(1,1,Move.O)
+        self.assertEqual(ExpertComputer().choose_move(board.snapshot(), Move.O), (0,2))
+        self.assertNotIn(BeginnerComputer().choose_move(board.snapshot(), Move.O), [(0,0),(0,1),(1,1)])
+
     def test_random_move(self):
         board = Board()
         board.set_cell(0,0,Move.X)
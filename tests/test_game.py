@@ -1,11 +1,15 @@
 import unittest
+import asyncio
+import time
+from unittest import mock
 import sys, os.path  
 src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
 sys.path.append(src_path)
 
 from game import TicTacToe
-from model import Cell, Move
+from model import Cell, Difficulty, GameStatus, Move
 from board import Board
+from computer import CellEvaluation
 
 class TestTicTacToe(unittest.TestCase):
     
@@ -23,6 +27,18 @@ class TestTicTacToe(unittest.TestCase):
         self.assertEqual(self.game.game_ended, False)
         self.assertEqual(self.game.winner, Move.EMPTY)
         
+    def test_analysis(self):
+        self.game.request_analysis()
+        self.assertEqual(set(self.game.analysis), set(self.game.board.get_available_moves()))
+        self.assertTrue(all(evaluation.exact and evaluation.score == 0 for evaluation in self.game.analysis.values()))
+        self.game.reset_game_state()
+        self.assertEqual(self.game.analysis, {})
+
+    def test_no_analysis_on_computer_turn(self):
+        self.game.current_move = Move.O
+        self.game.request_analysis()
+        self.assertEqual(self.game.analysis, {})
+
     def test_make_move_accepted(self):
         self.game.make_move(0, 0)
         self.assertEqual(self.game.board.get_cell(0,0).move, Move.X)
@@ -42,6 +58,129 @@ class TestTicTacToe(unittest.TestCase):
         self.game.make_move(0, 1)
         self.assertEqual(self.game.board.get_cell(0,1).move, Move.EMPTY)
         self.assertEqual(self.game.current_move, Move.X)
-        
+
+    @mock.patch('computer.COMPUTER_DELAY_SEC', 0)
+    def test_finished_game_is_logged(self):
+        game_log = []
+        game = TicTacToe(game_log=game_log, difficulty=Difficulty.PRO)
+        game.reset_game_state()
+        while not game.game_ended:
+            game.make_move(*game.board.get_available_moves()[0])
+        self.assertEqual(len(game_log), 1)
+        record = game_log[0]
+        self.assertEqual((record.first_mover, record.user_marker, record.difficulty), (Move.O, Move.X, Difficulty.PRO))
+        self.assertEqual(record.moves, tuple(game.move_history))
+        self.assertEqual(record.winner, game.winner)
+        self.assertEqual(record.moves[0], (0,0))
+
+    @mock.patch('computer.COMPUTER_DELAY_SEC', 0)
+    def test_unfinished_game_is_logged_on_reset(self):
+        game_log = []
+        game = TicTacToe(game_log=game_log)
+        game.make_move(1, 1)
+        game.difficulty = Difficulty.INTERMEDIATE
+        game.reset_game_state()
+        self.assertEqual(len(game_log), 1)
+        self.assertEqual((game_log[0].status, game_log[0].difficulty), (GameStatus.IN_PROGRESS, Difficulty.EASY))
+        self.assertEqual(game_log[0].moves[0], (1,1))
+        # Computer opens the new game, as first mover switched to computer.
+        self.assertEqual(len(game.move_history), 1)
+
+    @mock.patch('computer.COMPUTER_DELAY_SEC', 0)
+    def test_game_log_failure_does_not_break_move(self):
+        game_log = mock.Mock()
+        game_log.append.side_effect = ValueError('Game log is closed')
+        game = TicTacToe(game_log=game_log, difficulty=Difficulty.PRO)
+        game.reset_game_state()
+        with self.assertLogs('game', level='ERROR'):
+            while not game.game_ended:
+                game.make_move(*game.board.get_available_moves()[0])
+        game_log.append.assert_called_once()
+        # Move which ended the game was applied although logging it failed.
+        self.assertNotEqual(game.board.get_cell(*game.move_history[-1]).move, Move.EMPTY)
+
+
+@mock.patch('game.COMPUTER_DELAY_SEC', 0.01)
+class TestTicTacToeAsyncComputerMove(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.game = TicTacToe(async_computer_moves=True)
+
+    async def wait_for_computer_move(self):
+        for _ in range(100):
+            if not self.game.is_computer_move_pending():
+                return
+            await asyncio.sleep(0.01)
+
+    async def test_computer_move_applied_after_search(self):
+        self.game.make_move(0, 0)
+        self.assertTrue(self.game.is_computer_move_pending())
+        self.assertEqual(len(self.game.board.get_available_moves()), 8)
+        await self.wait_for_computer_move()
+        self.assertFalse(self.game.is_computer_move_pending())
+        self.assertEqual(len(self.game.board.get_available_moves()), 7)
+        self.assertEqual(self.game.current_move, Move.X)
+
+    async def test_user_move_ignored_while_computer_move_pending(self):
+        self.game.make_move(0, 0)
+        self.game.make_move(1, 1)
+        self.assertEqual(len(self.game.board.get_available_moves()), 8)
+        await self.wait_for_computer_move()
+
+    async def test_analysis_applied_progressively(self):
+        self.game.make_move(0, 0)
+        await self.wait_for_computer_move()
+        self.game.request_analysis()
+        self.assertEqual(self.game.analysis, {})
+        updates = []
+        self.game.param.watch(lambda event: updates.append(len(event.new)), 'analysis')
+        for _ in range(200):
+            if len(self.game.analysis) == 7 and all(evaluation.exact for evaluation in self.game.analysis.values()):
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(set(self.game.analysis), set(self.game.board.get_available_moves()))
+        self.assertTrue(all(evaluation.exact for evaluation in self.game.analysis.values()))
+        self.assertGreater(len(updates), 7)
+
+    async def test_move_cancels_analysis(self):
+        self.stopped_at = None
+        with mock.patch('game.iter_move_evaluations', side_effect=lambda board, marker, cancelled: iter(self.slow_evaluations(cancelled))):
+            self.game.request_analysis()
+            await asyncio.sleep(0.05)
+            self.assertEqual(len(self.game.analysis), 1)
+            cancelled_at = time.perf_counter()
+            self.game.make_move(0, 0)
+            self.assertEqual(self.game.analysis, {})
+            await asyncio.sleep(0.1)
+            self.assertEqual(self.game.analysis, {})
+        # Step running when analysis was cancelled stopped without waiting for its search to end.
+        self.assertLess(self.stopped_at - cancelled_at, 0.5)
+        await self.wait_for_computer_move()
+
+    def slow_evaluations(self, cancelled):
+        # Like a search step, each evaluation takes long unless analysis is cancelled.
+        for (row, col) in ((0, 0), (0, 1), (0, 2)):
+            yield CellEvaluation((row, col), 1, 0, False)
+            if cancelled.wait(2):
+                self.stopped_at = time.perf_counter()
+                return
+
+    async def test_failed_computer_move_is_not_pending(self):
+        with mock.patch.object(self.game.move_service, 'get_move', side_effect=RuntimeError('executor shut down')), \
+                self.assertLogs('game', level='ERROR'):
+            self.game.make_move(0, 0)
+            await self.wait_for_computer_move()
+        self.assertFalse(self.game.is_computer_move_pending())
+        self.assertEqual(len(self.game.board.get_available_moves()), 8)
+
+    async def test_reset_cancels_pending_computer_move(self):
+        self.game.make_move(0, 0)
+        self.game.first_mover = Move.O
+        self.game.reset_game_state()
+        self.assertFalse(self.game.is_computer_move_pending())
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(self.game.board.get_available_moves()), 9)
+        self.assertEqual(self.game.current_move, Move.X)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,89 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+import sys, os.path
+src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
+sys.path.append(src_path)
+
+import game_log
+from game_log import GameLogWriter, GameRecord, LOG_HEADER, decode_game, encode_game, read_games, summarize_games, summarize_log
+from model import Difficulty,GameStatus,Move
+
+FULL_GAME = GameRecord(Move.X, Move.O, Difficulty.PRO, GameStatus.DRAW, Move.EMPTY,
+                       ((0,0),(1,1),(2,2),(0,2),(2,0),(1,0),(1,2),(2,1),(0,1)))
+WON_GAME = GameRecord(Move.O, Move.O, Difficulty.INTERMEDIATE, GameStatus.WIN, Move.O, ((1,1),(0,0),(0,2),(2,0),(1,0),(1,2),(2,1)))
+UNFINISHED_GAME = GameRecord(Move.O, Move.X, Difficulty.EASY, GameStatus.IN_PROGRESS, Move.EMPTY, ((2,2),(1,1)))
+
+class TestGameLog(unittest.TestCase):
+
+    def setUp(self):
+        (handle, self.path) = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_encode_decode(self):
+        for record in (FULL_GAME, WON_GAME, UNFINISHED_GAME, UNFINISHED_GAME._replace(moves=())):
+            self.assertEqual(decode_game(encode_game(record)), record)
+        self.assertEqual(len(encode_game(FULL_GAME)), 6)
+
+    def test_encode_rejects_larger_board(self):
+        with self.assertRaises(ValueError):
+            encode_game(UNFINISHED_GAME._replace(moves=((3,3),)))
+
+    def test_writer_and_reader(self):
+        writer = GameLogWriter(self.path, flush_interval=10, batch_size=100)
+        for record in (FULL_GAME, WON_GAME, UNFINISHED_GAME):
+            writer.append(record)
+        writer.flush()
+        self.assertEqual(writer.games_written, 3)
+        self.assertEqual(list(read_games(self.path, chunk_size=4)), [FULL_GAME, WON_GAME, UNFINISHED_GAME])
+        writer.close()
+        writer = GameLogWriter(self.path)
+        writer.append(WON_GAME)
+        writer.close()
+        self.assertEqual(list(read_games(self.path))[-1], WON_GAME)
+
+    def test_shared_writer_closed_at_exit(self):
+        with mock.patch('game_log.atexit.register') as register:
+            writer = game_log.get_game_log_writer(self.path)
+            self.assertIs(game_log.get_game_log_writer(self.path), writer)
+        del game_log._writers[self.path]
+        register.assert_called_once_with(writer.close)
+        writer.append(WON_GAME)
+        # Buffered game is written by the exit handler.
+        register.call_args[0][0]()
+        self.assertEqual(list(read_games(self.path)), [WON_GAME])
+
+    def test_incomplete_record_ignored(self):
+        with open(self.path, 'wb') as file:
+            file.write(LOG_HEADER + encode_game(WON_GAME) + encode_game(FULL_GAME)[:4])
+        self.assertEqual(list(read_games(self.path)), [WON_GAME])
+
+    def test_writer_truncates_incomplete_record(self):
+        with open(self.path, 'wb') as file:
+            file.write(LOG_HEADER + encode_game(WON_GAME) + encode_game(FULL_GAME)[:4])
+        self.assertEqual(game_log.get_complete_size(self.path), len(LOG_HEADER) + len(encode_game(WON_GAME)))
+        writer = GameLogWriter(self.path)
+        writer.append(UNFINISHED_GAME)
+        writer.close()
+        self.assertEqual(list(read_games(self.path)), [WON_GAME, UNFINISHED_GAME])
+
+    def test_summarize_games(self):
+        summary = summarize_games([FULL_GAME, WON_GAME, WON_GAME._replace(winner=Move.X), UNFINISHED_GAME])
+        self.assertEqual(summary.difficulties[Difficulty.INTERMEDIATE]['user_wins'], 1)
+        self.assertEqual(summary.difficulties[Difficulty.INTERMEDIATE]['computer_wins'], 1)
+        self.assertEqual(summary.difficulties[Difficulty.PRO]['draws'], 1)
+        self.assertEqual(summary.difficulties[Difficulty.EASY]['unfinished'], 1)
+        self.assertEqual(summary.get_user_win_rate(Difficulty.INTERMEDIATE), 0.5)
+
+    def test_summarize_log(self):
+        records = [FULL_GAME, WON_GAME, UNFINISHED_GAME, WON_GAME]
+        with open(self.path, 'wb') as file:
+            file.write(LOG_HEADER + b''.join(encode_game(record) for record in records))
+        self.assertEqual(summarize_log(self.path, chunk_size=5).difficulties, summarize_games(records).difficulties)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import sys, os.path
+src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
+sys.path.append(src_path)
+
+from bitboard import BitBoard
+from computer import BeginnerComputer, ExpertComputer, IntermediateComputer, get_computer_by_difficulty, set_default_instrumentation
+from instrumentation import MetricsAggregator, MoveMetrics
+from model import Difficulty,Move
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = MetricsAggregator()
+
+    def test_latency_histogram(self):
+        self.metrics.record_move(MoveMetrics(Difficulty.PRO, (1,1), 0.002, nodes=10))
+        self.metrics.record_move(MoveMetrics(Difficulty.PRO, (0,0), 3.0, nodes=5))
+        aggregate = self.metrics.get_difficulty_metrics()['Pro']
+        self.assertEqual(aggregate.moves, 2)
+        self.assertEqual(aggregate.nodes, 15)
+        self.assertEqual(aggregate.bucket_counts[2], 1)
+        self.assertEqual(aggregate.bucket_counts[-1], 1)
+
+    def test_render_prometheus(self):
+        self.metrics.record_move(MoveMetrics(Difficulty.INTERMEDIATE, (1,1), 0.02, cache_hits=1, mistake=True))
+        text = self.metrics.render_prometheus()
+        self.assertIn('tictactoe_computer_move_seconds_bucket{difficulty="Intermediate",le="0.01"} 0', text)
+        self.assertIn('tictactoe_computer_move_seconds_bucket{difficulty="Intermediate",le="+Inf"} 1', text)
+        self.assertIn('tictactoe_computer_move_seconds_count{difficulty="Intermediate"} 1', text)
+        self.assertIn('tictactoe_computer_mistakes_total{difficulty="Intermediate"} 1', text)
+
+    def test_computer_reports_move(self):
+        computer = BeginnerComputer()
+        computer.instrumentation = self.metrics
+        move = computer.choose_move(BitBoard(), Move.X)
+        self.assertEqual(self.metrics.last_move.move, move)
+        self.assertEqual(self.metrics.last_move.difficulty, Difficulty.EASY)
+        self.assertGreaterEqual(self.metrics.last_move.search_sec, 0)
+
+    def test_computer_reports_search_effort(self):
+        bitboard = BitBoard()
+        bitboard.set_cell(0,0,Move.X)
+        computer = ExpertComputer()
+        computer.instrumentation = self.metrics
+        computer.choose_move(bitboard, Move.O)
+        # Move comes from perfect play table if it is built, else from minimax search.
+        self.assertGreater(self.metrics.last_move.nodes + self.metrics.last_move.cache_hits, 0)
+
+    def test_intermediate_reports_mistake(self):
+        computer = IntermediateComputer()
+        computer.mistake_probability = 1
+        computer.instrumentation = self.metrics
+        bitboard = BitBoard()
+        bitboard.set_cell(0,0,Move.X)
+        bitboard.set_cell(0,1,Move.X)
+        bitboard.set_cell(1,1,Move.O)
+        self.assertNotEqual(computer.choose_move(bitboard, Move.O), (0,2))
+        self.assertTrue(self.metrics.last_move.mistake)
+        self.assertEqual(self.metrics.get_difficulty_metrics()['Intermediate'].mistakes, 1)
+
+    def test_default_instrumentation(self):
+        set_default_instrumentation(self.metrics)
+        try:
+            self.assertIs(get_computer_by_difficulty(Difficulty.PRO).instrumentation, self.metrics)
+        finally:
+            set_default_instrumentation(None)
+        self.assertIsNone(get_computer_by_difficulty(Difficulty.PRO).instrumentation)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import sys, os.path
+import tempfile
+from unittest import mock
+src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
+sys.path.append(src_path)
+
+from bitboard import BitBoard
+from computer import ExpertComputer
+from lookup_table import HEADER_SIZE, PerfectPlayTable, build_table, get_position_index, load_or_build_table, verify_table
+from model import Move
+
+class TestPerfectPlayTable(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.table_path = os.path.join(cls.temp_dir.name, 'table.bin')
+        build_table(cls.table_path)
+        cls.table = PerfectPlayTable.load(cls.table_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.table.close()
+        cls.temp_dir.cleanup()
+
+    def test_table_matches_live_search(self):
+        self.assertEqual(verify_table(self.table), [])
+
+    def test_get_best_move(self):
+        board = BitBoard()
+        board.set_cell(0,0,Move.X)
+        board.set_cell(0,1,Move.X)
+        board.set_cell(1,1,Move.O)
+        self.assertEqual(self.table.get_best_move(board, Move.O), (0,2))
+        self.assertEqual(self.table.get_entry(board.o_mask, board.x_mask)[0], 0)
+
+    def test_finished_position_not_in_table(self):
+        board = BitBoard(x_mask=0b111, o_mask=0b11000)
+        self.assertEqual(self.table.get_best_move(board, Move.O), None)
+
+    def test_other_win_length_not_in_table(self):
+        board = BitBoard(win_length=2)
+        board.set_cell(0,0,Move.X)
+        board.set_cell(2,2,Move.O)
+        self.assertEqual(self.table.get_best_move(board, Move.X), None)
+        # Computers fall back to live search, which finds a winning move for two in a row.
+        with mock.patch('computer.get_perfect_play_table', return_value=self.table):
+            self.assertIn(ExpertComputer().choose_move(board, Move.X), [(0,1),(1,0),(1,1)])
+
+    def test_missing_table(self):
+        self.assertEqual(PerfectPlayTable.load(os.path.join(self.temp_dir.name, 'missing.bin')), None)
+
+    def test_stale_table(self):
+        stale_path = os.path.join(self.temp_dir.name, 'stale.bin')
+        with open(self.table_path, 'rb') as table_file, open(stale_path, 'wb') as stale_file:
+            data = bytearray(table_file.read())
+            data[4] += 1
+            stale_file.write(data)
+        self.assertEqual(PerfectPlayTable.load(stale_path), None)
+
+    def write_damaged_table(self, name, damage):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(self.table_path, 'rb') as table_file, open(path, 'wb') as damaged_file:
+            data = bytearray(table_file.read())
+            damage(data)
+            damaged_file.write(data)
+        return path
+
+    def test_truncated_or_corrupted_table(self):
+        truncated_path = self.write_damaged_table('truncated.bin', lambda data: data.__delitem__(slice(-100, None)))
+        self.assertEqual(PerfectPlayTable.load(truncated_path), None)
+        def corrupt(data):
+            data[HEADER_SIZE + 1000] ^= 0xFF
+        corrupted_path = self.write_damaged_table('corrupted.bin', corrupt)
+        self.assertEqual(PerfectPlayTable.load(corrupted_path), None)
+        table = load_or_build_table(corrupted_path)
+        self.assertIsNotNone(table)
+        table.close()
+        with open(corrupted_path, 'rb') as corrupted_file, open(self.table_path, 'rb') as table_file:
+            self.assertEqual(corrupted_file.read(), table_file.read())
+
+    def test_missing_table_not_built(self):
+        missing_path = os.path.join(self.temp_dir.name, 'not_built.bin')
+        self.assertEqual(load_or_build_table(missing_path), None)
+        self.assertFalse(os.path.exists(missing_path))
+
+    def test_position_index(self):
+        self.assertEqual(get_position_index(0, 0), 0)
+        self.assertEqual(get_position_index(1, 2), 1 + 2*3)
+
+if __name__ == '__main__':
+    unittest.main()
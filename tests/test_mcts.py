@@ -0,0 +1,78 @@
+import unittest
+import random
+import sys, os.path
+src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
+sys.path.append(src_path)
+
+from bitboard import BitBoard, get_cell_win_masks
+from computer import get_computer_by_difficulty
+from mcts import MCTSComputer, close_worker_pool, rollout
+from model import Difficulty,Move
+
+class TestMCTS(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+
+    def tearDown(self):
+        close_worker_pool()
+
+    def test_rollout(self):
+        cell_win_masks = get_cell_win_masks(3, 3)
+        # Mover owns (0,0),(0,1), only free cell (0,2) wins for mover.
+        self.assertEqual(rollout(0b11, 0b111111000, (2,), cell_win_masks, random.getrandbits), 1)
+        results = {rollout(0, 0, tuple(range(9)), cell_win_masks, random.getrandbits) for _ in range(200)}
+        self.assertEqual(results, {-1, 0, 1})
+
+    def test_finds_win(self):
+        bitboard = BitBoard()
+        for (row, col) in [(0,0),(0,1)]:
+            bitboard.set_cell(row, col, Move.X)
+        for (row, col) in [(1,0),(1,1)]:
+            bitboard.set_cell(row, col, Move.O)
+        self.assertEqual(MCTSComputer(time_budget=None, playouts=2000).choose_move(bitboard, Move.X), (0,2))
+
+    def test_blocks_loss(self):
+        bitboard = BitBoard(dimension=4, win_length=3)
+        bitboard.set_cell(0,0,Move.X)
+        bitboard.set_cell(1,1,Move.X)
+        bitboard.set_cell(3,3,Move.O)
+        self.assertEqual(MCTSComputer(time_budget=None, playouts=5000).choose_move(bitboard, Move.O), (2,2))
+
+    def test_playout_budget(self):
+        computer = MCTSComputer(time_budget=None, playouts=500)
+        computer.choose_move(BitBoard(dimension=5, win_length=4), Move.X)
+        self.assertEqual(computer.last_playouts, 500)
+        self.assertGreater(computer.get_playouts_per_second(), 0)
+
+    def test_time_budget(self):
+        computer = MCTSComputer(time_budget=0.05, playouts=None)
+        computer.choose_move(BitBoard(dimension=5, win_length=4), Move.X)
+        self.assertLess(computer.last_search_sec, 0.5)
+        self.assertGreater(computer.last_playouts, 0)
+
+    def test_tree_reused_between_moves(self):
+        bitboard = BitBoard()
+        computer = MCTSComputer(time_budget=None, playouts=2000)
+        (row, col) = computer.choose_move(bitboard, Move.X)
+        self.assertEqual(computer.last_reused_visits, 0)
+        bitboard.set_cell(row, col, Move.X)
+        (row, col) = bitboard.get_available_moves()[0]
+        bitboard.set_cell(row, col, Move.O)
+        computer.choose_move(bitboard, Move.X)
+        self.assertGreater(computer.last_reused_visits, 0)
+
+    def test_root_parallel_search(self):
+        bitboard = BitBoard()
+        for (row, col) in [(0,0),(0,1)]:
+            bitboard.set_cell(row, col, Move.X)
+        bitboard.set_cell(1,1,Move.O)
+        computer = MCTSComputer(time_budget=None, playouts=3000, workers=2)
+        self.assertEqual(computer.choose_move(bitboard, Move.O), (0,2))
+        self.assertEqual(computer.last_playouts, 3000)
+
+    def test_difficulty_level(self):
+        self.assertIsInstance(get_computer_by_difficulty(Difficulty.MONTE_CARLO), MCTSComputer)
+
+if __name__ == '__main__':
+    unittest.main()
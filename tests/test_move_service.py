@@ -0,0 +1,140 @@
+import unittest
+import asyncio
+import threading
+import time
+from unittest import mock
+import sys, os.path
+src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
+sys.path.append(src_path)
+
+from bitboard import BitBoard
+from computer import BeginnerComputer, ExpertComputer, IntermediateComputer
+from instrumentation import MetricsAggregator
+from model import Move
+from move_service import MoveService
+
+def slow_search(board, marker, stats=None):
+    time.sleep(0.01)
+    stats.nodes += 42
+    return (0,2)
+
+class TestMoveService(unittest.TestCase):
+
+    def setUp(self):
+        self.service = MoveService(max_workers=2)
+        self.bitboard = BitBoard()
+        self.bitboard.set_cell(0,0,Move.X)
+        self.bitboard.set_cell(0,1,Move.X)
+        self.bitboard.set_cell(1,1,Move.O)
+
+    def tearDown(self):
+        self.service.shutdown()
+
+    def test_result_is_cached(self):
+        self.assertEqual(self.service.submit(self.bitboard, Move.O).result(), (0,2))
+        self.assertEqual(self.service.submit(self.bitboard.to_board(), Move.O).result(), (0,2))
+        self.assertEqual((self.service.searches, self.service.cache_hits), (1, 1))
+
+    def test_search_reports_effort(self):
+        with mock.patch('move_service.get_perfect_move', slow_search):
+            search = self.service.submit_search(self.bitboard, Move.O).result(5)
+        self.assertEqual((search.move, search.stats.nodes), ((0,2), 42))
+        self.assertGreaterEqual(search.search_sec, 0.01)
+        cached = self.service.submit_search(self.bitboard, Move.O).result(5)
+        self.assertEqual((cached.move, cached.stats.nodes, cached.stats.cache_hits, cached.search_sec), ((0,2), 0, 1, 0.0))
+
+    def test_in_flight_requests_are_coalesced(self):
+        search_started = threading.Event()
+        release_search = threading.Event()
+        def blocking_search(board, marker, stats=None):
+            search_started.set()
+            release_search.wait(5)
+            return (0,2)
+        with mock.patch('move_service.get_perfect_move', blocking_search):
+            first = self.service.submit(self.bitboard, Move.O)
+            search_started.wait(5)
+            second = self.service.submit_search(self.bitboard.snapshot(), Move.O)
+            self.assertEqual(self.service.get_pending_count(), 1)
+            release_search.set()
+            self.assertEqual(first.result(5), (0,2))
+            self.assertEqual(second.result(5).move, (0,2))
+            self.assertEqual((second.result().stats.coalesced, second.result().stats.nodes), (1, 0))
+        self.assertEqual((self.service.searches, self.service.coalesced), (1, 1))
+        self.assertEqual(self.service.get_pending_count(), 0)
+
+    def test_failed_search_is_not_cached(self):
+        with mock.patch('move_service.get_perfect_move', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                self.service.submit(self.bitboard, Move.O).result(5)
+        self.assertEqual(self.service.submit(self.bitboard, Move.O).result(5), (0,2))
+        self.assertEqual(self.service.searches, 2)
+
+
+class TestMoveServiceGetMove(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.service = MoveService(max_workers=1)
+
+    async def asyncTearDown(self):
+        self.service.shutdown()
+
+    async def test_get_move_uses_best_move(self):
+        bitboard = BitBoard()
+        bitboard.set_cell(2,2,Move.O)
+        bitboard.set_cell(2,1,Move.O)
+        bitboard.set_cell(1,1,Move.X)
+        self.assertEqual(await self.service.get_move(ExpertComputer(), bitboard.snapshot(), Move.X, delay=0.01), (2,0))
+        self.assertEqual(self.service.searches, 1)
+
+    async def test_get_move_reports_search(self):
+        metrics = MetricsAggregator()
+        computer = IntermediateComputer()
+        computer.mistake_probability = 0
+        computer.instrumentation = metrics
+        bitboard = BitBoard()
+        bitboard.set_cell(0,0,Move.X)
+        bitboard.set_cell(0,1,Move.X)
+        bitboard.set_cell(1,1,Move.O)
+        with mock.patch('move_service.get_perfect_move', slow_search):
+            self.assertEqual(await self.service.get_move(computer, bitboard.snapshot(), Move.O), (0,2))
+            self.assertEqual((metrics.last_move.nodes, metrics.last_move.cache_hits), (42, 0))
+            self.assertGreaterEqual(metrics.last_move.search_sec, 0.01)
+            self.assertEqual(await self.service.get_move(computer, bitboard.snapshot(), Move.O), (0,2))
+            self.assertEqual((metrics.last_move.nodes, metrics.last_move.cache_hits), (0, 1))
+            self.assertLess(metrics.last_move.search_sec, 0.01)
+
+    async def test_cancelled_caller_does_not_fail_coalesced_callers(self):
+        release_search = threading.Event()
+        def search(board, marker, stats=None):
+            # Search of busy position keeps the only worker busy, so search of bitboard waits in executor queue.
+            if board.x_mask == 0b100000000:
+                release_search.wait(5)
+            return (0,2)
+        bitboard = BitBoard()
+        bitboard.set_cell(0,0,Move.X)
+        bitboard.set_cell(0,1,Move.X)
+        bitboard.set_cell(1,1,Move.O)
+        with mock.patch('move_service.get_perfect_move', search):
+            busy = self.service.submit(BitBoard(x_mask=0b100000000), Move.O)
+            first = asyncio.create_task(self.service.get_move(ExpertComputer(), bitboard.snapshot(), Move.O))
+            second = asyncio.create_task(self.service.get_move(ExpertComputer(), bitboard.snapshot(), Move.O))
+            third = asyncio.create_task(self.service.get_move(ExpertComputer(), bitboard.snapshot(), Move.O))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            second.cancel()
+            await asyncio.sleep(0.01)
+            release_search.set()
+            self.assertEqual(await asyncio.wait_for(third, 5), (0,2))
+            self.assertEqual(busy.result(5), (0,2))
+        for task in (first, second):
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+        self.assertEqual((self.service.searches, self.service.coalesced), (2, 2))
+
+    async def test_beginner_does_not_search(self):
+        move = await self.service.get_move(BeginnerComputer(), BitBoard(), Move.X)
+        self.assertIn(move, BitBoard().get_available_moves())
+        self.assertEqual(self.service.searches, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import random
+import sys, os.path
+src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
+sys.path.append(src_path)
+
+from bitboard import BitBoard
+from computer import SearchStats, get_best_move_within_budget, search_root_moves, SearchContext
+from model import GameStatus, Move
+from parallel_search import close_search_pool, get_best_move_parallel, search_root_moves_parallel
+
+class TestParallelSearch(unittest.TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        close_search_pool()
+
+    def test_same_move_as_sequential_search(self):
+        rng = random.Random(0)
+        for (dimension, win_length) in ((3, 3), (4, 3), (4, 4), (5, 4)):
+            for _ in range(4):
+                bitboard = BitBoard(dimension=dimension, win_length=win_length)
+                marker = Move.X
+                for _ in range(rng.randrange(dimension)):
+                    bitboard.set_cell(*rng.choice(bitboard.get_available_moves()), marker)
+                    marker = Move.O if marker == Move.X else Move.X
+                if bitboard.get_game_state()[0] != GameStatus.IN_PROGRESS:
+                    continue
+                for depth in (1, 3):
+                    self.assertEqual(get_best_move_parallel(bitboard.get_available_moves(), bitboard, marker, depth, processes=2),
+                        get_best_move_within_budget(bitboard.get_available_moves(), bitboard, marker, time_budget=None, max_depth=depth))
+
+    def test_finds_forced_win(self):
+        bitboard = BitBoard(dimension=4, win_length=3)
+        bitboard.set_cell(1,1,Move.X)
+        bitboard.set_cell(1,2,Move.X)
+        bitboard.set_cell(0,0,Move.O)
+        bitboard.set_cell(3,3,Move.O)
+        self.assertIn(get_best_move_parallel(bitboard.get_available_moves(), bitboard, Move.X, 4, processes=2), [(1,0),(1,3)])
+
+    def test_best_scores_are_exact(self):
+        bitboard = BitBoard(dimension=4, win_length=3)
+        bitboard.set_cell(1,1,Move.X)
+        bitboard.set_cell(2,2,Move.O)
+        context = SearchContext(bitboard)
+        root_moves = bitboard.get_available_moves()
+        sequential = search_root_moves(root_moves, bitboard.x_mask, bitboard.o_mask, 3, context, exact_scores=True)
+        stats = SearchStats()
+        parallel = search_root_moves_parallel(root_moves, bitboard.x_mask, bitboard.o_mask, 3, bitboard, processes=2, stats=stats)
+        best_score = max(sequential.values())
+        self.assertEqual(max(parallel.values()), best_score)
+        for move in root_moves:
+            if sequential[move] == best_score:
+                self.assertEqual(parallel[move], best_score)
+            else:
+                self.assertLess(parallel[move], best_score)
+        self.assertGreater(stats.nodes, 0)
+
+if __name__ == '__main__':
+    unittest.main()
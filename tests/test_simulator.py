@@ -0,0 +1,33 @@
+import unittest
+import sys, os.path
+src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
+sys.path.append(src_path)
+
+from computer import ExpertComputer
+from model import Difficulty,GameStatus,Move
+from simulator import play_game, run_simulation, PLAYER_A, PLAYER_B, DRAW
+
+class TestSimulator(unittest.TestCase):
+
+    def test_expert_games_are_draw(self):
+        (status, winner, length) = play_game(ExpertComputer(), ExpertComputer())
+        self.assertEqual((status, winner, length), (GameStatus.DRAW, Move.EMPTY, 9))
+
+    def test_run_simulation_streams_stats(self):
+        games_seen = [stats.games for stats in run_simulation(Difficulty.EASY, Difficulty.PRO, 40, workers=1, batch_size=10)]
+        self.assertEqual(games_seen, [10, 20, 30, 40])
+
+    def test_expert_never_loses(self):
+        stats = list(run_simulation(Difficulty.EASY, Difficulty.PRO, 50, workers=1, batch_size=25))[-1]
+        self.assertEqual(stats.get_outcome_count(PLAYER_A), 0)
+        self.assertEqual(stats.get_outcome_count(PLAYER_B) + stats.get_outcome_count(DRAW), 50)
+        self.assertEqual(stats.get_outcome_count(DRAW, PLAYER_A) + stats.get_outcome_count(PLAYER_B, PLAYER_A), 25)
+
+    def test_simulation_is_reproducible_across_workers(self):
+        single = list(run_simulation(Difficulty.EASY, Difficulty.INTERMEDIATE, 40, workers=1, batch_size=10, seed=3))[-1]
+        pooled = list(run_simulation(Difficulty.EASY, Difficulty.INTERMEDIATE, 40, workers=2, batch_size=10, seed=3))[-1]
+        self.assertEqual(single.results, pooled.results)
+        self.assertEqual(single.game_lengths, pooled.game_lengths)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from unittest import mock
+import sys, os.path
+import tempfile
+src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
+sys.path.append(src_path)
+
+import computer
+from bitboard import BitBoard
+from computer import SearchStats,get_best_move,get_move_scores,minimax
+from lookup_table import get_reachable_positions
+from model import Move
+from tablebase import Tablebase,TABLEBASE_WIN_SCORE,generate_tablebase,get_parent_score
+
+class TestTablebase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.table_path = os.path.join(cls.temp_dir.name, 'tablebase.bin')
+        generate_tablebase(cls.table_path, 3, processes=1)
+        cls.table = Tablebase.load(cls.table_path, 3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.table.close()
+        cls.temp_dir.cleanup()
+
+    def test_scores_match_minimax(self):
+        for (mover_mask, opponent_mask) in get_reachable_positions(3):
+            score = self.table.get_score(mover_mask, opponent_mask)
+            self.assertEqual((score > 0) - (score < 0), minimax(True, BitBoard(mover_mask, opponent_mask), Move.X))
+
+    def test_symmetric_positions_solved(self):
+        # X in a corner, O in centre: all four corner images have same score.
+        scores = {self.table.get_score(1 << 4, 1 << corner) for corner in (0, 2, 6, 8)}
+        self.assertEqual(len(scores), 1)
+        self.assertNotIn(None, scores)
+
+    def test_finished_position_not_in_table(self):
+        self.assertEqual(self.table.get_score(0b11000, 0b111), None)
+        self.assertEqual(self.table.get_best_move(BitBoard(x_mask=0b111, o_mask=0b11000), Move.O), None)
+
+    def test_best_move_wins_fastest(self):
+        # X can win now at (0,2), or block O first.
+        board = BitBoard()
+        for (row, col, marker) in ((0,0,Move.X), (0,1,Move.X), (1,0,Move.O), (1,1,Move.O)):
+            board.set_cell(row, col, marker)
+        self.assertEqual(self.table.get_best_move(board, Move.X), (0,2))
+        self.assertEqual(self.table.get_move_scores(board, Move.X)[(0,2)], TABLEBASE_WIN_SCORE - 1)
+
+    def test_parent_score(self):
+        self.assertEqual(get_parent_score(TABLEBASE_WIN_SCORE - 1), -(TABLEBASE_WIN_SCORE - 2))
+        self.assertEqual(get_parent_score(-(TABLEBASE_WIN_SCORE - 2)), TABLEBASE_WIN_SCORE - 3)
+        self.assertEqual(get_parent_score(0), 0)
+
+    def test_parallel_generation_matches(self):
+        path = os.path.join(self.temp_dir.name, 'parallel.bin')
+        self.assertTrue(generate_tablebase(path, 3, processes=2))
+        with open(path, 'rb') as parallel_file, open(self.table_path, 'rb') as table_file:
+            self.assertEqual(parallel_file.read(), table_file.read())
+
+    def test_resume_after_interruption(self):
+        path = os.path.join(self.temp_dir.name, 'resumed.bin')
+        self.assertFalse(generate_tablebase(path, 3, processes=1, max_levels=4))
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(os.path.exists(path + '.state'))
+        with mock.patch('tablebase._create_partial_table') as create_partial_table:
+            self.assertTrue(generate_tablebase(path, 3, processes=1))
+        create_partial_table.assert_not_called()
+        self.assertFalse(os.path.exists(path + '.state'))
+        with open(path, 'rb') as resumed_file, open(self.table_path, 'rb') as table_file:
+            self.assertEqual(resumed_file.read(), table_file.read())
+
+    def test_load_other_board(self):
+        self.assertEqual(Tablebase.load(self.table_path, 3, 2), None)
+        self.assertEqual(Tablebase.load(os.path.join(self.temp_dir.name, 'missing.bin'), 4), None)
+
+    def test_too_large_board(self):
+        with self.assertRaises(ValueError):
+            generate_tablebase(os.path.join(self.temp_dir.name, 'large.bin'), 5)
+
+    def test_computer_uses_tablebase_for_large_boards(self):
+        board = BitBoard()
+        for (row, col, marker) in ((0,0,Move.X), (0,1,Move.X), (1,0,Move.O), (1,1,Move.O)):
+            board.set_cell(row, col, marker)
+        stats = SearchStats()
+        with mock.patch('computer.EXHAUSTIVE_SEARCH_MAX_CELLS', 4), mock.patch.dict(computer._tablebases, {(3, 3): self.table}):
+            self.assertEqual(get_best_move(board.get_available_moves(), board, Move.X, stats=stats), (0,2))
+            self.assertEqual(get_move_scores(board, Move.X, stats=stats), self.table.get_move_scores(board, Move.X))
+        self.assertEqual((stats.nodes, stats.cache_hits), (0, 2))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import sys, os.path
+src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
+sys.path.append(src_path)
+
+from bitboard import BitBoard
+from computer import get_best_move
+from model import Move
+from transposition import TranspositionTable, get_canonical_key
+
+class TestTranspositionTable(unittest.TestCase):
+
+    def test_canonical_key_for_symmetric_positions(self):
+        # X in a corner and O on adjacent edge, for all rotations and reflections
+        corner_positions = [((0,0),(0,1)), ((0,2),(1,2)), ((2,2),(2,1)), ((2,0),(1,0)), ((0,2),(0,1)), ((0,0),(1,0))]
+        keys = set()
+        for ((x_row,x_col),(o_row,o_col)) in corner_positions:
+            bitboard = BitBoard()
+            bitboard.set_cell(x_row,x_col,Move.X)
+            bitboard.set_cell(o_row,o_col,Move.O)
+            keys.add(get_canonical_key(bitboard.x_mask, bitboard.o_mask))
+        self.assertEqual(len(keys), 1)
+
+    def test_canonical_key_for_different_positions(self):
+        self.assertNotEqual(get_canonical_key(1, 2), get_canonical_key(2, 1))
+        self.assertNotEqual(get_canonical_key(1, 2), get_canonical_key(1, 1 << 4))
+
+    def test_lru_eviction(self):
+        table = TranspositionTable(max_size=2)
+        table.put(1, 0)
+        table.put(2, 1)
+        table.get(1)
+        table.put(3, -1)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.get(2), None)
+        self.assertEqual(table.get(1), 0)
+        self.assertEqual(table.get(3), -1)
+        self.assertEqual((table.hits, table.misses), (3, 1))
+
+    def test_repeated_search_is_served_from_table(self):
+        table = TranspositionTable()
+        bitboard = BitBoard()
+        bitboard.set_cell(1,1,Move.X)
+        best_move = get_best_move(bitboard.get_available_moves(), bitboard, Move.O, table)
+        misses = table.misses
+        table.reset_stats()
+        self.assertEqual(get_best_move(bitboard.get_available_moves(), bitboard, Move.O, table), best_move)
+        self.assertEqual(table.misses, 0)
+        self.assertLess(table.hits, misses)
+
+if __name__ == '__main__':
+    unittest.main()
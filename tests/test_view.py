@@ -3,8 +3,10 @@ import sys, os.path
 src_path = (os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) + '/src/')
 sys.path.append(src_path)
 
+import panel as pn
 from model import Move
-from view import ViewRenderer
+from computer import CellEvaluation
+from view import ViewRenderer, get_hint_button_type
 
 class TestViewRenderer(unittest.TestCase):
 
@@ -29,5 +31,65 @@ class TestViewRenderer(unittest.TestCase):
         button_name = grid[0, 0].name
         self.assertEqual(button_name, 'X')
 
+    def test_board_view_is_persistent(self):
+        grid = self.view.board_view()
+        button = grid[0, 0]
+        self.view.make_move(0,0)
+        self.assertIs(self.view.board_view(), grid)
+        self.assertIs(grid[0, 0], button)
+        self.assertEqual(button.name, 'X')
+
+    def test_board_view_updates_only_changed_buttons(self):
+        grid = self.view.board_view()
+        changed = []
+        for i in range(3):
+            for j in range(3):
+                grid[i, j].param.watch(lambda event: changed.append(event.obj), ['name', 'button_type'])
+        self.view.make_move(1,1)
+        self.assertEqual(len(changed), 2)
+        self.assertIs(changed[0], grid[1, 1])
+
+    def test_board_view_after_reset(self):
+        grid = self.view.board_view()
+        self.view.make_move(0,0)
+        self.view.first_mover = Move.O
+        self.view.reset_game_state()
+        self.assertEqual(grid[0, 0].name, Move.EMPTY.value)
+
+    def test_one_render_per_move(self):
+        pn.panel(self.view.game_message).get_root()
+        self.view.board_view()
+        self.view.render_counts = {'game_message': 0, 'board_view': 0}
+        self.view.make_move(1,1)
+        self.assertEqual(self.view.render_counts, {'game_message': 2, 'board_view': 2})
+        self.assertEqual(self.view.get_renders_per_move(), {'game_message': 1, 'board_view': 1})
+
+    def test_one_render_for_winning_move(self):
+        pn.panel(self.view.game_message).get_root()
+        self.view.board_view()
+        self.view.board.set_cell(0,0,Move.X)
+        self.view.board.set_cell(0,1,Move.X)
+        self.view.render_counts = {'game_message': 0, 'board_view': 0}
+        self.view.make_move(0,2)
+        self.assertTrue(self.view.game_ended)
+        self.assertEqual(self.view.winner, Move.X)
+        self.assertEqual(self.view.render_counts, {'game_message': 1, 'board_view': 1})
+
+    def test_hint_colours_empty_cells(self):
+        grid = self.view.board_view()
+        self.view.board.set_cell(0,0,Move.O)
+        self.view.board.set_cell(0,1,Move.O)
+        self.view.board.set_cell(1,1,Move.X)
+        self.view.param.trigger('hint_button')
+        self.assertEqual(grid[0, 2].button_type, 'warning')
+        self.assertEqual(grid[1, 0].button_type, 'danger')
+        self.assertEqual(grid[0, 0].button_type, 'default')
+        self.view.make_move(0,2)
+        self.assertEqual({grid[i, j].button_type for i in range(3) for j in range(3)}, {'default'})
+
+    def test_hint_button_type(self):
+        self.assertEqual(get_hint_button_type(CellEvaluation((0,0), 1, 5, False)), 'light')
+        self.assertEqual(get_hint_button_type(CellEvaluation((0,0), 9, 0, True)), 'warning')
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file